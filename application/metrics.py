@@ -0,0 +1,431 @@
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+
+# In-process metrics exposed in the Prometheus text format at /metrics.
+#
+# With METRICS_MULTIPROCESS_DIR set, every process writes its samples to its
+# own memory-mapped file in that directory and /metrics sums the files of
+# all processes, so any worker can answer the scrape. The file of a process
+# that exited is folded into an archive file by the next scrape: its
+# counters and histograms carry on, its gauges are dropped. Clear the
+# directory when the workers are (re)started.
+#
+# /metrics is served to staff users, or with METRICS_TOKEN to the scraper
+# sending "Authorization: Bearer <token>".
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ARCHIVE_FILENAME = "metrics_archive.db"
+
+
+class MmapValues:
+    """
+    Float values keyed by string in a memory-mapped file. The file starts
+    with the number of bytes in use, followed by entries of a key length
+    (4 bytes), the key (padded to 8 bytes) and the value (8 bytes).
+    """
+
+    INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path):
+        self.file = open(path, "a+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            self.file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self.capacity = size
+        self.mmap = mmap.mmap(self.file.fileno(), self.capacity)
+        self.used = struct.unpack_from("i", self.mmap, 0)[0]
+        if self.used == 0:
+            self.used = 8
+            struct.pack_into("i", self.mmap, 0, self.used)
+        self.positions = {
+            key: position for key, _, position in iter_entries(self.mmap, self.used)
+        }
+
+    def add(self, key, amount):
+        position = self.position(key)
+        value = struct.unpack_from("d", self.mmap, position)[0]
+        struct.pack_into("d", self.mmap, position, value + amount)
+
+    def set(self, key, value):
+        struct.pack_into("d", self.mmap, self.position(key), value)
+
+    def position(self, key):
+        if key not in self.positions:
+            self.positions[key] = self.append(key)
+        return self.positions[key]
+
+    def append(self, key):
+        encoded = key.encode()
+        padded = encoded + b" " * (8 - (len(encoded) + 4) % 8)
+        entry = struct.pack(f"i{len(padded)}sd", len(encoded), padded, 0.0)
+        while self.used + len(entry) > self.capacity:
+            self.capacity *= 2
+            self.mmap.close()
+            self.file.truncate(self.capacity)
+            self.mmap = mmap.mmap(self.file.fileno(), self.capacity)
+        self.mmap[self.used : self.used + len(entry)] = entry
+        self.used += len(entry)
+        struct.pack_into("i", self.mmap, 0, self.used)
+        return self.used - 8
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+def iter_entries(data, used):
+    position = 8
+    while position < used:
+        length = struct.unpack_from("i", data, position)[0]
+        key_end = position + 4 + length
+        value_position = key_end + (8 - (length + 4) % 8)
+        key = bytes(data[position + 4 : key_end]).decode()
+        value = struct.unpack_from("d", data, value_position)[0]
+        yield key, value, value_position
+        position = value_position + 8
+
+
+def read_values_file(path):
+    data = Path(path).read_bytes()
+    if len(data) < 8:
+        return []
+    used = struct.unpack_from("i", data, 0)[0]
+    return [(key, value) for key, value, _ in iter_entries(data, used)]
+
+
+def process_is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def archive_dead_processes(directory, gauges):
+    """
+    Fold the files of the processes that exited into the archive file,
+    without their `gauges` samples, and remove them.
+    """
+    for path in directory.glob("metrics_*.db"):
+        pid = path.stem.split("_", 1)[1]
+        if not pid.isdigit() or int(pid) == os.getpid() or process_is_alive(int(pid)):
+            continue
+        claimed = path.with_suffix(".dead")
+        try:
+            # Only one of the processes scraping meanwhile gets to archive it
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            continue
+        archive = MmapValues(directory / ARCHIVE_FILENAME)
+        try:
+            fcntl.flock(archive.file, fcntl.LOCK_EX)
+            for key, value in read_values_file(claimed):
+                if json.loads(key)[0] not in gauges:
+                    archive.add(key, value)
+        finally:
+            archive.close()
+        claimed.unlink()
+
+
+class ValueStore:
+    """
+    Samples of this process, in memory or in its memory-mapped file when
+    METRICS_MULTIPROCESS_DIR is set. The file is (re)opened lazily so forked
+    workers each get their own.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.pid = None
+        self.mmap_values = None
+
+    def directory(self):
+        return getattr(settings, "METRICS_MULTIPROCESS_DIR", None)
+
+    def backend(self):
+        directory = self.directory()
+        if not directory:
+            return None
+        if self.pid != os.getpid() or self.mmap_values is None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self.pid = os.getpid()
+            self.mmap_values = MmapValues(Path(directory) / f"metrics_{self.pid}.db")
+        return self.mmap_values
+
+    def add(self, key, amount):
+        with self.lock:
+            backend = self.backend()
+            if backend is None:
+                self.values[key] = self.values.get(key, 0.0) + amount
+            else:
+                backend.add(key, amount)
+
+    def set(self, key, value):
+        with self.lock:
+            backend = self.backend()
+            if backend is None:
+                self.values[key] = value
+            else:
+                backend.set(key, value)
+
+    def collect(self, gauges=()):
+        """Samples summed over every process, `gauges` over the live ones."""
+        directory = self.directory()
+        if not directory:
+            with self.lock:
+                return dict(self.values)
+        directory = Path(directory)
+        if directory.is_dir():
+            archive_dead_processes(directory, set(gauges))
+        totals = {}
+        for path in sorted(directory.glob("metrics_*.db")):
+            for key, value in read_values_file(path):
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+            if self.mmap_values is not None:
+                self.mmap_values.close()
+            self.mmap_values = None
+            self.pid = None
+
+
+def sample_key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects the labels {self.labelnames}")
+        return {name: str(value) for name, value in labels.items()}
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        self.registry.store.add(sample_key(self.name, self.labels(labels)), amount)
+
+
+class Gauge(Metric):
+    """
+    Gauges set by the processes are summed across them, like the counters.
+    Values read from the database are reported through collectors instead.
+    """
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        self.registry.store.set(sample_key(self.name, self.labels(labels)), value)
+
+    def inc(self, amount=1, **labels):
+        self.registry.store.add(sample_key(self.name, self.labels(labels)), amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        labels = self.labels(labels)
+        store = self.registry.store
+        # Buckets are stored non-cumulative and summed up when rendered
+        bound = next(bound for bound in self.buckets if value <= bound)
+        store.add(sample_key(f"{self.name}_bucket", {**labels, "le": bound}), 1)
+        store.add(sample_key(f"{self.name}_sum", labels), value)
+        store.add(sample_key(f"{self.name}_count", labels), 1)
+
+    def time(self, **labels):
+        return Timer(self, labels)
+
+
+class Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.store = ValueStore()
+        self.metrics = {}
+        self.collectors = []
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return Counter(self, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return Gauge(self, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), **kwargs):
+        return Histogram(self, name, documentation, labelnames, **kwargs)
+
+    def add_collector(self, collector):
+        # Called on every scrape by the scraped process only, for values read
+        # from the database. Yields (metric name, labels, value) samples.
+        self.collectors.append(collector)
+        return collector
+
+    def render(self):
+        samples = {}
+        gauges = [
+            metric.name for metric in self.metrics.values() if metric.type == "gauge"
+        ]
+        for key, value in self.store.collect(gauges).items():
+            name, labels = json.loads(key)
+            samples.setdefault(name, []).append((dict(labels), value))
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                samples.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if isinstance(metric, Histogram):
+                lines.extend(histogram_lines(metric, samples))
+            else:
+                for labels, value in sorted(
+                    samples.get(metric.name, []), key=by_labels
+                ):
+                    lines.append(sample_line(metric.name, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def by_labels(sample):
+    return sorted(sample[0].items())
+
+
+def histogram_lines(metric, samples):
+    buckets = {}
+    for labels, value in samples.get(f"{metric.name}_bucket", []):
+        bound = float(labels.pop("le"))
+        series = buckets.setdefault(json.dumps(sorted(labels.items())), {})
+        series[bound] = series.get(bound, 0.0) + value
+    sums = {
+        json.dumps(sorted(labels.items())): value
+        for labels, value in samples.get(f"{metric.name}_sum", [])
+    }
+    counts = {
+        json.dumps(sorted(labels.items())): value
+        for labels, value in samples.get(f"{metric.name}_count", [])
+    }
+    lines = []
+    for series in sorted(counts):
+        labels = dict(json.loads(series))
+        cumulative = 0.0
+        for bound in metric.buckets:
+            cumulative += buckets.get(series, {}).get(bound, 0.0)
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(
+                sample_line(f"{metric.name}_bucket", {**labels, "le": le}, cumulative)
+            )
+        lines.append(sample_line(f"{metric.name}_sum", labels, sums.get(series, 0.0)))
+        lines.append(sample_line(f"{metric.name}_count", labels, counts[series]))
+    return lines
+
+
+def escape(value):
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def sample_line(name, labels, value):
+    if labels:
+        pairs = ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value!r}"
+
+
+registry = Registry()
+
+http_responses = registry.counter(
+    "coffeeshop_http_responses_total",
+    "HTTP responses by view and status class.",
+    ["view", "status"],
+)
+http_request_seconds = registry.histogram(
+    "coffeeshop_http_request_seconds",
+    "Time spent handling requests, by view.",
+    ["view"],
+)
+
+
+class MetricsMiddleware:
+    """Count responses and time requests per URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unmatched"
+        http_responses.inc(view=view, status=f"{response.status_code // 100}xx")
+        http_request_seconds.observe(time.perf_counter() - started, view=view)
+        return response
+
+
+def is_scraper(request):
+    from .profiling import is_staff
+
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token and request.headers.get("Authorization") == f"Bearer {token}":
+        return True
+    return is_staff(request)
+
+
+class MetricsView(View):
+    def get(self, request):
+        if not is_scraper(request):
+            return HttpResponse(status=401)
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
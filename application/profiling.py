@@ -0,0 +1,167 @@
+import io
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+from pathlib import Path
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils import timezone
+
+# On-demand profiling of a single request. Staff users send the
+# PROFILING_HEADER header (or the PROFILING_QUERY_PARAM query parameter)
+# with "1" to profile the request and store the report in PROFILING_DIR, or
+# with "report" to get the report back instead of the response. Requests
+# without the trigger only pay for the header lookup and a substring test on
+# the query string.
+#
+# cProfile is process-wide (sys.monitoring since Python 3.12): the Python
+# profile also covers the other threads of the worker running meanwhile, and
+# only one request is profiled at a time. A request triggering a profile
+# while another one is profiled gets a SQL-only report, its queries being
+# recorded per connection, so per thread.
+
+PROFILING_HEADER = "X-Profile"
+PROFILING_QUERY_PARAM = "_profile"
+APPLICATION_DIR = str(Path(__file__).resolve().parent)
+_profiler_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Database execute wrapper recording every statement with its origin."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": context["connection"].alias,
+                    "sql": sql,
+                    "seconds": time.perf_counter() - started,
+                    "origin": query_origin(),
+                }
+            )
+
+
+def query_origin():
+    # The innermost frame of the application code, outside of this module
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(APPLICATION_DIR) and frame.filename != __file__:
+            return "{}:{} in {}".format(frame.filename, frame.lineno, frame.name)
+    return "-"
+
+
+def is_staff(request):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except (InvalidToken, TokenError):
+            return False
+        if authenticated is None:
+            return False
+        user = authenticated[0]
+    return user.is_staff
+
+
+def milliseconds(seconds):
+    return "%.2f" % (seconds * 1000)
+
+
+def profile_report(request, response, profiler, queries, seconds):
+    import pstats
+
+    stream = io.StringIO()
+    status_code = response.status_code
+    stream.write(f"{request.method} {request.get_full_path()} -> {status_code}\n")
+    stream.write(f"Total: {milliseconds(seconds)} ms\n")
+    sql_seconds = sum(query["seconds"] for query in queries)
+    stream.write(f"SQL: {len(queries)} queries, {milliseconds(sql_seconds)} ms\n\n")
+    for query in queries:
+        stream.write(
+            f"[{query['alias']}] {milliseconds(query['seconds'])} ms"
+            f" {query['origin']}\n    {query['sql']}\n"
+        )
+    stream.write("\n")
+    if profiler is None:
+        stream.write("No Python profile: another request was being profiled.\n")
+        return stream.getvalue()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(settings.PROFILING_TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def store_report(request, report):
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = request.path.strip("/").replace("/", "_") or "root"
+    timestamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    filename = f"{timestamp}-{request.method}-{path}.txt"
+    (directory / filename).write_text(report)
+    return filename
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = request.headers.get(PROFILING_HEADER)
+        if trigger is None and PROFILING_QUERY_PARAM in request.META.get(
+            "QUERY_STRING", ""
+        ):
+            trigger = request.GET.get(PROFILING_QUERY_PARAM)
+        if trigger not in ("1", "report") or not is_staff(request):
+            return self.get_response(request)
+        return self.profile(request, trigger)
+
+    def start_profiler(self):
+        # A started cProfile.Profile, None when another profile is running
+        import cProfile
+
+        if not _profiler_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool (coverage, a debugger...) is active
+            _profiler_lock.release()
+            return None
+        return profiler
+
+    def stop_profiler(self, profiler):
+        if profiler is not None:
+            profiler.disable()
+            _profiler_lock.release()
+
+    def profile(self, request, trigger):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            started = time.perf_counter()
+            profiler = self.start_profiler()
+            try:
+                response = self.get_response(request)
+            finally:
+                self.stop_profiler(profiler)
+            seconds = time.perf_counter() - started
+
+        report = profile_report(request, response, profiler, recorder.queries, seconds)
+        if trigger == "report":
+            response = HttpResponse(report, content_type="text/plain; charset=utf-8")
+        else:
+            response["X-Profile-Report"] = store_report(request, report)
+        response["X-Profile-Total-Ms"] = milliseconds(seconds)
+        response["X-Profile-Queries"] = str(len(recorder.queries))
+        return response
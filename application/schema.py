@@ -0,0 +1,90 @@
+from pathlib import Path
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+
+# The OpenAPI schema is generated at build time with
+# `python manage.py generate_schema` and served from disk. Each process keeps
+# the file content in memory and reloads it when the file changes on deploy.
+# drf_yasg is only imported to generate the schema.
+
+SCHEMA_CONTENT_TYPES = {
+    ".json": "application/json; charset=utf-8",
+    ".yaml": "application/yaml; charset=utf-8",
+}
+
+_frozen_schemas = {}
+
+
+def get_swagger_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Trio Coffee Shop Challenge",
+        default_version="v1",
+        description="-",
+        contact=openapi.Contact(email="evertoncastro.sp@gmail.com"),
+    )
+
+
+def get_schema_view():
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    return get_schema_view(
+        get_swagger_info(),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+
+def frozen_schema_path(format):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f"swagger{format}"
+
+
+def generate_schema(format):
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    generator = OpenAPISchemaGenerator(get_swagger_info())
+    schema = generator.get_schema(request=None, public=True)
+    if format == ".json":
+        codec = OpenAPICodecJson(validators=[], pretty=True)
+    else:
+        codec = OpenAPICodecYaml(validators=[])
+    return codec.encode(schema)
+
+
+def write_frozen_schema(format):
+    path = frozen_schema_path(format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(generate_schema(format))
+    return path
+
+
+def load_frozen_schema(format):
+    path = frozen_schema_path(format)
+    try:
+        version = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _frozen_schemas.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, path.read_bytes())
+        _frozen_schemas[path] = cached
+    return cached[1]
+
+
+class FrozenSchemaView(View):
+    live_schema_view = None
+
+    def get(self, request, format):
+        content = load_frozen_schema(format)
+        if content is not None:
+            return HttpResponse(content, content_type=SCHEMA_CONTENT_TYPES[format])
+        # No frozen schema was generated for this build, fall back to drf_yasg
+        if FrozenSchemaView.live_schema_view is None:
+            FrozenSchemaView.live_schema_view = get_schema_view().without_ui(
+                cache_timeout=0
+            )
+        return FrozenSchemaView.live_schema_view(request, format=format)
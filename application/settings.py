@@ -35,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "application.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -42,6 +43,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "application.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "application.urls"
@@ -73,15 +75,38 @@ REST_FRAMEWORK = {
 }
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=3600),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
+    # Every refresh rotates the refresh token and extends the session, so a
+    # device only logs in again after REFRESH_TOKEN_LIFETIME of inactivity
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    # last_login is the activity date retention purges inactive customers by:
+    # set on login, and on refresh by TokenRefreshSerializer
+    "UPDATE_LAST_LOGIN": True,
+    "TOKEN_REFRESH_SERIALIZER": (
+        "application.store.serializers.auth_serializers.TokenRefreshSerializer"
+    ),
+    "TOKEN_VERIFY_SERIALIZER": (
+        "application.store.serializers.auth_serializers.TokenVerifySerializer"
+    ),
 }
 
 
 SWAGGER_SETTINGS = {
-    "DEFAULT_INFO": "application.urls.swagger_info",
     "USE_SESSION_AUTH": False,
+    # The UIs load the frozen schema instead of generating it on each visit
+    "SPEC_URL": "/swagger.json",
 }
 
+REDOC_SETTINGS = {
+    "SPEC_URL": "/swagger.json",
+}
+
+# Where `python manage.py generate_schema` writes the OpenAPI schema served
+# by the swagger.json and swagger.yaml endpoints.
+OPENAPI_SCHEMA_DIR = BASE_DIR / "schema"
+
 
 WSGI_APPLICATION = "application.wsgi.application"
 
@@ -93,6 +118,10 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Wait for concurrent writers instead of failing with "database is locked"
+        "OPTIONS": {"timeout": 20},
+        # A file based test database, so tests can run concurrent transactions
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -144,3 +173,67 @@ EMAIL_HOST = "127.0.0.1"
 EMAIL_PORT = "1025"
 
 EMAIL_SENDER = "coffeeshop@example.com"
+
+# Delivered and canceled orders are moved to the archive tables once they
+# have not been updated for ORDER_ARCHIVE_AFTER.
+ORDER_ARCHIVE_AFTER = timedelta(days=30)
+ORDER_ARCHIVE_BATCH_SIZE = 500
+
+# Retention (manage.py purge_retention): delivered and canceled orders, live
+# or archived, are deleted once not updated for RETENTION_ORDERS, order events
+# after RETENTION_ORDER_EVENTS, and customers without orders left who have
+# not logged in nor refreshed a token for RETENTION_INACTIVE_CUSTOMERS.
+RETENTION_ORDERS = timedelta(days=730)
+RETENTION_ORDER_EVENTS = timedelta(days=90)
+RETENTION_INACTIVE_CUSTOMERS = timedelta(days=730)
+RETENTION_BATCH_SIZE = 1000
+
+# The order event feed only serves events older than ORDER_EVENTS_FEED_DELAY,
+# so a transaction that commits after a later one cannot slip an event in
+# behind a consumer's cursor. Events are dated at insert, not at commit: a
+# transaction open longer than the delay can still do so, and the event is
+# then missed by the feed and the webhooks. Keep it above the longest order
+# transaction.
+ORDER_EVENTS_FEED_DELAY = timedelta(seconds=2)
+
+# Bulk upload of the orders taken offline by the point of sale tablets: at
+# most POS_BULK_MAX_ORDERS orders per request, inserted POS_BULK_CHUNK_SIZE
+# orders per transaction.
+POS_BULK_MAX_ORDERS = 1000
+POS_BULK_CHUNK_SIZE = 100
+
+# Webhook dispatcher (manage.py dispatch_webhooks). Failing endpoints back off
+# exponentially from WEBHOOK_RETRY_BASE up to WEBHOOK_RETRY_MAX, and are left
+# alone for WEBHOOK_CIRCUIT_OPEN_FOR after WEBHOOK_FAILURE_THRESHOLD failures.
+WEBHOOK_BATCH_SIZE = 100
+WEBHOOK_TIMEOUT = 5
+WEBHOOK_POLL_INTERVAL = 1
+WEBHOOK_RETRY_BASE = timedelta(seconds=5)
+WEBHOOK_RETRY_MAX = timedelta(minutes=5)
+WEBHOOK_FAILURE_THRESHOLD = 5
+WEBHOOK_CIRCUIT_OPEN_FOR = timedelta(minutes=15)
+
+# Each worker compares the versions of its in-process caches (menu index,
+# promotions, price schedule) with the CacheVersion table at most every
+# CACHE_VERSION_CHECK_INTERVAL seconds, so writes made through another worker
+# or node show up after that delay. None skips the check (single process).
+CACHE_VERSION_CHECK_INTERVAL = 1
+
+# Kitchen admission control. New orders for a location are rejected with a
+# 503 and a Retry-After once its queue (waiting and in preparation orders)
+# reaches KITCHEN_QUEUE_LIMITS[location]; locations without a limit are never
+# rejected. The limit is soft, concurrent orders can overshoot it. Wait
+# estimates assume KITCHEN_SECONDS_PER_ORDER per queued order.
+KITCHEN_QUEUE_LIMITS = {}
+KITCHEN_SECONDS_PER_ORDER = 120
+
+# Metrics served at /metrics to staff users. Set METRICS_MULTIPROCESS_DIR to
+# a directory shared by the workers of a host to aggregate them, and
+# METRICS_TOKEN to let the scraper in with "Authorization: Bearer <token>".
+METRICS_MULTIPROCESS_DIR = None
+METRICS_TOKEN = None
+
+# Staff requests sent with "X-Profile: 1" (or ?_profile=1) are profiled and
+# their report is written to PROFILING_DIR, see application/profiling.py.
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_TOP_FUNCTIONS = 40
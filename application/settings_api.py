@@ -0,0 +1,39 @@
+"""
+API-only worker profile.
+
+The store API authenticates with JWT only, so API workers can leave out the
+admin site, sessions, messages, templates, static files and the swagger UIs
+(drf_yasg is then only imported to generate the schema). Select it with:
+
+    DJANGO_SETTINGS_MODULE=application.settings_api
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    # Third parties
+    "rest_framework",
+    "rest_framework_simplejwt",
+    # Custom Apps
+    "application.store.apps.StoreConfig",
+]
+
+MIDDLEWARE = [
+    "application.metrics.MetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "application.profiling.ProfilingMiddleware",
+]
+
+ROOT_URLCONF = "application.urls_api"
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
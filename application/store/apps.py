@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "application.store"
+
+    def ready(self):
+        # Connect the order signal receivers
+        from . import (  # noqa: F401
+            dashboard,
+            events,
+            kitchen,
+            menu_index,
+            metrics,
+            prep_stats,
+            pricing,
+            rollups,
+            schedules,
+        )
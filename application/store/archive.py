@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+ORDER_FIELDS = (
+    "id",
+    "customer_id",
+    "location",
+    "status",
+    "canceled",
+    "date_created",
+    "date_updated",
+    "pickup_slot_id",
+    "promo_code",
+    "client_id",
+)
+ORDER_ITEM_FIELDS = (
+    "id",
+    "order_id",
+    "name",
+    "price",
+    "quantity",
+    "item_id",
+    "discount",
+    "date_created",
+    "date_updated",
+)
+
+
+def archivable_orders(cutoff):
+    return Order.objects.filter(
+        Q(status=Order.DELIVERED) | Q(canceled=True), date_updated__lt=cutoff
+    )
+
+
+def archive_orders_batch(cutoff, batch_size):
+    # Moves one chunk of orders and their items in a single short transaction
+    with transaction.atomic():
+        order_ids = list(
+            archivable_orders(cutoff)
+            .select_for_update(skip_locked=True)
+            .order_by("date_updated")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0
+        orders = Order.objects.filter(id__in=order_ids)
+        order_items = OrderItem.objects.filter(order_id__in=order_ids)
+        ArchivedOrder.objects.bulk_create(
+            ArchivedOrder(**row) for row in orders.values(*ORDER_FIELDS)
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            ArchivedOrderItem(**row) for row in order_items.values(*ORDER_ITEM_FIELDS)
+        )
+        order_items.delete()
+        orders.delete()
+    return len(order_ids)
+
+
+def archive_orders(older_than=None, batch_size=None, max_batches=None):
+    """
+    Archive delivered and canceled orders that were not updated within
+    `older_than`, chunk by chunk. Yields the number of orders moved by each
+    chunk so callers can report progress or stop early.
+    """
+    if older_than is None:
+        older_than = settings.ORDER_ARCHIVE_AFTER
+    if batch_size is None:
+        batch_size = settings.ORDER_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - older_than
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_orders_batch(cutoff, batch_size)
+        if not archived:
+            return
+        batches += 1
+        yield archived
@@ -0,0 +1,91 @@
+import itertools
+import threading
+import time
+from functools import partial
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import CacheVersion
+
+# Invalidation bus for the in-process caches. Each cache registers a
+# namespace with the function clearing it; a change of the underlying data
+# bumps the namespace's CacheVersion row in the same transaction, and every
+# worker compares the versions with the ones its caches were built from at
+# most every CACHE_VERSION_CHECK_INTERVAL seconds, with one indexed query.
+#
+# Every invalidation also moves the namespace to a new generation. A getter
+# reads the generation before building its cache and only stores the result
+# if it is unchanged, so a build that read the data before an invalidation
+# cannot store it after.
+
+_caches = {}
+_versions = {}
+_generations = {}
+_generation_counter = itertools.count(1)
+_checked_at = None
+_check_lock = threading.Lock()
+
+
+def register_cache(namespace, invalidate):
+    _caches[namespace] = invalidate
+
+
+def cache_generation(namespace):
+    return _generations.get(namespace, 0)
+
+
+def invalidate_cache(namespace):
+    _generations[namespace] = next(_generation_counter)
+    _caches[namespace]()
+
+
+def bump_cache_version(namespace):
+    version = F("version") + 1
+    if CacheVersion.objects.filter(namespace=namespace).update(version=version):
+        return
+    try:
+        with transaction.atomic():
+            CacheVersion.objects.create(namespace=namespace, version=1)
+    except IntegrityError:
+        # Created by a concurrent transaction meanwhile
+        CacheVersion.objects.filter(namespace=namespace).update(version=version)
+
+
+def cache_changed(namespace):
+    """
+    Invalidate the `namespace` cache of every worker: this one right away
+    (again on commit, as a rebuild racing with the transaction could still
+    see the old data), the others through the version bump.
+    """
+    bump_cache_version(namespace)
+    invalidate_cache(namespace)
+    transaction.on_commit(partial(invalidate_cache, namespace))
+
+
+def check_cache_versions():
+    """
+    Clear the caches whose version changed since the last check. Called by
+    the cache getters; only one thread checks at a time, the others keep
+    serving their cache meanwhile.
+    """
+    global _checked_at
+    interval = settings.CACHE_VERSION_CHECK_INTERVAL
+    now = time.monotonic()
+    if interval is None or (_checked_at is not None and now - _checked_at < interval):
+        return
+    if not _check_lock.acquire(blocking=False):
+        return
+    try:
+        _checked_at = now
+        versions = dict(
+            CacheVersion.objects.filter(namespace__in=list(_caches)).values_list(
+                "namespace", "version"
+            )
+        )
+        for namespace in _caches:
+            version = versions.get(namespace, 0)
+            if _versions.get(namespace) != version:
+                _versions[namespace] = version
+                invalidate_cache(namespace)
+    finally:
+        _check_lock.release()
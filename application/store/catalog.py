@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.utils import timezone
+from .deletion import raw_delete
+from .cache_versions import cache_changed
+from .menu_index import MENU_CACHE
+from .models import (
+    ArchivedOrderItem,
+    Favorite,
+    OrderItem,
+    PriceSchedule,
+    Product,
+    ProductVariation,
+)
+
+# Products and variations are deactivated and deleted with set-based
+# statements: nothing is loaded into Python and no per-row signal is sent, so
+# the menu index of every worker is invalidated explicitly.
+#
+# Order lines, archived order lines and favorites keep the id of their
+# variation (item_id) without a foreign key, so a variation they refer to is
+# deactivated rather than deleted, and so is its product.
+
+
+def menu_changed():
+    cache_changed(MENU_CACHE)
+
+
+def deactivate(queryset):
+    """
+    Take the products or variations of `queryset` off the menu with one
+    UPDATE. Returns the number of rows matched.
+    """
+    fields = {"active": False, "date_updated": timezone.now()}
+    if queryset.model is ProductVariation:
+        # Deactivated by an admin, restocks do not bring it back
+        fields["sold_out"] = False
+    with transaction.atomic():
+        updated = queryset.update(**fields)
+        if updated:
+            menu_changed()
+    return updated
+
+
+def referenced_variations(variations):
+    """
+    Ids of the variations of `variations` that order lines, archived order
+    lines or favorites refer to, with one query.
+    """
+    referenced = OrderItem.objects.filter(item_id__in=variations).values("item_id")
+    for model in (ArchivedOrderItem, Favorite):
+        referenced = referenced.union(
+            model.objects.filter(item_id__in=variations).values("item_id")
+        )
+    return {row["item_id"] for row in referenced}
+
+
+def delete_products(products):
+    """
+    Delete the products of `products` and their variations, variations
+    first, one DELETE statement each. Products with referenced variations are
+    deactivated along with those instead. Returns the number of products
+    deleted or deactivated.
+    """
+    with transaction.atomic():
+        product_ids = list(products.values_list("pk", flat=True))
+        variations = ProductVariation.objects.filter(product_id__in=product_ids)
+        referenced = referenced_variations(variations.values("pk"))
+        kept = set(
+            variations.filter(pk__in=referenced).values_list("product_id", flat=True)
+        )
+        deleted_variations = variations.exclude(pk__in=referenced)
+        raw_delete(PriceSchedule.objects.filter(variation__in=deleted_variations))
+        raw_delete(deleted_variations)
+        deleted = raw_delete(
+            Product.objects.filter(pk__in=product_ids).exclude(pk__in=kept)
+        )
+        if kept:
+            deactivate(variations)
+            deactivate(Product.objects.filter(pk__in=kept))
+        if deleted:
+            menu_changed()
+    return deleted + len(kept)
+
+
+def delete_variations(variations):
+    """
+    Delete the variations of `variations` and their price schedule, one
+    DELETE statement each, and deactivate the referenced ones instead.
+    Returns the number of variations deleted or deactivated.
+    """
+    with transaction.atomic():
+        referenced = referenced_variations(variations.values("pk"))
+        deleted_variations = variations.exclude(pk__in=referenced)
+        raw_delete(PriceSchedule.objects.filter(variation__in=deleted_variations))
+        deleted = raw_delete(deleted_variations)
+        deactivated = deactivate(variations.filter(pk__in=referenced))
+        if deleted:
+            menu_changed()
+    return deleted + deactivated
@@ -0,0 +1,161 @@
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    DashboardCounter,
+    Order,
+    OrderItem,
+)
+from .rollups import add_to_rollup
+from .signals import (
+    order_placed,
+    order_item_added,
+    order_item_updated,
+    order_item_removed,
+    order_updated,
+    order_status_changed,
+)
+
+# One DashboardCounter row per day, updated in the transactions changing the
+# orders so the dashboard reads it with a single lookup on the unique day.
+# The order status values are also the names of the status counters.
+
+STATUS_FIELDS = tuple(status for status, _ in Order.STATUS_CHOICES)
+COUNT_FIELDS = ("orders", *STATUS_FIELDS, "canceled")
+LINE_TOTAL = F("price") * F("quantity") - F("discount")
+
+
+def line_total(order_item):
+    return order_item.price * order_item.quantity - order_item.discount
+
+
+def order_revenue(order):
+    total = order.order_items.aggregate(
+        total=Sum(
+            LINE_TOTAL, output_field=DecimalField(max_digits=14, decimal_places=2)
+        )
+    )["total"]
+    return total or 0
+
+
+def add_to_dashboard(order, **deltas):
+    day = timezone.localdate(order.date_created)
+    add_to_rollup(DashboardCounter, {"day": day}, **deltas)
+
+
+@receiver(order_placed)
+def count_order_placed(sender, order, order_items, **kwargs):
+    revenue = sum(line_total(order_item) for order_item in order_items)
+    add_to_dashboard(order, orders=1, revenue=revenue, **{order.status: 1})
+
+
+@receiver(order_item_added)
+def count_order_item_added(sender, order, order_item, **kwargs):
+    if not order.canceled:
+        add_to_dashboard(order, revenue=line_total(order_item))
+
+
+@receiver(order_item_updated)
+def count_order_item_updated(
+    sender, order, order_item, old_quantity, old_discount, **kwargs
+):
+    if not order.canceled:
+        old_total = order_item.price * old_quantity - old_discount
+        add_to_dashboard(order, revenue=line_total(order_item) - old_total)
+
+
+@receiver(order_item_removed)
+def count_order_item_removed(sender, order, order_item, **kwargs):
+    if not order.canceled:
+        add_to_dashboard(order, revenue=-line_total(order_item))
+
+
+@receiver(order_updated)
+def count_order_updated(sender, order, old_canceled, **kwargs):
+    if order.canceled == old_canceled:
+        return
+    sign = 1 if order.canceled else -1
+    add_to_dashboard(
+        order,
+        canceled=sign,
+        revenue=-sign * order_revenue(order),
+        **{order.status: -sign},
+    )
+
+
+@receiver(order_status_changed)
+def count_order_status_changed(sender, order, old_status, **kwargs):
+    if not order.canceled and order.status != old_status:
+        add_to_dashboard(order, **{old_status: -1, order.status: 1})
+
+
+def dashboard(day):
+    counter = (
+        DashboardCounter.objects.filter(day=day)
+        .values(*COUNT_FIELDS, "revenue")
+        .first()
+    ) or dict.fromkeys((*COUNT_FIELDS, "revenue"), 0)
+    return {
+        "day": day,
+        "orders": counter["orders"],
+        "orders_by_status": {status: counter[status] for status in STATUS_FIELDS},
+        "canceled": counter["canceled"],
+        "revenue": counter["revenue"],
+    }
+
+
+def dashboard_counts(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = start + timedelta(days=1)
+    counts = dict.fromkeys(COUNT_FIELDS, 0)
+    counts["revenue"] = 0
+    for order_model, item_model in (
+        (Order, OrderItem),
+        (ArchivedOrder, ArchivedOrderItem),
+    ):
+        orders = order_model.objects.filter(
+            date_created__gte=start, date_created__lt=end
+        )
+        rows = orders.values("status", "canceled").annotate(count=Count("id"))
+        for row in rows:
+            counts["orders"] += row["count"]
+            counts["canceled" if row["canceled"] else row["status"]] += row["count"]
+        revenue = item_model.objects.filter(
+            order__in=orders.filter(canceled=False)
+        ).aggregate(
+            total=Sum(
+                LINE_TOTAL, output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+        )[
+            "total"
+        ]
+        counts["revenue"] += revenue or 0
+    return counts
+
+
+def reconcile_dashboard(days=2):
+    """
+    Recompute the counters of the last `days` days (today included) from
+    the orders and fix the ones that drifted. Yields (day, {field: drift})
+    for every day. The counter row stays locked while it is recomputed, so
+    the orders changing meanwhile are counted exactly once.
+    """
+    today = timezone.localdate()
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        with transaction.atomic():
+            counter, _ = DashboardCounter.objects.select_for_update().get_or_create(
+                day=day
+            )
+            drift = {}
+            for field, value in dashboard_counts(day).items():
+                if value != getattr(counter, field):
+                    drift[field] = value - getattr(counter, field)
+                    setattr(counter, field, value)
+            if drift:
+                counter.save()
+        yield day, drift
@@ -0,0 +1,8 @@
+def raw_delete(queryset):
+    """
+    Delete the rows of `queryset` with a single DELETE statement and return
+    how many were deleted. Unlike `QuerySet.delete()` nothing is loaded into
+    Python: no cascade collection and no delete signals, so callers delete
+    the rows referencing these first.
+    """
+    return queryset._raw_delete(queryset.db)
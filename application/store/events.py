@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import OrderEvent
+from .signals import (
+    order_placed,
+    order_item_added,
+    order_item_updated,
+    order_item_removed,
+    order_updated,
+    order_status_changed,
+)
+
+EVENT_FIELDS = ("seq", "order_id", "type", "payload", "date_created")
+
+
+def order_item_payload(order_item):
+    return {
+        "id": order_item.id,
+        "item_id": order_item.item_id,
+        "name": order_item.name,
+        "price": order_item.price,
+        "quantity": order_item.quantity,
+        "discount": order_item.discount,
+    }
+
+
+def record_order_event(order, type, payload):
+    return OrderEvent.objects.create(order_id=order.id, type=type, payload=payload)
+
+
+@receiver(order_placed)
+def record_order_placed(sender, order, order_items, **kwargs):
+    payload = {
+        "location": order.location,
+        "status": order.status,
+        "order_items": [order_item_payload(order_item) for order_item in order_items],
+    }
+    record_order_event(order, OrderEvent.ORDER_PLACED, payload)
+
+
+@receiver(order_item_added)
+def record_order_item_added(sender, order, order_item, **kwargs):
+    payload = {"order_item": order_item_payload(order_item)}
+    record_order_event(order, OrderEvent.ORDER_ITEM_ADDED, payload)
+
+
+@receiver(order_item_updated)
+def record_order_item_updated(sender, order, order_item, old_quantity, **kwargs):
+    payload = {
+        "order_item": order_item_payload(order_item),
+        "old_quantity": old_quantity,
+    }
+    record_order_event(order, OrderEvent.ORDER_ITEM_UPDATED, payload)
+
+
+@receiver(order_item_removed)
+def record_order_item_removed(sender, order, order_item, **kwargs):
+    payload = {"order_item": order_item_payload(order_item)}
+    record_order_event(order, OrderEvent.ORDER_ITEM_REMOVED, payload)
+
+
+@receiver(order_updated)
+def record_order_updated(sender, order, old_location, old_canceled, **kwargs):
+    if order.location == old_location and order.canceled == old_canceled:
+        return
+    payload = {
+        "location": order.location,
+        "canceled": order.canceled,
+        "old_location": old_location,
+        "old_canceled": old_canceled,
+    }
+    record_order_event(order, OrderEvent.ORDER_UPDATED, payload)
+
+
+@receiver(order_status_changed)
+def record_order_status_changed(sender, order, old_status, **kwargs):
+    payload = {"status": order.status, "old_status": old_status}
+    record_order_event(order, OrderEvent.ORDER_STATUS_CHANGED, payload)
+
+
+def visible_order_events(after=0):
+    """
+    Events with a sequence number greater than `after`. Events younger than
+    ORDER_EVENTS_FEED_DELAY are held back: sequence numbers are assigned at
+    insert time, so on databases with concurrent writers a transaction that
+    commits late could otherwise add an event behind a consumer's cursor.
+
+    The delay is a heuristic: date_created is also set at insert time, so an
+    event whose transaction stays open longer than the delay can still commit
+    behind a cursor, and consumers of the feed never see it.
+    """
+    events = OrderEvent.objects.filter(seq__gt=after)
+    if settings.ORDER_EVENTS_FEED_DELAY:
+        visible_before = timezone.now() - settings.ORDER_EVENTS_FEED_DELAY
+        events = events.filter(date_created__lte=visible_before)
+    return events.order_by("seq")
+
+
+def order_events_page(after=0, limit=100):
+    events = list(visible_order_events(after).values(*EVENT_FIELDS)[: limit + 1])
+    has_more = len(events) > limit
+    events = events[:limit]
+    return {
+        "results": events,
+        "next": events[-1]["seq"] if events else after,
+        "has_more": has_more,
+    }
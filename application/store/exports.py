@@ -0,0 +1,96 @@
+import csv
+import json
+from datetime import datetime, time
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from .models import OrderItem, ArchivedOrderItem
+
+# Order lines joined with their order, live and archived, streamed row by
+# row: `.iterator()` fetches `chunk_size` rows at a time (through a
+# server-side cursor on PostgreSQL) and the formatters yield one line per
+# row, so memory does not grow with the size of the export.
+
+EXPORT_COLUMNS = (
+    "order_id",
+    "customer_id",
+    "location",
+    "status",
+    "canceled",
+    "date_created",
+    "item_id",
+    "name",
+    "price",
+    "quantity",
+    "discount",
+    "total",
+    "archived",
+)
+EXPORT_FIELDS = (
+    "order_id",
+    "order__customer_id",
+    "order__location",
+    "order__status",
+    "order__canceled",
+    "order__date_created",
+    "item_id",
+    "name",
+    "price",
+    "quantity",
+    "discount",
+)
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_rows(start, end, status=None, location=None, chunk_size=2000):
+    """
+    Yield one tuple of EXPORT_COLUMNS per order line of the orders placed
+    between the `start` and `end` dates (inclusive), ordered by order id.
+    """
+    filters = {
+        "order__date_created__range": (
+            timezone.make_aware(datetime.combine(start, time.min)),
+            timezone.make_aware(datetime.combine(end, time.max)),
+        )
+    }
+    if status:
+        filters["order__status"] = status
+    if location:
+        filters["order__location"] = location
+    for archived, model in ((False, OrderItem), (True, ArchivedOrderItem)):
+        rows = (
+            model.objects.filter(**filters)
+            .order_by("order_id", "id")
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        for row in rows:
+            price, quantity, discount = row[-3:]
+            yield (*row, price * quantity - discount, archived)
+
+
+class Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_lines(rows, export_format):
+    if export_format == "ndjson":
+        return ndjson_lines(rows)
+    return csv_lines(rows)
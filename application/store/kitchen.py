@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .models import Order, KitchenQueue
+from .prep_stats import preparation_estimate
+from .rollups import add_to_rollup
+from .signals import order_placed, order_updated, order_status_changed
+
+# The kitchen queue of a location holds its orders that are waiting or in
+# preparation and not canceled.
+QUEUED_STATUSES = (Order.WAITING, Order.PREPARATION)
+
+
+class KitchenSaturated(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The kitchen is at capacity, please try again later."
+    default_code = "kitchen_saturated"
+
+    def __init__(self, wait):
+        super().__init__()
+        # Sent back as the Retry-After header by DRF's exception handler
+        self.wait = wait
+
+
+def is_queued(status, canceled):
+    return status in QUEUED_STATUSES and not canceled
+
+
+def add_to_queue(location, depth):
+    if depth:
+        add_to_rollup(KitchenQueue, {"location": location}, depth=depth)
+
+
+def move_in_queue(old_location, was_queued, location, queued):
+    if old_location == location:
+        add_to_queue(location, int(queued) - int(was_queued))
+    else:
+        add_to_queue(old_location, -int(was_queued))
+        add_to_queue(location, int(queued))
+
+
+def queue_depth(location):
+    depth = (
+        KitchenQueue.objects.filter(location=location)
+        .values_list("depth", flat=True)
+        .first()
+    )
+    return depth or 0
+
+
+def estimated_wait(depth):
+    return depth * settings.KITCHEN_SECONDS_PER_ORDER
+
+
+def order_estimated_wait(order, item_ids):
+    """
+    Seconds until the order is likely to be ready, 0 once out of the queue.
+    Its own preparation time comes from the preparation statistics of the
+    variations `item_ids` of its lines. A waiting order also waits for the
+    orders ahead of it at the same location, KITCHEN_SECONDS_PER_ORDER each,
+    counted on the (location, status) index.
+    """
+    if not is_queued(order.status, order.canceled):
+        return 0
+    preparation = preparation_estimate(item_ids)
+    if preparation is None:
+        preparation = settings.KITCHEN_SECONDS_PER_ORDER
+    if order.status == Order.PREPARATION:
+        started = order.date_preparation or order.date_created
+        elapsed = (timezone.now() - started).total_seconds()
+        return max(round(preparation - elapsed), 0)
+    ahead = Order.objects.filter(
+        location=order.location,
+        status__in=QUEUED_STATUSES,
+        canceled=False,
+        id__lt=order.pk,
+    ).count()
+    return estimated_wait(ahead) + round(preparation)
+
+
+def check_admission(location):
+    """
+    Reject a new order with KitchenSaturated when the queue of `location` has
+    reached its KITCHEN_QUEUE_LIMITS entry, with a Retry-After of the time it
+    takes to work the queue back under the limit.
+
+    This is a soft limit: the depth is read before the order is inserted,
+    without a lock, so concurrent requests can all be admitted and push the
+    queue past the limit by up to the number of requests in flight.
+    """
+    limit = settings.KITCHEN_QUEUE_LIMITS.get(location)
+    if limit is None:
+        return
+    depth = queue_depth(location)
+    if depth >= limit:
+        raise KitchenSaturated(wait=estimated_wait(depth - limit + 1))
+
+
+@receiver(order_placed)
+def queue_order_placed(sender, order, order_items, **kwargs):
+    if is_queued(order.status, order.canceled):
+        add_to_queue(order.location, 1)
+
+
+@receiver(order_updated)
+def queue_order_updated(sender, order, old_location, old_canceled, **kwargs):
+    move_in_queue(
+        old_location,
+        is_queued(order.status, old_canceled),
+        order.location,
+        is_queued(order.status, order.canceled),
+    )
+
+
+@receiver(order_status_changed)
+def queue_order_status_changed(sender, order, old_status, **kwargs):
+    move_in_queue(
+        order.location,
+        is_queued(old_status, order.canceled),
+        order.location,
+        is_queued(order.status, order.canceled),
+    )
+
+
+def rebuild_kitchen_queues():
+    # Recount the queues from the live orders, in case the counters drifted
+    with transaction.atomic():
+        KitchenQueue.objects.all().delete()
+        rows = (
+            Order.objects.filter(status__in=QUEUED_STATUSES, canceled=False)
+            .values("location")
+            .annotate(depth_count=Count("id"))
+        )
+        KitchenQueue.objects.bulk_create(
+            KitchenQueue(location=row["location"], depth=row["depth_count"])
+            for row in rows
+        )
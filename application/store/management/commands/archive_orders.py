@@ -0,0 +1,40 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from ...archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = "Move delivered and canceled orders out of the live order tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            help="Archive orders not updated for this many days "
+            "(defaults to settings.ORDER_ARCHIVE_AFTER).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Orders moved per transaction "
+            "(defaults to settings.ORDER_ARCHIVE_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Stop after this many batches, to run the archive incrementally.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = None
+        if options["older_than_days"] is not None:
+            older_than = timedelta(days=options["older_than_days"])
+        total = 0
+        for archived in archive_orders(
+            older_than=older_than,
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        ):
+            total += archived
+            self.stdout.write(f"Archived {archived} orders ({total} total)")
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} orders archived"))
@@ -0,0 +1,43 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...webhooks import WebhookClient, dispatch_webhooks
+
+
+class Command(BaseCommand):
+    help = "Deliver order events to the registered webhook endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.WEBHOOK_BATCH_SIZE,
+            help="Events posted per request.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.WEBHOOK_POLL_INTERVAL,
+            help="Seconds to wait for new events once the backlog is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the backlog is drained instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        client = WebhookClient()
+        try:
+            while True:
+                delivered = dispatch_webhooks(client, options["batch_size"])
+                if delivered:
+                    self.stdout.write(f"Delivered {delivered} events")
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.close()
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from ...exports import export_lines, export_rows
+from ...models import Order
+
+
+class Command(BaseCommand):
+    help = "Stream the order lines of a date range as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", help="First day (YYYY-MM-DD), the 1st of the end month."
+        )
+        parser.add_argument("--end", help="Last day (YYYY-MM-DD), today by default.")
+        parser.add_argument(
+            "--status", choices=[status for status, _ in Order.STATUS_CHOICES]
+        )
+        parser.add_argument(
+            "--location", choices=[location for location, _ in Order.LOCATION_CHOICES]
+        )
+        parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+        parser.add_argument(
+            "--output", help="File to write to, standard output by default."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database at a time.",
+        )
+
+    def parse_day(self, value, name):
+        day = parse_date(value) if value else None
+        if value and day is None:
+            raise CommandError(f"Invalid --{name} date: {value}")
+        return day
+
+    def handle(self, *args, **options):
+        end = self.parse_day(options["end"], "end") or timezone.localdate()
+        start = self.parse_day(options["start"], "start") or end.replace(day=1)
+        rows = export_rows(
+            start,
+            end,
+            status=options["status"],
+            location=options["location"],
+            chunk_size=options["chunk_size"],
+        )
+        lines = export_lines(rows, options["format"])
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from application.schema import SCHEMA_CONTENT_TYPES, write_frozen_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema files served by the swagger endpoints."
+
+    def handle(self, *args, **options):
+        for format in SCHEMA_CONTENT_TYPES:
+            path = write_frozen_schema(format)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
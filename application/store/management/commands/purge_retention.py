@@ -0,0 +1,49 @@
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand
+from ...retention import purge_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete orders, order events, inactive customers and blacklisted "
+        "tokens past their retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Rows deleted per transaction "
+            "(defaults to settings.RETENTION_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches, to spread the load.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        totals = Counter()
+        purges = purge_retention(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        for name, count in purges:
+            totals[name] += count
+            if options["dry_run"]:
+                self.stdout.write(f"Would purge {count} {name}")
+                continue
+            self.stdout.write(f"Purged {count} {name} ({totals[name]} total)")
+            if options["pause"]:
+                time.sleep(options["pause"])
+        if not options["dry_run"]:
+            summary = ", ".join(f"{count} {name}" for name, count in totals.items())
+            self.stdout.write(
+                self.style.SUCCESS(f"Done, {summary or 'nothing'} purged")
+            )
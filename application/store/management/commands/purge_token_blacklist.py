@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from ...tokens import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired entries from the refresh token blacklist."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tokens deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for deleted in purge_expired_tokens(batch_size=options["batch_size"]):
+            total += deleted
+            self.stdout.write(f"Purged {deleted} tokens ({total} total)")
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} tokens purged"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from ...kitchen import rebuild_kitchen_queues
+
+
+class Command(BaseCommand):
+    help = "Recount the kitchen queue of every location from the live orders."
+
+    def handle(self, *args, **options):
+        rebuild_kitchen_queues()
+        self.stdout.write(self.style.SUCCESS("Done, kitchen queues recounted"))
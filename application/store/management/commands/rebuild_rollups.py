@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from ...rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the sales rollup tables from the order history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Orders aggregated per batch.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for processed in rebuild_rollups(batch_size=options["batch_size"]):
+            total += processed
+            self.stdout.write(f"Rolled up {total} orders")
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} orders rolled up"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from ...dashboard import reconcile_dashboard
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard counters of the last days from the orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=2,
+            help="Number of days to reconcile, today included.",
+        )
+
+    def handle(self, *args, **options):
+        fixed = 0
+        for day, drift in reconcile_dashboard(days=options["days"]):
+            if drift:
+                fixed += 1
+                changes = ", ".join(
+                    "{} {:+}".format(field, value) for field, value in drift.items()
+                )
+                self.stdout.write(f"{day}: fixed {changes}")
+            else:
+                self.stdout.write(f"{day}: up to date")
+        self.stdout.write(self.style.SUCCESS(f"Done, {fixed} days fixed"))
@@ -0,0 +1,137 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache_versions import (
+    cache_changed,
+    cache_generation,
+    check_cache_versions,
+    register_cache,
+)
+from .models import PriceSchedule, Product, ProductVariation
+from .schedules import get_price_timeline
+from .serializers.read_serializers import menu_representation
+
+TOKEN_RE = re.compile(r"\w+")
+MENU_CACHE = "menu"
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class MenuIndex:
+    """
+    In-memory search index over the active menu.
+
+    Every active variation is an entry, searchable by the prefixes of the
+    words of its product and variation names. Entries keep the menu order, so
+    results are grouped by product exactly like the menu endpoint. The index
+    is a snapshot of the menu until `valid_until`, the next scheduled price
+    change.
+    """
+
+    def __init__(self, menu, valid_until=None):
+        self.valid_until = valid_until
+        self.products = []
+        self.entries = []
+        self.prefixes = {}
+        for product in menu:
+            product_position = len(self.products)
+            self.products.append({"id": product["id"], "name": product["name"]})
+            for variation in product["variations"]:
+                position = len(self.entries)
+                self.entries.append((product_position, variation))
+                words = tokenize(product["name"]) + tokenize(variation["name"])
+                for word in words:
+                    for end in range(1, len(word) + 1):
+                        self.prefixes.setdefault(word[:end], set()).add(position)
+        self.by_price = sorted(
+            range(len(self.entries)), key=lambda position: self.price(position)
+        )
+        self.prices = [self.price(position) for position in self.by_price]
+
+    def is_stale(self):
+        return self.valid_until is not None and timezone.now() >= self.valid_until
+
+    def price(self, position):
+        return self.entries[position][1]["price"]
+
+    def price_range(self, min_price=None, max_price=None):
+        start = 0 if min_price is None else bisect_left(self.prices, min_price)
+        end = (
+            len(self.prices)
+            if max_price is None
+            else bisect_right(self.prices, max_price)
+        )
+        return self.by_price[start:end]
+
+    def search(self, query="", min_price=None, max_price=None):
+        words = tokenize(query)
+        if words:
+            matches = sorted(
+                (self.prefixes.get(word, set()) for word in words), key=len
+            )
+            positions = set.intersection(*matches)
+            if min_price is not None or max_price is not None:
+                positions = [
+                    position
+                    for position in positions
+                    if (min_price is None or self.price(position) >= min_price)
+                    and (max_price is None or self.price(position) <= max_price)
+                ]
+        else:
+            positions = self.price_range(min_price, max_price)
+
+        results = []
+        last_product = None
+        for position in sorted(positions):
+            product_position, variation = self.entries[position]
+            if product_position != last_product:
+                last_product = product_position
+                results.append(dict(self.products[product_position], variations=[]))
+            results[-1]["variations"].append(variation)
+        return results
+
+
+_menu_index = None
+_menu_index_lock = threading.Lock()
+
+
+def get_menu_index():
+    global _menu_index
+    check_cache_versions()
+    menu_index = _menu_index
+    if menu_index is None or menu_index.is_stale():
+        with _menu_index_lock:
+            if _menu_index is None or _menu_index.is_stale():
+                generation = cache_generation(MENU_CACHE)
+                now = timezone.now()
+                menu_index = MenuIndex(
+                    menu_representation(now), get_price_timeline().next_boundary(now)
+                )
+                if cache_generation(MENU_CACHE) == generation:
+                    _menu_index = menu_index
+            else:
+                menu_index = _menu_index
+    return menu_index
+
+
+def invalidate_menu_index():
+    global _menu_index
+    _menu_index = None
+
+
+register_cache(MENU_CACHE, invalidate_menu_index)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductVariation)
+@receiver(post_delete, sender=ProductVariation)
+@receiver(post_save, sender=PriceSchedule)
+@receiver(post_delete, sender=PriceSchedule)
+def invalidate_menu_index_on_change(sender, **kwargs):
+    cache_changed(MENU_CACHE)
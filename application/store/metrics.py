@@ -0,0 +1,110 @@
+import time
+from contextlib import contextmanager
+from django.db import transaction
+from django.dispatch import receiver
+from ..metrics import registry
+from .models import KitchenQueue
+from .signals import (
+    order_placed,
+    order_item_added,
+    order_item_updated,
+    order_item_removed,
+    order_updated,
+    order_status_changed,
+)
+
+# Order flow metrics. They are recorded once the mutating transaction
+# commits, so rolled back requests are not counted.
+
+STATUS_BUCKETS = (30, 60, 120, 300, 600, 900, 1800, 3600, 7200)
+
+orders_placed = registry.counter(
+    "coffeeshop_orders_placed_total", "Orders placed.", ["location"]
+)
+orders_canceled = registry.counter(
+    "coffeeshop_orders_canceled_total", "Orders canceled.", ["location"]
+)
+order_item_changes = registry.counter(
+    "coffeeshop_order_item_changes_total",
+    "Items added to, updated in or removed from placed orders.",
+    ["action"],
+)
+order_status_changes = registry.counter(
+    "coffeeshop_order_status_changes_total",
+    "Order status changes, by new status.",
+    ["status"],
+)
+order_status_seconds = registry.histogram(
+    "coffeeshop_order_status_seconds",
+    "Time orders spent in a status before moving to the next one.",
+    ["status"],
+    buckets=STATUS_BUCKETS,
+)
+email_send_seconds = registry.histogram(
+    "coffeeshop_email_send_seconds",
+    "Time spent sending notification emails, by outcome.",
+    ["outcome"],
+)
+registry.gauge(
+    "coffeeshop_kitchen_queue_depth",
+    "Orders waiting or in preparation, by location.",
+    ["location"],
+)
+
+
+@registry.add_collector
+def collect_kitchen_queues():
+    for location, depth in KitchenQueue.objects.values_list("location", "depth"):
+        yield "coffeeshop_kitchen_queue_depth", {"location": location}, depth
+
+
+@contextmanager
+def email_timer():
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "sent"
+    finally:
+        email_send_seconds.observe(time.perf_counter() - started, outcome=outcome)
+
+
+def on_commit(metric, *args, **labels):
+    transaction.on_commit(lambda: metric(*args, **labels))
+
+
+@receiver(order_placed)
+def count_order_placed(sender, order, order_items, **kwargs):
+    on_commit(orders_placed.inc, location=order.location)
+
+
+@receiver(order_item_added)
+def count_order_item_added(sender, order, order_item, **kwargs):
+    on_commit(order_item_changes.inc, action="added")
+
+
+@receiver(order_item_updated)
+def count_order_item_updated(sender, order, order_item, old_quantity, **kwargs):
+    on_commit(order_item_changes.inc, action="updated")
+
+
+@receiver(order_item_removed)
+def count_order_item_removed(sender, order, order_item, **kwargs):
+    on_commit(order_item_changes.inc, action="removed")
+
+
+@receiver(order_updated)
+def count_order_updated(sender, order, old_location, old_canceled, **kwargs):
+    if order.canceled and not old_canceled:
+        on_commit(orders_canceled.inc, location=order.location)
+
+
+@receiver(order_status_changed)
+def time_order_status(sender, order, old_status, old_date_status_changed, **kwargs):
+    if order.status == old_status:
+        return
+    # date_status_changed is set by UpdateOrderStatusSerializer
+    entered = old_date_status_changed or order.date_created
+    seconds = (order.date_status_changed - entered).total_seconds()
+    on_commit(order_status_seconds.observe, seconds, status=old_status)
+    on_commit(order_status_changes.inc, status=order.status)
@@ -0,0 +1,76 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0002_auto_20230624_0149"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedOrder",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "location",
+                    models.CharField(
+                        choices=[("in_house", "In House"), ("take_away", "Take Away")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("waiting", "Waiting"),
+                            ("preparation", "Preparation"),
+                            ("ready", "Ready"),
+                            ("delivered", "Delivered"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("canceled", models.BooleanField(default=False)),
+                ("date_created", models.DateTimeField()),
+                ("date_updated", models.DateTimeField()),
+                ("date_archived", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrderItem",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("quantity", models.PositiveIntegerField()),
+                ("item_id", models.IntegerField()),
+                ("date_created", models.DateTimeField()),
+                ("date_updated", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["date_updated"], name="store_order_date_up_04517f_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedorderitem",
+            name="order",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="order_items",
+                to="store.archivedorder",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedorder",
+            name="customer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="store.customer"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0003_order_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "location",
+                    models.CharField(
+                        choices=[("in_house", "In House"), ("take_away", "Take Away")],
+                        max_length=20,
+                    ),
+                ),
+                ("orders", models.IntegerField(default=0)),
+                ("canceled", models.IntegerField(default=0)),
+                ("delivered", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("item_id", models.IntegerField()),
+                (
+                    "location",
+                    models.CharField(
+                        choices=[("in_house", "In House"), ("take_away", "Take Away")],
+                        max_length=20,
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("quantity", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="salesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "item_id", "location"), name="unique_sales_rollup"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="orderrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "location"), name="unique_order_rollup"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0004_sales_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productvariation",
+            name="stock",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0005_variation_stock"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlacklistedToken",
+            fields=[
+                ("jti", models.UUIDField(primary_key=True, serialize=False)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
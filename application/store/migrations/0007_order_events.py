@@ -0,0 +1,41 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:50
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0006_blacklisted_token"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderEvent",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                ("order_id", models.BigIntegerField(db_index=True)),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("order_placed", "Order placed"),
+                            ("order_item_added", "Order item added"),
+                            ("order_item_updated", "Order item updated"),
+                            ("order_item_removed", "Order item removed"),
+                            ("order_updated", "Order updated"),
+                            ("order_status_changed", "Order status changed"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0008_webhook_endpoints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KitchenQueue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "location",
+                    models.CharField(
+                        choices=[("in_house", "In House"), ("take_away", "Take Away")],
+                        max_length=20,
+                        unique=True,
+                    ),
+                ),
+                ("depth", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0009_kitchen_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PreparationStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("item_id", models.IntegerField(unique=True)),
+                ("count", models.IntegerField(default=0)),
+                ("mean", models.FloatField(default=0)),
+                ("m2", models.FloatField(default=0)),
+                ("p50", models.JSONField(blank=True, null=True)),
+                ("p90", models.JSONField(blank=True, null=True)),
+                ("date_updated", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="date_preparation",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["location", "status"], name="store_order_locatio_4ee8db_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0010_preparation_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PickupSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("starts_at", models.DateTimeField(unique=True)),
+                ("capacity", models.PositiveIntegerField()),
+                ("reserved", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivedorder",
+            name="pickup_slot_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="pickupslot",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("reserved__lte", django.db.models.expressions.F("capacity"))
+                ),
+                name="pickup_slot_within_capacity",
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="pickup_slot",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="store.pickupslot",
+            ),
+        ),
+    ]
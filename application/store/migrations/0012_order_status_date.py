@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0011_pickup_slots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="date_status_changed",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0012_order_status_date"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orderevent",
+            name="date_created",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["date_updated"], name="store_archi_date_up_28dbc6_idx"
+            ),
+        ),
+    ]
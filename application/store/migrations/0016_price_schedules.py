@@ -0,0 +1,54 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:23
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0015_promotions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceSchedule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_time", models.TimeField()),
+                (
+                    "price",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        validators=[django.core.validators.MinValueValidator(0.0)],
+                    ),
+                ),
+                ("active", models.BooleanField(default=True)),
+                (
+                    "variation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_schedule",
+                        to="store.productvariation",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="priceschedule",
+            constraint=models.UniqueConstraint(
+                fields=("variation", "start_time"), name="unique_price_schedule"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0016_price_schedules"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="client_id",
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0017_order_client_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("orders", models.IntegerField(default=0)),
+                ("waiting", models.IntegerField(default=0)),
+                ("preparation", models.IntegerField(default=0)),
+                ("ready", models.IntegerField(default=0)),
+                ("delivered", models.IntegerField(default=0)),
+                ("canceled", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["date_created"], name="store_archi_date_cr_39ae7d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["date_created"], name="store_order_date_cr_ca06e1_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("store", "0018_dashboard_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "date_created"],
+                name="store_order_custome_4e8b22_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="customer",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="store.customer",
+            ),
+        ),
+        # auth.User belongs to another app, so its functional index for the
+        # case-insensitive email search is created with plain SQL.
+        migrations.RunSQL(
+            "CREATE INDEX store_auth_user_email_lower_idx ON auth_user (LOWER(email))",
+            reverse_sql="DROP INDEX store_auth_user_email_lower_idx",
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0019_order_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("namespace", models.CharField(max_length=50, unique=True)),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:45
+
+import application.store.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0020_cache_versions"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="date_created",
+            field=models.DateTimeField(
+                default=application.store.models.now, editable=False
+            ),
+        ),
+    ]
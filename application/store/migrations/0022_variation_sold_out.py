@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0021_order_date_created_default"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productvariation",
+            name="sold_out",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0022_variation_sold_out"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedorder",
+            name="client_id",
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="archivedorder",
+            name="promo_code",
+            field=models.CharField(blank=True, default="", max_length=30),
+        ),
+    ]
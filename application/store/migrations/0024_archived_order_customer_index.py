@@ -0,0 +1,29 @@
+# Generated by Django 4.0.4 on 2026-10-19 14:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0023_archived_order_client_id"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivedorder",
+            name="customer",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="store.customer",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(
+                fields=["customer", "date_created"],
+                name="store_archi_custome_30e9b7_idx",
+            ),
+        ),
+    ]
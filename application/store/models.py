@@ -1,6 +1,14 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+
+def now():
+    # Looked up on every call like auto_now_add does, so that patching
+    # timezone.now also moves the creation dates
+    return timezone.now()
 
 
 class Customer(models.Model):
@@ -29,9 +37,92 @@ class ProductVariation(models.Model):
         max_digits=10, decimal_places=2, validators=[MinValueValidator(0.0)]
     )
     active = models.BooleanField(default=True)
+    # Units left to sell, stock is not tracked when null
+    stock = models.PositiveIntegerField(null=True, blank=True)
+    # Deactivated because its stock ran out rather than by an admin, so it is
+    # reactivated when stock comes back
+    sold_out = models.BooleanField(default=False)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+
+class PriceSchedule(models.Model):
+    # From start_time every day (local time) until the next entry of the
+    # variation, the variation sells at `price` (its own price when null) and
+    # is on the menu only if `active`
+    variation = models.ForeignKey(
+        ProductVariation, on_delete=models.CASCADE, related_name="price_schedule"
+    )
+    start_time = models.TimeField()
+    price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0.0)],
+    )
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["variation", "start_time"], name="unique_price_schedule"
+            )
+        ]
+
+
+class Promotion(models.Model):
+    PERCENT_OFF = "percent_off"
+    AMOUNT_OFF = "amount_off"
+    FIXED_PRICE = "fixed_price"
+    KIND_CHOICES = [
+        (PERCENT_OFF, "Percent off"),
+        (AMOUNT_OFF, "Amount off"),
+        (FIXED_PRICE, "Fixed price"),
+    ]
+
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.DecimalField(
+        max_digits=10, decimal_places=2, validators=[MinValueValidator(0.0)]
+    )
+    # Variation ids the promotion applies to, empty means all of them
+    item_ids = models.JSONField(default=list, blank=True)
+    # Only every nth unit of a line is discounted (2 for "second drink half off")
+    every_nth = models.PositiveSmallIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(2)]
+    )
+    # Orders must carry the code to get the promotion, blank applies to all
+    code = models.CharField(max_length=30, blank=True, default="", db_index=True)
+    # Daily window (happy hour), in local time, wrapping midnight when
+    # end_time is before start_time
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
+    active = models.BooleanField(default=True)
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    def __str__(self):
+        return self.name
+
+
+class PickupSlot(models.Model):
+    starts_at = models.DateTimeField(unique=True)
+    # Drinks that can be prepared for the slot, and drinks already booked.
+    # reserved only changes through conditional UPDATEs, see slots.py
+    capacity = models.PositiveIntegerField()
+    reserved = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(reserved__lte=models.F("capacity")),
+                name="pickup_slot_within_capacity",
+            )
+        ]
+
 
 class Order(models.Model):
     LOCATION_CHOICES = [
@@ -49,12 +140,34 @@ class Order(models.Model):
         (DELIVERED, "Delivered"),
     ]
 
-    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    # Indexed by the (customer, date_created) index below
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, db_index=False)
     location = models.CharField(max_length=20, choices=LOCATION_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="waiting")
     canceled = models.BooleanField(null=False, default=False)
-    date_created = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so orders uploaded by the point of sale tablets keep
+    # the time they were taken at
+    date_created = models.DateTimeField(default=now, editable=False)
     date_updated = models.DateTimeField(auto_now=True)
+    # When the order moved to preparation, the start of its preparation time
+    date_preparation = models.DateTimeField(null=True, blank=True)
+    # When the order entered its current status, null while still waiting
+    date_status_changed = models.DateTimeField(null=True, blank=True)
+    pickup_slot = models.ForeignKey(
+        PickupSlot, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    promo_code = models.CharField(max_length=30, blank=True, default="")
+    # Set by the point of sale tablets uploading orders taken offline, so an
+    # upload can be retried without duplicating them
+    client_id = models.UUIDField(null=True, blank=True, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date_created"]),
+            models.Index(fields=["date_updated"]),
+            models.Index(fields=["location", "status"]),
+            models.Index(fields=["customer", "date_created"]),
+        ]
 
 
 class OrderItem(models.Model):
@@ -67,5 +180,183 @@ class OrderItem(models.Model):
     )
     quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
     item_id = models.IntegerField(null=False)
+    # Promotion discount on the whole line, its total is price * quantity - discount
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
+
+
+class Favorite(models.Model):
+    customer = models.ForeignKey(
+        Customer, on_delete=models.CASCADE, related_name="favorites"
+    )
+    # Variation id, like OrderItem.item_id: favorites of variations that are
+    # no longer on the menu are skipped when ordered
+    item_id = models.IntegerField()
+    quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "item_id"], name="unique_favorite"
+            )
+        ]
+
+
+class ArchivedOrder(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # Indexed by the (customer, date_created) index below
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, db_index=False)
+    location = models.CharField(max_length=20, choices=Order.LOCATION_CHOICES)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    canceled = models.BooleanField(null=False, default=False)
+    date_created = models.DateTimeField()
+    date_updated = models.DateTimeField()
+    date_archived = models.DateTimeField(auto_now_add=True)
+    pickup_slot_id = models.BigIntegerField(null=True, blank=True)
+    promo_code = models.CharField(max_length=30, blank=True, default="")
+    # Kept so retried point of sale uploads still find the archived orders
+    client_id = models.UUIDField(null=True, blank=True, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date_created"]),
+            models.Index(fields=["date_updated"]),
+            models.Index(fields=["customer", "date_created"]),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="order_items"
+    )
+    name = models.CharField(max_length=100)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+    item_id = models.IntegerField(null=False)
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    date_created = models.DateTimeField()
+    date_updated = models.DateTimeField()
+
+
+class SalesRollup(models.Model):
+    day = models.DateField()
+    item_id = models.IntegerField()
+    location = models.CharField(max_length=20, choices=Order.LOCATION_CHOICES)
+    name = models.CharField(max_length=100)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "item_id", "location"], name="unique_sales_rollup"
+            )
+        ]
+
+
+class OrderRollup(models.Model):
+    day = models.DateField()
+    location = models.CharField(max_length=20, choices=Order.LOCATION_CHOICES)
+    orders = models.IntegerField(default=0)
+    canceled = models.IntegerField(default=0)
+    delivered = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "location"], name="unique_order_rollup"
+            )
+        ]
+
+
+class DashboardCounter(models.Model):
+    # Figures of the orders placed on `day`, kept up to date by the order
+    # signals and reconciled by manage.py reconcile_dashboard. The status
+    # counters only count the orders that are not canceled.
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    waiting = models.IntegerField(default=0)
+    preparation = models.IntegerField(default=0)
+    ready = models.IntegerField(default=0)
+    delivered = models.IntegerField(default=0)
+    canceled = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+
+class CacheVersion(models.Model):
+    # Bumped on every change of the data behind an in-process cache, see
+    # application/store/cache_versions.py
+    namespace = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+
+
+class BlacklistedToken(models.Model):
+    # Only the token id and its expiry are kept, rows are purged once expired
+    jti = models.UUIDField(primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+
+class OrderEvent(models.Model):
+    ORDER_PLACED = "order_placed"
+    ORDER_ITEM_ADDED = "order_item_added"
+    ORDER_ITEM_UPDATED = "order_item_updated"
+    ORDER_ITEM_REMOVED = "order_item_removed"
+    ORDER_UPDATED = "order_updated"
+    ORDER_STATUS_CHANGED = "order_status_changed"
+    TYPE_CHOICES = [
+        (ORDER_PLACED, "Order placed"),
+        (ORDER_ITEM_ADDED, "Order item added"),
+        (ORDER_ITEM_UPDATED, "Order item updated"),
+        (ORDER_ITEM_REMOVED, "Order item removed"),
+        (ORDER_UPDATED, "Order updated"),
+        (ORDER_STATUS_CHANGED, "Order status changed"),
+    ]
+
+    # Append-only: seq increases with every event and is the feed cursor.
+    # order_id is not a foreign key so events outlive archived orders.
+    seq = models.BigAutoField(primary_key=True)
+    order_id = models.BigIntegerField(db_index=True)
+    type = models.CharField(max_length=30, choices=TYPE_CHOICES)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    date_created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class WebhookEndpoint(models.Model):
+    url = models.URLField()
+    # Order event types delivered to the endpoint, empty means all of them
+    event_types = models.JSONField(default=list, blank=True)
+    active = models.BooleanField(default=True)
+    # Sequence number of the last OrderEvent delivered to the endpoint
+    last_seq = models.BigIntegerField(default=0)
+    failure_count = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.url
+
+
+class KitchenQueue(models.Model):
+    # Orders waiting or in preparation per location, maintained by the order
+    # signal receivers so admission control does not count orders per request
+    location = models.CharField(
+        max_length=20, choices=Order.LOCATION_CHOICES, unique=True
+    )
+    depth = models.IntegerField(default=0)
+
+
+class PreparationStats(models.Model):
+    # Streaming preparation time statistics (seconds) of a ProductVariation,
+    # updated as orders become ready. See sketches.py for the states.
+    item_id = models.IntegerField(unique=True)
+    count = models.IntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)
+    p50 = models.JSONField(null=True, blank=True)
+    p90 = models.JSONField(null=True, blank=True)
+    date_updated = models.DateTimeField(auto_now=True)
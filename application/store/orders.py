@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+from .models import Order, OrderItem, ProductVariation
+from .pricing import apply_promotions
+from .schedules import get_price_timeline
+from .signals import order_placed
+from .slots import reserve_slot
+from .stock import line_quantities, reserve_stock
+
+
+def order_item_name(variation):
+    if variation.name == "-":
+        return variation.product.name
+    return f"{variation.product.name} ({variation.name})"
+
+
+def is_available(variation, when=None):
+    # Whether `variation` (with its product) is on the menu at `when`
+    return (
+        variation.active
+        and variation.product.active
+        and get_price_timeline().is_active(variation.id, when or timezone.now())
+    )
+
+
+def available_variations(lines, when=None):
+    """
+    The variations on the menu at `when` (now by default) among `lines`, a
+    queryset of rows with `item_id` and `quantity` columns (order lines,
+    favorites...), annotated with the total quantity of their lines and with
+    their current price. A single query, whatever the number of lines.
+    """
+    when = when or timezone.now()
+    timeline = get_price_timeline()
+    quantities = (
+        lines.filter(item_id=OuterRef("pk"))
+        .order_by()
+        .values("item_id")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    variations = (
+        ProductVariation.objects.filter(
+            id__in=lines.values("item_id"), active=True, product__active=True
+        )
+        .annotate(quantity=Subquery(quantities))
+        .select_related("product")
+        .order_by("id")
+    )
+    available = []
+    for variation in variations:
+        if timeline.is_active(variation.id, when):
+            variation.price = timeline.price(variation.id, variation.price, when)
+            available.append(variation)
+    return available
+
+
+def place_order(order, order_items):
+    """
+    Save the new `order` with its `order_items` in one transaction, holding
+    their stock and pickup slot capacity and applying the promotions. Raises
+    OutOfStock or SlotUnavailable, leaving nothing behind, when they are not
+    available.
+    """
+    apply_promotions(order, order_items)
+    quantities = line_quantities(
+        (order_item.item_id, order_item.quantity) for order_item in order_items
+    )
+    with transaction.atomic():
+        reserve_stock(quantities)
+        reserve_slot(order.pickup_slot_id, sum(quantities.values()))
+        order.save()
+        OrderItem.objects.bulk_create(order_items)
+        order_placed.send(sender=Order, order=order, order_items=order_items)
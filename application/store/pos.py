@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from .models import ArchivedOrder, Order, OrderItem, ProductVariation
+from .orders import order_item_name
+from .pricing import apply_promotions
+from .schedules import current_price
+from .signals import order_placed
+from .stock import consume_stock, line_quantities
+
+# Orders taken offline by the point of sale tablets are uploaded in batches.
+# The variations of the whole batch are read with one query, then orders are
+# inserted chunk by chunk, one transaction and two bulk INSERTs per chunk.
+# Every order gets a result: "created", "duplicate" when its client_id was
+# already uploaded, or "invalid". The sales already happened at the counter:
+# the orders are dated and priced at the time they were taken at, created
+# delivered so they never enter the kitchen queue, and neither admission
+# control nor stock rejects them.
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+
+def ingest_orders(customer, orders, chunk_size=None):
+    """
+    Place `orders` (dicts with client_id, taken_at, location and order_items
+    lines of product_variation_id and quantity) for `customer`. Returns one
+    result per order, in the same order.
+    """
+    if chunk_size is None:
+        chunk_size = settings.POS_BULK_CHUNK_SIZE
+    variation_ids = {
+        line["product_variation_id"] for data in orders for line in data["order_items"]
+    }
+    variations = ProductVariation.objects.filter(id__in=variation_ids)
+    variations = {
+        variation.id: variation for variation in variations.select_related("product")
+    }
+    results = []
+    for start in range(0, len(orders), chunk_size):
+        chunk = orders[start : start + chunk_size]
+        try:
+            results.extend(ingest_chunk(customer, chunk, variations))
+        except IntegrityError:
+            # A concurrent upload of the same orders won the race, the retry
+            # reports them as duplicates
+            results.extend(ingest_chunk(customer, chunk, variations))
+    return results
+
+
+def ingest_chunk(customer, orders, variations):
+    client_ids = [data["client_id"] for data in orders]
+    # Uploaded orders may since have been moved to the archive
+    existing = dict(
+        Order.objects.filter(client_id__in=client_ids)
+        .values_list("client_id", "id")
+        .union(
+            ArchivedOrder.objects.filter(client_id__in=client_ids).values_list(
+                "client_id", "id"
+            )
+        )
+    )
+    results = []
+    placed = []
+    for data in orders:
+        client_id = data["client_id"]
+        result = {"client_id": client_id}
+        results.append(result)
+        if client_id in existing:
+            result.update(status=DUPLICATE, id=existing[client_id])
+            continue
+        lines = data["order_items"]
+        missing = [
+            str(line["product_variation_id"])
+            for line in lines
+            if line["product_variation_id"] not in variations
+        ]
+        if missing:
+            message = f"ProductVariation with id {', '.join(missing)} does not exist"
+            result.update(status=INVALID, error=message)
+            continue
+        taken_at = data["taken_at"]
+        order = Order(
+            customer=customer,
+            location=data["location"],
+            status=Order.DELIVERED,
+            date_created=taken_at,
+            client_id=client_id,
+        )
+        order_items = []
+        for line in lines:
+            variation = variations[line["product_variation_id"]]
+            order_items.append(
+                OrderItem(
+                    order=order,
+                    name=order_item_name(variation),
+                    price=current_price(variation, taken_at),
+                    quantity=line["quantity"],
+                    item_id=variation.id,
+                )
+            )
+        apply_promotions(order, order_items)
+        placed.append((order, order_items, result))
+
+    with transaction.atomic():
+        Order.objects.bulk_create([order for order, _, _ in placed])
+        all_items = []
+        for order, order_items, _ in placed:
+            for order_item in order_items:
+                # Picks up the primary key the order just got
+                order_item.order = order
+            all_items.extend(order_items)
+        OrderItem.objects.bulk_create(all_items)
+        consume_stock(
+            line_quantities(
+                (order_item.item_id, order_item.quantity) for order_item in all_items
+            )
+        )
+        for order, order_items, _ in placed:
+            order_placed.send(sender=Order, order=order, order_items=order_items)
+    for order, _, result in placed:
+        result.update(status=CREATED, id=order.id)
+    return results
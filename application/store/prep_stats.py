@@ -0,0 +1,109 @@
+import threading
+from django.db import transaction
+from django.dispatch import receiver
+from .cache_versions import (
+    cache_changed,
+    cache_generation,
+    check_cache_versions,
+    register_cache,
+)
+from .models import Order, OrderItem, PreparationStats
+from .signals import order_status_changed
+from .sketches import P2Quantile, running_stats_add
+
+# An order is prepared from the time it moves to preparation (or is placed,
+# when it skips that status) until it is ready. The whole duration counts as
+# an observation for every variation in the order, the kitchen prepares the
+# lines of an order together.
+
+PREPARATION_CACHE = "preparation"
+
+
+def record_preparation(item_ids, seconds):
+    with transaction.atomic():
+        for item_id in item_ids:
+            stats, _ = PreparationStats.objects.select_for_update().get_or_create(
+                item_id=item_id
+            )
+            state = {"count": stats.count, "mean": stats.mean, "m2": stats.m2}
+            running_stats_add(state, seconds)
+            stats.count, stats.mean, stats.m2 = (
+                state["count"],
+                state["mean"],
+                state["m2"],
+            )
+            for field, p in (("p50", 0.5), ("p90", 0.9)):
+                state = getattr(stats, field)
+                sketch = P2Quantile.from_state(state) if state else P2Quantile(p)
+                sketch.add(seconds)
+                setattr(stats, field, sketch.state())
+            stats.save()
+        cache_changed(PREPARATION_CACHE)
+
+
+def load_preparation_estimates():
+    return {
+        stats.item_id: P2Quantile.from_state(stats.p50).value() or stats.mean
+        for stats in PreparationStats.objects.all()
+    }
+
+
+_preparation_estimates = None
+_preparation_estimates_lock = threading.Lock()
+
+
+def get_preparation_estimates():
+    global _preparation_estimates
+    check_cache_versions()
+    estimates = _preparation_estimates
+    if estimates is None:
+        with _preparation_estimates_lock:
+            if _preparation_estimates is None:
+                generation = cache_generation(PREPARATION_CACHE)
+                estimates = load_preparation_estimates()
+                if cache_generation(PREPARATION_CACHE) == generation:
+                    _preparation_estimates = estimates
+            else:
+                estimates = _preparation_estimates
+    return estimates
+
+
+def invalidate_preparation_estimates():
+    global _preparation_estimates
+    _preparation_estimates = None
+
+
+register_cache(PREPARATION_CACHE, invalidate_preparation_estimates)
+
+
+def preparation_estimate(item_ids):
+    """
+    Median preparation time of the slowest of the given variations, None if
+    none of them has been prepared yet.
+    """
+    estimates = get_preparation_estimates()
+    return max(
+        (estimates[item_id] for item_id in item_ids if item_id in estimates),
+        default=None,
+    )
+
+
+@receiver(order_status_changed)
+def time_order_preparation(sender, order, old_status, **kwargs):
+    # date_preparation and date_status_changed are set by
+    # UpdateOrderStatusSerializer, in the same UPDATE as the status
+    if order.status == Order.READY and old_status in (
+        Order.WAITING,
+        Order.PREPARATION,
+    ):
+        if order.canceled:
+            return
+        started = order.date_preparation or order.date_created
+        seconds = (order.date_status_changed - started).total_seconds()
+        item_ids = (
+            OrderItem.objects.filter(order_id=order.pk)
+            .order_by("item_id")
+            .values_list("item_id", flat=True)
+            .distinct()
+        )
+        record_preparation(item_ids, seconds)
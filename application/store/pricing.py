@@ -0,0 +1,169 @@
+import threading
+from decimal import ROUND_HALF_UP, Decimal
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache_versions import (
+    cache_changed,
+    cache_generation,
+    check_cache_versions,
+    register_cache,
+)
+from .models import Promotion
+
+# Active promotions are compiled once into PricingRules, an index from
+# variation id and hour of the day to the rules that may apply then, and
+# rebuilt after any change like the menu index. Pricing a line is a couple of
+# dict lookups and comparisons, without queries. Promotions do not stack: a
+# line gets the largest discount among the rules that apply to it.
+
+CENT = Decimal("0.01")
+ALL_ITEMS = None
+PRICING_CACHE = "pricing"
+
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+class PricingRule:
+    def __init__(self, promotion):
+        self.kind = promotion.kind
+        self.value = promotion.value
+        self.every_nth = promotion.every_nth
+        self.code = promotion.code
+        self.starts_at = promotion.starts_at
+        self.ends_at = promotion.ends_at
+        self.start_minute = self.end_minute = None
+        if promotion.start_time is not None and promotion.end_time is not None:
+            self.start_minute = minute_of_day(promotion.start_time)
+            self.end_minute = minute_of_day(promotion.end_time)
+
+    def hours(self):
+        # Hours of the day overlapping the daily window
+        if self.start_minute is None:
+            return range(24)
+        first = self.start_minute // 60
+        last = (self.end_minute - 1) // 60
+        if self.start_minute < self.end_minute:
+            return range(first, last + 1)
+        return [*range(first, 24), *range(0, last + 1)]
+
+    def is_current(self, when):
+        return (self.starts_at is None or self.starts_at <= when) and (
+            self.ends_at is None or when < self.ends_at
+        )
+
+    def applies(self, when, minute, code):
+        if self.code and self.code != code:
+            return False
+        if not self.is_current(when):
+            return False
+        if self.start_minute is None:
+            return True
+        if self.start_minute < self.end_minute:
+            return self.start_minute <= minute < self.end_minute
+        return minute >= self.start_minute or minute < self.end_minute
+
+    def discount(self, price, quantity):
+        units = quantity // self.every_nth if self.every_nth else quantity
+        if self.kind == Promotion.PERCENT_OFF:
+            unit_discount = price * self.value / 100
+        elif self.kind == Promotion.AMOUNT_OFF:
+            unit_discount = min(self.value, price)
+        else:
+            unit_discount = max(price - self.value, 0)
+        return (unit_discount * units).quantize(CENT, ROUND_HALF_UP)
+
+
+class PricingRules:
+    """Promotions indexed by variation id (ALL_ITEMS for any) and hour."""
+
+    def __init__(self, promotions):
+        self.index = {}
+        self.codes = {}
+        for promotion in promotions:
+            rule = PricingRule(promotion)
+            if rule.code:
+                self.codes.setdefault(rule.code, []).append(rule)
+            for item_id in promotion.item_ids or [ALL_ITEMS]:
+                hours = self.index.setdefault(item_id, [[] for _ in range(24)])
+                for hour in rule.hours():
+                    hours[hour].append(rule)
+
+    def has_code(self, code, when):
+        return any(rule.is_current(when) for rule in self.codes.get(code, ()))
+
+    def line_discount(self, item_id, price, quantity, when, code=""):
+        local = timezone.localtime(when)
+        minute = minute_of_day(local)
+        discount = Decimal(0)
+        for key in (item_id, ALL_ITEMS):
+            hours = self.index.get(key)
+            if hours is None:
+                continue
+            for rule in hours[local.hour]:
+                if rule.applies(when, minute, code):
+                    discount = max(discount, rule.discount(price, quantity))
+        return discount
+
+
+def load_pricing_rules():
+    promotions = Promotion.objects.filter(
+        Q(ends_at__isnull=True) | Q(ends_at__gt=timezone.now()), active=True
+    )
+    return PricingRules(promotions)
+
+
+_pricing_rules = None
+_pricing_rules_lock = threading.Lock()
+
+
+def get_pricing_rules():
+    global _pricing_rules
+    check_cache_versions()
+    pricing_rules = _pricing_rules
+    if pricing_rules is None:
+        with _pricing_rules_lock:
+            if _pricing_rules is None:
+                generation = cache_generation(PRICING_CACHE)
+                pricing_rules = load_pricing_rules()
+                if cache_generation(PRICING_CACHE) == generation:
+                    _pricing_rules = pricing_rules
+            else:
+                pricing_rules = _pricing_rules
+    return pricing_rules
+
+
+def invalidate_pricing_rules():
+    global _pricing_rules
+    _pricing_rules = None
+
+
+register_cache(PRICING_CACHE, invalidate_pricing_rules)
+
+
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def invalidate_pricing_rules_on_change(sender, **kwargs):
+    cache_changed(PRICING_CACHE)
+
+
+def order_item_discount(order, item_id, price, quantity, when):
+    # `when` must be the instant `price` was read from the schedule at
+    return get_pricing_rules().line_discount(
+        item_id, price, quantity, when, order.promo_code
+    )
+
+
+def apply_promotions(order, order_items):
+    # Orders are priced at the time they were placed, lines added later too
+    for order_item in order_items:
+        order_item.discount = order_item_discount(
+            order,
+            order_item.item_id,
+            order_item.price,
+            order_item.quantity,
+            order.date_created,
+        )
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from .archive import archivable_orders
+from .deletion import raw_delete
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    BlacklistedToken,
+    Customer,
+    Favorite,
+    Order,
+    OrderEvent,
+    OrderItem,
+)
+
+# Expired data is deleted by id, one bounded chunk per short transaction:
+# the ids of the next chunk are read through an index, the rows referencing
+# them are deleted first and then the chunk itself, each with one DELETE
+# statement. Live orders are selected with SKIP LOCKED so the purge never
+# waits on (or holds up) a request working on an order.
+
+
+def inactive_users(cutoff):
+    # Customers without any order left, who have not logged in nor refreshed
+    # a token (or signed up, if they never did) since `cutoff`
+    return User.objects.filter(
+        Q(last_login__lt=cutoff) | Q(last_login__isnull=True, date_joined__lt=cutoff),
+        ~Exists(Order.objects.filter(customer__user=OuterRef("pk"))),
+        ~Exists(ArchivedOrder.objects.filter(customer__user=OuterRef("pk"))),
+        customer__isnull=False,
+        is_staff=False,
+        is_superuser=False,
+    )
+
+
+def retention_purges(now=None):
+    """
+    The expired data as (name, queryset, dependents, lock) tuples, in the
+    order it must be purged: orders before the customers they belong to.
+    `dependents` are the (model, field) pairs referencing the queryset rows.
+    """
+    now = now or timezone.now()
+    orders_cutoff = now - settings.RETENTION_ORDERS
+    return (
+        (
+            "archived orders",
+            ArchivedOrder.objects.filter(date_updated__lt=orders_cutoff),
+            ((ArchivedOrderItem, "order_id"),),
+            False,
+        ),
+        (
+            "orders",
+            archivable_orders(orders_cutoff),
+            ((OrderItem, "order_id"),),
+            True,
+        ),
+        (
+            "order events",
+            OrderEvent.objects.filter(
+                date_created__lt=now - settings.RETENTION_ORDER_EVENTS
+            ),
+            (),
+            False,
+        ),
+        (
+            "customers",
+            inactive_users(now - settings.RETENTION_INACTIVE_CUSTOMERS),
+            ((Favorite, "customer__user_id"), (Customer, "user_id")),
+            False,
+        ),
+        (
+            "blacklisted tokens",
+            BlacklistedToken.objects.filter(expires_at__lt=now),
+            (),
+            False,
+        ),
+    )
+
+
+def purge_batch(queryset, dependents, lock, batch_size):
+    with transaction.atomic():
+        ids = queryset.order_by("pk")
+        if lock:
+            ids = ids.select_for_update(skip_locked=True)
+        ids = list(ids.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return 0
+        for model, field in dependents:
+            raw_delete(model.objects.filter(**{f"{field}__in": ids}))
+        if queryset.model is User:
+            # Users also own rows in the auth tables (groups, permissions),
+            # let Django collect those for this chunk
+            queryset.model.objects.filter(pk__in=ids).delete()
+        else:
+            raw_delete(queryset.model.objects.filter(pk__in=ids))
+    return len(ids)
+
+
+def purge_retention(batch_size=None, dry_run=False, now=None):
+    """
+    Delete the data older than the RETENTION_* settings, `batch_size` rows
+    per transaction. Yields (name, count) for every chunk deleted, or once
+    per kind of data with the number of rows that would be deleted when
+    `dry_run` is set.
+    """
+    if batch_size is None:
+        batch_size = settings.RETENTION_BATCH_SIZE
+    for name, queryset, dependents, lock in retention_purges(now):
+        if dry_run:
+            yield name, queryset.count()
+            continue
+        while True:
+            deleted = purge_batch(queryset, dependents, lock, batch_size)
+            if not deleted:
+                break
+            yield name, deleted
@@ -0,0 +1,251 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import (
+    Order,
+    OrderItem,
+    ArchivedOrder,
+    ArchivedOrderItem,
+    SalesRollup,
+    OrderRollup,
+)
+from .signals import (
+    order_placed,
+    order_item_added,
+    order_item_updated,
+    order_item_removed,
+    order_updated,
+    order_status_changed,
+)
+
+# Sales rollups count the lines of orders that are not canceled, on the day
+# the order was placed. Order rollups count every placed order, and how many
+# of them were canceled or delivered.
+
+
+def add_to_rollup(model, key, defaults=None, **deltas):
+    # Increment the rollup row in place, creating it on first use
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**key).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **(defaults or {}), **deltas)
+    except IntegrityError:
+        model.objects.filter(**key).update(**updates)
+
+
+def add_order(order, location=None, **deltas):
+    key = {
+        "day": timezone.localdate(order.date_created),
+        "location": location or order.location,
+    }
+    add_to_rollup(OrderRollup, key, **deltas)
+
+
+def add_sales(order, order_items, sign=1, location=None):
+    day = timezone.localdate(order.date_created)
+    for order_item in order_items:
+        add_sales_line(
+            day,
+            location or order.location,
+            order_item,
+            sign * order_item.quantity,
+            sign * order_item.discount,
+        )
+
+
+def add_sales_line(day, location, order_item, quantity, discount):
+    if not quantity and not discount:
+        return
+    key = {"day": day, "item_id": order_item.item_id, "location": location}
+    add_to_rollup(
+        SalesRollup,
+        key,
+        defaults={"name": order_item.name},
+        quantity=quantity,
+        revenue=order_item.price * quantity - discount,
+    )
+
+
+@receiver(order_placed)
+def rollup_order_placed(sender, order, order_items, **kwargs):
+    # Point of sale orders are placed already delivered
+    add_order(order, orders=1, delivered=int(order.status == Order.DELIVERED))
+    add_sales(order, order_items)
+
+
+@receiver(order_item_added)
+def rollup_order_item_added(sender, order, order_item, **kwargs):
+    if not order.canceled:
+        add_sales(order, [order_item])
+
+
+@receiver(order_item_updated)
+def rollup_order_item_updated(
+    sender, order, order_item, old_quantity, old_discount, **kwargs
+):
+    if not order.canceled:
+        day = timezone.localdate(order.date_created)
+        quantity = order_item.quantity - old_quantity
+        discount = order_item.discount - old_discount
+        add_sales_line(day, order.location, order_item, quantity, discount)
+
+
+@receiver(order_item_removed)
+def rollup_order_item_removed(sender, order, order_item, **kwargs):
+    if not order.canceled:
+        add_sales(order, [order_item], sign=-1)
+
+
+@receiver(order_updated)
+def rollup_order_updated(sender, order, old_location, old_canceled, **kwargs):
+    if order.location == old_location and order.canceled == old_canceled:
+        return
+    # Move the order out of its old (location, canceled) bucket into the new one
+    order_items = list(order.order_items.all())
+    add_order(order, location=old_location, orders=-1, canceled=-int(old_canceled))
+    add_order(order, orders=1, canceled=int(order.canceled))
+    if not old_canceled:
+        add_sales(order, order_items, sign=-1, location=old_location)
+    if not order.canceled:
+        add_sales(order, order_items)
+
+
+@receiver(order_status_changed)
+def rollup_order_status_changed(sender, order, old_status, **kwargs):
+    delivered = int(order.status == Order.DELIVERED) - int(
+        old_status == Order.DELIVERED
+    )
+    if delivered:
+        add_order(order, delivered=delivered)
+
+
+def iter_order_id_batches(order_model, batch_size):
+    last_id = 0
+    while True:
+        order_ids = list(
+            order_model.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return
+        last_id = order_ids[-1]
+        yield order_ids
+
+
+def rollup_orders_batch(order_model, item_model, order_ids):
+    orders = (
+        order_model.objects.filter(id__in=order_ids)
+        .values("location", day=TruncDate("date_created"))
+        .annotate(
+            orders_count=Count("id"),
+            canceled_count=Count("id", filter=Q(canceled=True)),
+            delivered_count=Count("id", filter=Q(status=Order.DELIVERED)),
+        )
+    )
+    for row in orders:
+        add_to_rollup(
+            OrderRollup,
+            {"day": row["day"], "location": row["location"]},
+            orders=row["orders_count"],
+            canceled=row["canceled_count"],
+            delivered=row["delivered_count"],
+        )
+
+    lines = (
+        item_model.objects.filter(order_id__in=order_ids, order__canceled=False)
+        .values(
+            "item_id",
+            day=TruncDate("order__date_created"),
+            location=F("order__location"),
+        )
+        .annotate(
+            quantity_sum=Sum("quantity"),
+            revenue_sum=Sum(
+                F("price") * F("quantity") - F("discount"),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            last_name=Max("name"),
+        )
+    )
+    for row in lines:
+        add_to_rollup(
+            SalesRollup,
+            {"day": row["day"], "item_id": row["item_id"], "location": row["location"]},
+            defaults={"name": row["last_name"]},
+            quantity=row["quantity_sum"],
+            revenue=row["revenue_sum"],
+        )
+
+
+def rebuild_rollups(batch_size=1000):
+    """
+    Recompute every rollup from the live and archived orders, streaming over
+    them in batches of `batch_size` orders. Runs in a single transaction so
+    the reporting endpoint keeps reading the previous rollups until it ends.
+    Yields the number of orders processed by each batch.
+    """
+    with transaction.atomic():
+        SalesRollup.objects.all().delete()
+        OrderRollup.objects.all().delete()
+        sources = ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem))
+        for order_model, item_model in sources:
+            for order_ids in iter_order_id_batches(order_model, batch_size):
+                rollup_orders_batch(order_model, item_model, order_ids)
+                yield len(order_ids)
+
+
+def sales_report(start, end, top):
+    days = {}
+
+    def day_entry(day):
+        return days.setdefault(
+            day,
+            {
+                "day": day,
+                "revenue": 0,
+                "orders": {location: 0 for location, _ in Order.LOCATION_CHOICES},
+                "canceled": 0,
+                "delivered": 0,
+            },
+        )
+
+    for row in OrderRollup.objects.filter(day__range=(start, end)):
+        entry = day_entry(row.day)
+        entry["orders"][row.location] += row.orders
+        entry["canceled"] += row.canceled
+        entry["delivered"] += row.delivered
+
+    sales = SalesRollup.objects.filter(day__range=(start, end))
+    for row in sales.values("day").annotate(revenue_sum=Sum("revenue")):
+        day_entry(row["day"])["revenue"] = row["revenue_sum"]
+
+    top_variations = (
+        sales.values("item_id")
+        .annotate(
+            quantity_sum=Sum("quantity"),
+            revenue_sum=Sum("revenue"),
+            last_name=Max("name"),
+        )
+        .filter(quantity_sum__gt=0)
+        .order_by("-quantity_sum", "item_id")[:top]
+    )
+    return {
+        "start": start,
+        "end": end,
+        "revenue": sum(entry["revenue"] for entry in days.values()),
+        "days": [days[day] for day in sorted(days)],
+        "top_variations": [
+            {
+                "item_id": row["item_id"],
+                "name": row["last_name"],
+                "quantity": row["quantity_sum"],
+                "revenue": row["revenue_sum"],
+            }
+            for row in top_variations
+        ],
+    }
@@ -0,0 +1,109 @@
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache_versions import (
+    cache_changed,
+    cache_generation,
+    check_cache_versions,
+    register_cache,
+)
+from .models import PriceSchedule
+
+# Scheduled prices are compiled once into a PriceTimeline: for every
+# scheduled variation, the sorted minutes of the day its schedule changes at
+# and the (price, active) state from each of them. The current state is a
+# bisect away, the last entry of the day carrying over past midnight.
+
+PRICE_TIMELINE_CACHE = "price_timeline"
+
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+class PriceTimeline:
+    def __init__(self, entries):
+        timelines = {}
+        for entry in entries:
+            minutes, states = timelines.setdefault(entry.variation_id, ([], []))
+            minutes.append(minute_of_day(entry.start_time))
+            states.append((entry.price, entry.active))
+        self.timelines = timelines
+        self.boundaries = sorted(
+            {minute for minutes, _ in timelines.values() for minute in minutes}
+        )
+
+    def state(self, variation_id, when):
+        timeline = self.timelines.get(variation_id)
+        if timeline is None:
+            return None, True
+        minutes, states = timeline
+        # Before the first change of the day, the last one of the previous day
+        return states[
+            bisect_right(minutes, minute_of_day(timezone.localtime(when))) - 1
+        ]
+
+    def price(self, variation_id, price, when):
+        scheduled_price, _ = self.state(variation_id, when)
+        return price if scheduled_price is None else scheduled_price
+
+    def is_active(self, variation_id, when):
+        return self.state(variation_id, when)[1]
+
+    def next_boundary(self, when):
+        """When the next schedule change happens after `when`, None if never."""
+        if not self.boundaries:
+            return None
+        local = timezone.localtime(when)
+        position = bisect_right(self.boundaries, minute_of_day(local))
+        day = local.date()
+        if position == len(self.boundaries):
+            day += timedelta(days=1)
+            position = 0
+        minute = self.boundaries[position]
+        start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=minute)
+        return timezone.make_aware(start, local.tzinfo)
+
+
+_price_timeline = None
+_price_timeline_lock = threading.Lock()
+
+
+def get_price_timeline():
+    global _price_timeline
+    check_cache_versions()
+    price_timeline = _price_timeline
+    if price_timeline is None:
+        with _price_timeline_lock:
+            if _price_timeline is None:
+                generation = cache_generation(PRICE_TIMELINE_CACHE)
+                entries = PriceSchedule.objects.order_by("variation_id", "start_time")
+                price_timeline = PriceTimeline(entries)
+                if cache_generation(PRICE_TIMELINE_CACHE) == generation:
+                    _price_timeline = price_timeline
+            else:
+                price_timeline = _price_timeline
+    return price_timeline
+
+
+def invalidate_price_timeline():
+    global _price_timeline
+    _price_timeline = None
+
+
+register_cache(PRICE_TIMELINE_CACHE, invalidate_price_timeline)
+
+
+@receiver(post_save, sender=PriceSchedule)
+@receiver(post_delete, sender=PriceSchedule)
+def invalidate_price_timeline_on_change(sender, **kwargs):
+    cache_changed(PRICE_TIMELINE_CACHE)
+
+
+def current_price(variation, when=None):
+    return get_price_timeline().price(
+        variation.id, variation.price, when or timezone.now()
+    )
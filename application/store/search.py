@@ -0,0 +1,130 @@
+import base64
+from datetime import datetime, time
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from .models import ArchivedOrder, ArchivedOrderItem, Customer, Order, OrderItem
+from .serializers.read_serializers import ORDER_ITEM_FIELDS
+
+# Admin order search. Customers are matched by exact username (unique index)
+# or case-insensitive email (the LOWER(email) index of migration 0019),
+# their orders are read through the (customer, date_created) index, newest
+# first, and pages are cut with a keyset cursor on (date_created, id) so a
+# page costs the same queries however deep it is: the orders with their
+# customer and user, then their items. Live and archived orders are searched
+# alike, each through its own (customer, date_created) index, and the two
+# pages are merged; archived orders keep their id so the cursor spans both.
+
+
+def encode_cursor(date_created, order_id):
+    value = "{}|{}".format(date_created.isoformat(), order_id)
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(date_created, order id) of a cursor, ValueError if it is malformed."""
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_created, order_id = value.split("|")
+        return datetime.fromisoformat(date_created), int(order_id)
+    except (TypeError, UnicodeDecodeError, base64.binascii.Error) as error:
+        raise ValueError(str(error))
+
+
+def matching_customers(email=None, username=None):
+    customers = Customer.objects.all()
+    if email:
+        customers = customers.annotate(email=Lower("user__email")).filter(
+            email=email.strip().lower()
+        )
+    if username:
+        customers = customers.filter(user__username=username)
+    return customers
+
+
+def search_orders(
+    email=None,
+    username=None,
+    status=None,
+    start=None,
+    end=None,
+    cursor=None,
+    model=Order,
+):
+    orders = model.objects.all()
+    if email or username:
+        orders = orders.filter(
+            customer__in=matching_customers(email, username).values("id")
+        )
+    if status:
+        orders = orders.filter(status=status)
+    if start:
+        orders = orders.filter(
+            date_created__gte=timezone.make_aware(datetime.combine(start, time.min))
+        )
+    if end:
+        orders = orders.filter(
+            date_created__lte=timezone.make_aware(datetime.combine(end, time.max))
+        )
+    if cursor:
+        date_created, order_id = cursor
+        orders = orders.filter(
+            Q(date_created__lt=date_created)
+            | Q(date_created=date_created, id__lt=order_id)
+        )
+    return orders.order_by("-date_created", "-id")
+
+
+def order_search_row(order):
+    order_items = [
+        {field: getattr(order_item, field) for field in ORDER_ITEM_FIELDS}
+        for order_item in order.order_items.all()
+    ]
+    user = order.customer.user
+    return {
+        "id": order.id,
+        "customer": {
+            "id": order.customer_id,
+            "username": user.username,
+            "email": user.email,
+        },
+        "location": order.location,
+        "status": order.status,
+        "canceled": order.canceled,
+        "date_created": str(order.date_created),
+        "date_updated": str(order.date_updated),
+        "order_items": order_items,
+        "total_price": sum(
+            item["price"] * item["quantity"] - item["discount"] for item in order_items
+        ),
+        "pickup_slot_id": order.pickup_slot_id,
+    }
+
+
+def order_search_page(limit=50, **filters):
+    orders = {}
+    for order_model, item_model in (
+        (Order, OrderItem),
+        (ArchivedOrder, ArchivedOrderItem),
+    ):
+        # An order archived between the two queries is found twice
+        for order in (
+            search_orders(model=order_model, **filters)
+            .select_related("customer__user")
+            .prefetch_related(
+                Prefetch("order_items", queryset=item_model.objects.order_by("id"))
+            )[: limit + 1]
+        ):
+            orders.setdefault(order.id, order)
+    orders = sorted(
+        orders.values(), key=lambda order: (order.date_created, order.id), reverse=True
+    )[: limit + 1]
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+    return {
+        "results": [order_search_row(order) for order in orders],
+        "next": (
+            encode_cursor(orders[-1].date_created, orders[-1].id) if has_more else None
+        ),
+        "has_more": has_more,
+    }
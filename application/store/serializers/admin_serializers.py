@@ -1,5 +1,21 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from ..models import Product, ProductVariation, Order
+from ..webhooks import latest_seq
+from ..search import decode_cursor
+from ..stock import reactivate_restocked
+from .customer_serializers import OrderItemSerializer
+from ..models import (
+    Product,
+    ProductVariation,
+    Order,
+    OrderEvent,
+    WebhookEndpoint,
+    PickupSlot,
+    Promotion,
+    PriceSchedule,
+)
 
 
 class ProductVariationSerializer(serializers.ModelSerializer):
@@ -9,7 +25,7 @@ class ProductVariationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProductVariation
-        fields = ["name", "price", "active", "date_created", "date_updated"]
+        fields = ["name", "price", "active", "stock", "date_created", "date_updated"]
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -41,7 +57,7 @@ class UpdateProductVariationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ProductVariation
-        fields = ["id", "name", "price", "active"]
+        fields = ["id", "name", "price", "active", "stock"]
 
 
 class UpdateProductSerializer(serializers.ModelSerializer):
@@ -58,6 +74,7 @@ class UpdateProductSerializer(serializers.ModelSerializer):
         instance.save()
 
         # Update or create variations
+        restocked = []
         for variation_data in variations_data:
             variation_id = variation_data.get("id")
             if variation_id:
@@ -67,12 +84,19 @@ class UpdateProductSerializer(serializers.ModelSerializer):
                     )
                     variation.name = variation_data.get("name", variation.name)
                     variation.price = variation_data.get("price", variation.price)
-                    variation.active = variation_data.get("active", variation.active)
+                    if "active" in variation_data:
+                        # An admin decision, restocks do not undo it
+                        variation.active = variation_data["active"]
+                        variation.sold_out = False
+                    if "stock" in variation_data:
+                        variation.stock = variation_data["stock"]
+                        restocked.append(variation.id)
                     variation.save()
                 except ProductVariation.DoesNotExist:
                     pass
             else:
                 ProductVariation.objects.create(product=instance, **variation_data)
+        reactivate_restocked(restocked)
 
         return instance
 
@@ -81,3 +105,186 @@ class UpdateOrderStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ["status"]
+
+    def update(self, instance, validated_data):
+        # The status timestamps are written by the same UPDATE as the status
+        new_status = validated_data.get("status", instance.status)
+        if new_status != instance.status:
+            now = timezone.now()
+            validated_data["date_status_changed"] = now
+            if instance.status == Order.WAITING and new_status == Order.PREPARATION:
+                validated_data["date_preparation"] = now
+        return super().update(instance, validated_data)
+
+
+class SalesReportQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    top = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def validate(self, attrs):
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault("start", attrs["end"] - timedelta(days=6))
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("start must be before end")
+        return attrs
+
+
+class OrderExportQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    location = serializers.ChoiceField(choices=Order.LOCATION_CHOICES, required=False)
+    export_format = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+
+    def validate(self, attrs):
+        # Defaults to the current month
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault("start", attrs["end"].replace(day=1))
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("start must be before end")
+        return attrs
+
+
+class OrderSearchQuerySerializer(serializers.Serializer):
+    email = serializers.EmailField(required=False)
+    username = serializers.CharField(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=200, default=50)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.")
+
+    def validate(self, attrs):
+        if attrs.get("start") and attrs.get("end") and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("start must be before end")
+        return attrs
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    day = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("day", timezone.localdate())
+        return attrs
+
+
+class OrderEventFeedQuerySerializer(serializers.Serializer):
+    after = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    event_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=OrderEvent.TYPE_CHOICES),
+        required=False,
+    )
+
+    class Meta:
+        model = WebhookEndpoint
+        fields = [
+            "id",
+            "url",
+            "event_types",
+            "active",
+            "last_seq",
+            "failure_count",
+            "next_attempt_at",
+            "last_error",
+        ]
+        read_only_fields = [
+            "last_seq",
+            "failure_count",
+            "next_attempt_at",
+            "last_error",
+        ]
+
+    def create(self, validated_data):
+        # New endpoints only receive events recorded from now on
+        validated_data["last_seq"] = latest_seq()
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        # Re-activating an endpoint closes its circuit
+        if validated_data.get("active") and not instance.active:
+            validated_data.update(failure_count=0, next_attempt_at=None)
+        return super().update(instance, validated_data)
+
+
+class PickupSlotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PickupSlot
+        fields = ["id", "starts_at", "capacity", "reserved"]
+        read_only_fields = ["reserved"]
+
+
+class PromotionSerializer(serializers.ModelSerializer):
+    item_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = Promotion
+        fields = [
+            "id",
+            "name",
+            "kind",
+            "value",
+            "item_ids",
+            "every_nth",
+            "code",
+            "start_time",
+            "end_time",
+            "starts_at",
+            "ends_at",
+            "active",
+        ]
+
+    def validate(self, attrs):
+        def value(field):
+            if field in attrs:
+                return attrs[field]
+            return getattr(self.instance, field, None)
+
+        if value("kind") == Promotion.PERCENT_OFF and value("value") > 100:
+            raise serializers.ValidationError("A percentage cannot exceed 100")
+        start_time, end_time = value("start_time"), value("end_time")
+        if (start_time is None) != (end_time is None):
+            raise serializers.ValidationError(
+                "start_time and end_time must be set together"
+            )
+        if start_time is not None and start_time == end_time:
+            raise serializers.ValidationError("start_time must differ from end_time")
+        starts_at, ends_at = value("starts_at"), value("ends_at")
+        if starts_at and ends_at and starts_at >= ends_at:
+            raise serializers.ValidationError("starts_at must be before ends_at")
+        return attrs
+
+
+class PriceScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceSchedule
+        fields = ["id", "variation", "start_time", "price", "active"]
+
+
+class BulkOrderSerializer(serializers.Serializer):
+    client_id = serializers.UUIDField()
+    taken_at = serializers.DateTimeField()
+    location = serializers.ChoiceField(choices=Order.LOCATION_CHOICES)
+    order_items = OrderItemSerializer(many=True, allow_empty=False)
+
+
+class BulkOrderUploadSerializer(serializers.Serializer):
+    orders = BulkOrderSerializer(
+        many=True, allow_empty=False, max_length=settings.POS_BULK_MAX_ORDERS
+    )
+
+    def validate_orders(self, orders):
+        client_ids = [order["client_id"] for order in orders]
+        if len(set(client_ids)) != len(client_ids):
+            raise serializers.ValidationError("client_id values must be unique")
+        return orders
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from uuid import UUID
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from ..models import BlacklistedToken
+
+# Devices refresh their access token every few minutes, last_login is only
+# written when it is older than this
+LAST_LOGIN_RESOLUTION = timedelta(hours=1)
+
+
+def touch_last_login(user_id):
+    now = timezone.now()
+    User.objects.filter(
+        Q(last_login__isnull=True) | Q(last_login__lt=now - LAST_LOGIN_RESOLUTION),
+        **{api_settings.USER_ID_FIELD: user_id},
+    ).update(last_login=now)
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Blacklisting is the check: reusing a rotated token hits the
+            # primary key, so two concurrent refreshes cannot both succeed
+            try:
+                with transaction.atomic():
+                    BlacklistedToken.objects.create(
+                        jti=UUID(refresh[api_settings.JTI_CLAIM]),
+                        expires_at=datetime_from_epoch(refresh["exp"]),
+                    )
+            except IntegrityError:
+                raise InvalidToken("Token is blacklisted")
+        data = super().validate(attrs)
+        if api_settings.UPDATE_LAST_LOGIN:
+            # A refresh is activity too, devices rarely log in again
+            touch_last_login(refresh[api_settings.USER_ID_CLAIM])
+        return data
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        jti = UUID(token[api_settings.JTI_CLAIM])
+        if BlacklistedToken.objects.filter(jti=jti).exists():
+            raise serializers.ValidationError("Token is blacklisted")
+        return {}
@@ -1,5 +1,10 @@
 from rest_framework import serializers
-from ..models import Product, ProductVariation, Order, OrderItem
+from ..models import Product, ProductVariation, Order, OrderItem, Favorite
+from ..kitchen import order_estimated_wait
+from ..orders import is_available, order_item_name
+from ..pricing import get_pricing_rules, order_item_discount
+from ..schedules import current_price
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 
@@ -33,29 +38,104 @@ class MenuModelSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "variations"]
 
 
+class MenuSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    min_price = serializers.DecimalField(10, 2, required=False, min_value=0)
+    max_price = serializers.DecimalField(10, 2, required=False, min_value=0)
+
+
+class PickupSlotQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+
+
+class PromoCodeField(serializers.CharField):
+    def __init__(self, **kwargs):
+        super().__init__(max_length=30, allow_blank=True, required=False, **kwargs)
+
+    def to_internal_value(self, data):
+        code = super().to_internal_value(data)
+        if code and not get_pricing_rules().has_code(code, timezone.now()):
+            raise serializers.ValidationError(f"Promo code {code} is not valid.")
+        return code
+
+
 class OrderItemSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     product_variation_id = serializers.IntegerField(write_only=True)
     quantity = serializers.IntegerField(min_value=1)
     price = serializers.DecimalField(10, 2, read_only=True)
+    discount = serializers.DecimalField(10, 2, read_only=True)
     name = serializers.CharField(read_only=True)
     item_id = serializers.IntegerField(read_only=True)
 
 
-class CreateOrderSerializer(serializers.Serializer):
+class EstimatedWaitMixin:
+    # The wait needs the variations of the order, read from its serialized
+    # lines rather than queried again
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        item_ids = [item["item_id"] for item in data["order_items"]]
+        data["estimated_wait"] = order_estimated_wait(instance, item_ids)
+        return data
+
+
+class CreateOrderSerializer(EstimatedWaitMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     location = serializers.ChoiceField(choices=Order.LOCATION_CHOICES)
     status = serializers.CharField(read_only=True)
     order_items = OrderItemSerializer(many=True)
+    pickup_slot_id = serializers.IntegerField(required=False, allow_null=True)
+    promo_code = PromoCodeField()
     date_created = serializers.CharField(read_only=True)
     date_updated = serializers.CharField(read_only=True)
+    estimated_wait = serializers.IntegerField(read_only=True)
+
 
+class ReorderSerializer(serializers.Serializer):
+    # Defaults to the location of the order being repeated
+    location = serializers.ChoiceField(choices=Order.LOCATION_CHOICES, required=False)
+    pickup_slot_id = serializers.IntegerField(required=False, allow_null=True)
+    promo_code = PromoCodeField()
 
-class ReadUpdateModelSerializer(serializers.ModelSerializer):
+
+class OrderFavoritesSerializer(ReorderSerializer):
+    location = serializers.ChoiceField(choices=Order.LOCATION_CHOICES)
+
+
+class FavoriteSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(read_only=True)
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+    class Meta:
+        model = Favorite
+        fields = ["id", "item_id", "quantity", "date_created"]
+
+    def validate_item_id(self, item_id):
+        if not ProductVariation.objects.filter(
+            id=item_id, active=True, product__active=True
+        ).exists():
+            raise serializers.ValidationError(
+                f"ProductVariation with id {item_id} does not exist."
+            )
+        return item_id
+
+    def validate(self, attrs):
+        user = self.context["request"].user
+        item_id = attrs["item_id"]
+        if Favorite.objects.filter(customer__user=user, item_id=item_id).exists():
+            raise serializers.ValidationError(
+                f"Favorite with item_id {item_id} already exists."
+            )
+        return attrs
+
+
+class ReadUpdateModelSerializer(EstimatedWaitMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
     status = serializers.CharField(read_only=True)
     order_items = serializers.SerializerMethodField(read_only=True)
     total_price = serializers.SerializerMethodField(read_only=True)
+    estimated_wait = serializers.IntegerField(read_only=True)
+    pickup_slot_id = serializers.IntegerField(read_only=True)
     date_created = serializers.CharField(read_only=True)
     date_updated = serializers.CharField(read_only=True)
 
@@ -70,6 +150,8 @@ class ReadUpdateModelSerializer(serializers.ModelSerializer):
             "date_updated",
             "order_items",
             "total_price",
+            "estimated_wait",
+            "pickup_slot_id",
         ]
 
     def get_order_items(self, obj):
@@ -78,7 +160,9 @@ class ReadUpdateModelSerializer(serializers.ModelSerializer):
 
     def get_total_price(self, obj):
         order_items = obj.order_items.all()
-        total_price = sum(item.price * item.quantity for item in order_items)
+        total_price = sum(
+            item.price * item.quantity - item.discount for item in order_items
+        )
         return total_price
 
     def validate(self, attrs):
@@ -116,21 +200,31 @@ class CreateOrderItemModelSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         item_id = validated_data["item_id"]
-        variation: ProductVariation = ProductVariation.objects.filter(
-            id=item_id
-        ).first()
+        variation: ProductVariation = (
+            ProductVariation.objects.filter(id=item_id)
+            .select_related("product")
+            .first()
+        )
         if not variation:
             raise serializers.ValidationError(
                 f"ProductVariation with id {item_id} does not exist."
             )
-        ModelClass = self.Meta.model
-        name = (
-            f"{variation.product.name} ({variation.name})"
-            if variation.name != "-"
-            else variation.product.name
+        if not is_available(variation):
+            raise serializers.ValidationError(
+                f"ProductVariation with id {item_id} is not available."
+            )
+        # Priced like the rest of the order, at the time it was placed
+        order = validated_data["order"]
+        price = current_price(variation, order.date_created)
+        discount = order_item_discount(
+            order, item_id, price, validated_data["quantity"], order.date_created
         )
+        ModelClass = self.Meta.model
         return ModelClass._default_manager.create(
-            price=variation.price, name=name, **validated_data
+            price=price,
+            discount=discount,
+            name=order_item_name(variation),
+            **validated_data,
         )
 
 
@@ -146,3 +240,11 @@ class UpdateOrderItemModelSerializer(serializers.ModelSerializer):
         if not order_item:
             raise serializers.ValidationError("Order item does not exist.")
         return attrs
+
+    def update(self, instance, validated_data):
+        quantity = validated_data.get("quantity", instance.quantity)
+        order = instance.order
+        validated_data["discount"] = order_item_discount(
+            order, instance.item_id, instance.price, quantity, order.date_created
+        )
+        return super().update(instance, validated_data)
@@ -0,0 +1,64 @@
+from ..models import Product, ProductVariation, OrderItem
+from ..kitchen import order_estimated_wait
+from ..schedules import get_price_timeline
+from django.utils import timezone
+
+# Fast read path for the hot GET endpoints. These functions build the exact
+# same payloads as MenuModelSerializer and ReadUpdateModelSerializer, but
+# straight from `.values()` rows instead of DRF field-by-field serialization.
+
+MENU_PRODUCT_FIELDS = ("id", "name")
+MENU_VARIATION_FIELDS = ("id", "name", "price")
+ORDER_ITEM_FIELDS = ("id", "quantity", "price", "discount", "name", "item_id")
+
+
+def menu_representation(when=None):
+    # The menu at `when` (now by default), with the scheduled prices
+    when = when or timezone.now()
+    timeline = get_price_timeline()
+    products = list(
+        Product.objects.filter(active=True).order_by("id").values(*MENU_PRODUCT_FIELDS)
+    )
+    variations = {}
+    rows = (
+        ProductVariation.objects.filter(active=True, product__active=True)
+        .order_by("id")
+        .values("product_id", *MENU_VARIATION_FIELDS)
+    )
+    for row in rows:
+        if not timeline.is_active(row["id"], when):
+            continue
+        row["price"] = timeline.price(row["id"], row["price"], when)
+        variations.setdefault(row.pop("product_id"), []).append(row)
+    for product in products:
+        product["variations"] = variations.get(product["id"], [])
+    return products
+
+
+def order_items_rows(order_id, model=OrderItem):
+    return list(
+        model.objects.filter(order_id=order_id)
+        .order_by("id")
+        .values(*ORDER_ITEM_FIELDS)
+    )
+
+
+def order_representation(order, order_items=None):
+    if order_items is None:
+        order_items = order_items_rows(order.pk)
+    return {
+        "id": order.id,
+        "location": order.location,
+        "status": order.status,
+        "canceled": order.canceled,
+        "date_created": str(order.date_created),
+        "date_updated": str(order.date_updated),
+        "order_items": order_items,
+        "total_price": sum(
+            item["price"] * item["quantity"] - item["discount"] for item in order_items
+        ),
+        "estimated_wait": order_estimated_wait(
+            order, [item["item_id"] for item in order_items]
+        ),
+        "pickup_slot_id": order.pickup_slot_id,
+    }
@@ -0,0 +1,18 @@
+from django.dispatch import Signal
+
+# Order lifecycle signals. They are sent by the store views inside the same
+# transaction as the change, so receivers maintaining derived data (rollups,
+# counters, event logs...) stay consistent with the orders tables.
+
+# order, order_items
+order_placed = Signal()
+# order, order_item
+order_item_added = Signal()
+# order, order_item, old_quantity, old_discount
+order_item_updated = Signal()
+# order, order_item
+order_item_removed = Signal()
+# order, old_location, old_canceled
+order_updated = Signal()
+# order, old_status, old_date_status_changed
+order_status_changed = Signal()
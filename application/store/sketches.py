@@ -0,0 +1,90 @@
+"""
+Streaming statistics kept as small JSON-serializable states, so they can be
+updated one observation at a time without reading the history back.
+"""
+
+
+def running_stats_add(state, value):
+    # Welford's online mean and variance
+    state["count"] += 1
+    delta = value - state["mean"]
+    state["mean"] += delta / state["count"]
+    state["m2"] += delta * (value - state["mean"])
+    return state
+
+
+class P2Quantile:
+    """
+    P² estimate of a single quantile (Jain and Chlamtac, 1985): five markers
+    whose heights approximate the minimum, p/2, p, (1+p)/2 quantiles and the
+    maximum, adjusted with a piecewise-parabolic formula on every value.
+    """
+
+    def __init__(self, p, heights=None, positions=None, desired=None):
+        self.p = p
+        self.heights = heights or []
+        self.positions = positions or [1, 2, 3, 4, 5]
+        self.desired = desired or [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(**state)
+
+    def state(self):
+        return {
+            "p": self.p,
+            "heights": self.heights,
+            "positions": self.positions,
+            "desired": self.desired,
+        }
+
+    def add(self, value):
+        heights, positions = self.heights, self.positions
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (
+                d <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                d = 1 if d > 0 else -1
+                height = self.parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self.linear(i, d)
+                heights[i] = height
+                positions[i] += d
+
+    def parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def linear(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+    def value(self):
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            return self.heights[round(self.p * (len(self.heights) - 1))]
+        return self.heights[2]
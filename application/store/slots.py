@@ -0,0 +1,64 @@
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+from .models import PickupSlot
+
+# Slot capacity is held with single conditional UPDATE statements, like
+# stock: the counter is only incremented when the booking still fits and
+# the slot has not started, so concurrent bookings cannot overbook it.
+
+
+class SlotUnavailable(serializers.ValidationError):
+    def __init__(self, slot_id):
+        self.slot_id = slot_id
+        super().__init__(f"PickupSlot with id {slot_id} is not available.")
+
+
+def reserve_slot(slot_id, drinks):
+    if slot_id is None:
+        return
+    slots = PickupSlot.objects.filter(pk=slot_id, starts_at__gt=timezone.now())
+    if drinks <= 0:
+        # Nothing to hold, but an empty order still books an existing
+        # slot that has not started
+        reserved = slots.exists()
+    else:
+        reserved = slots.filter(reserved__lte=F("capacity") - drinks).update(
+            reserved=F("reserved") + drinks
+        )
+    if not reserved:
+        raise SlotUnavailable(slot_id)
+
+
+def release_slot(slot_id, drinks):
+    if slot_id is None or drinks <= 0:
+        return
+    PickupSlot.objects.filter(pk=slot_id, reserved__gte=drinks).update(
+        reserved=F("reserved") - drinks
+    )
+
+
+def adjust_slot(slot_id, drinks):
+    if drinks > 0:
+        reserve_slot(slot_id, drinks)
+    elif drinks < 0:
+        release_slot(slot_id, -drinks)
+
+
+def slot_availability(start, end):
+    slots = (
+        PickupSlot.objects.filter(
+            starts_at__gt=timezone.now(), starts_at__range=(start, end)
+        )
+        .order_by("starts_at")
+        .values("id", "starts_at", "capacity", "reserved")
+    )
+    return [
+        {
+            "id": slot["id"],
+            "starts_at": slot["starts_at"],
+            "capacity": slot["capacity"],
+            "available": slot["capacity"] - slot["reserved"],
+        }
+        for slot in slots
+    ]
@@ -0,0 +1,107 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework import serializers
+from .catalog import menu_changed
+from .models import ProductVariation
+
+# Stock is reserved and released with single conditional UPDATE statements,
+# never by reading the counter first, so concurrent orders cannot oversell.
+
+
+class OutOfStock(serializers.ValidationError):
+    def __init__(self, item_ids):
+        self.item_ids = item_ids
+        ids = ", ".join(str(item_id) for item_id in item_ids)
+        super().__init__(f"ProductVariation with id {ids} is out of stock.")
+
+
+def line_quantities(lines):
+    quantities = Counter()
+    for item_id, quantity in lines:
+        quantities[item_id] += quantity
+    return quantities
+
+
+def quantity_by_id(quantities):
+    return Case(
+        *[When(id=item_id, then=Value(qty)) for item_id, qty in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def reserve_stock(quantities):
+    """
+    Reserve `quantities` ({variation id: units}) all or nothing. Variations
+    without stock tracking always succeed. Raises OutOfStock otherwise.
+    """
+    quantities = {item_id: qty for item_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    needed = quantity_by_id(quantities)
+    with transaction.atomic():
+        reserved = (
+            ProductVariation.objects.filter(id__in=quantities)
+            .filter(Q(stock__isnull=True) | Q(stock__gte=needed))
+            .update(stock=F("stock") - needed)
+        )
+        if reserved != len(quantities):
+            transaction.set_rollback(True)
+    if reserved != len(quantities):
+        available = ProductVariation.objects.filter(id__in=quantities).filter(
+            Q(stock__isnull=True) | Q(stock__gte=needed)
+        )
+        item_ids = set(quantities) - set(available.values_list("id", flat=True))
+        raise OutOfStock(sorted(item_ids))
+    deactivate_sold_out(quantities)
+
+
+def release_stock(quantities):
+    quantities = {item_id: qty for item_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    ProductVariation.objects.filter(id__in=quantities, stock__isnull=False).update(
+        stock=F("stock") + quantity_by_id(quantities)
+    )
+    reactivate_restocked(quantities)
+
+
+def consume_stock(quantities):
+    """
+    Take `quantities` out of stock without ever failing, for sales that
+    already happened: the stock stops at zero.
+    """
+    quantities = {item_id: qty for item_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    ProductVariation.objects.filter(id__in=quantities, stock__isnull=False).update(
+        stock=Greatest(F("stock") - quantity_by_id(quantities), 0)
+    )
+    deactivate_sold_out(quantities)
+
+
+def adjust_stock(item_id, quantity):
+    if quantity > 0:
+        reserve_stock({item_id: quantity})
+    elif quantity < 0:
+        release_stock({item_id: -quantity})
+
+
+def deactivate_sold_out(item_ids):
+    deactivated = ProductVariation.objects.filter(
+        id__in=item_ids, stock=0, active=True
+    ).update(active=False, sold_out=True)
+    if deactivated:
+        menu_changed()
+
+
+def reactivate_restocked(item_ids):
+    # Only the variations deactivated by deactivate_sold_out, not by an admin
+    reactivated = (
+        ProductVariation.objects.filter(id__in=item_ids, sold_out=True)
+        .exclude(stock=0)
+        .update(active=True, sold_out=False)
+    )
+    if reactivated:
+        menu_changed()
@@ -1,3 +1,4 @@
+import re
 from django.urls import reverse
 from mock import patch
 from rest_framework.test import APITestCase
@@ -5,10 +6,21 @@ from rest_framework import status
 from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
-from ..models import Product, ProductVariation, Order, Customer
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import Product, ProductVariation, Order, OrderItem, Customer, Favorite
 from ..serializers.admin_serializers import ProductSerializer
 
 
+def statement_tables(queries, verb):
+    # Tables of the captured `verb` statements, in order
+    return [
+        re.match(r'{} (?:FROM )?"(\w+)"'.format(verb), query["sql"]).group(1)
+        for query in queries.captured_queries
+        if query["sql"].startswith(verb + " ")
+    ]
+
+
 class ProductCreateViewTestCase(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -141,6 +153,72 @@ class ProductDeleteViewTestCase(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Product.objects.filter(pk=self.product.id).exists())
+        self.assertFalse(ProductVariation.objects.exists())
+
+    def test_delete_product_does_not_load_variations(self):
+        for index in range(5):
+            ProductVariation.objects.create(
+                product=self.product, name=f"Variation {index}", price=10.0
+            )
+        url = reverse("admin-product-update-delete", kwargs={"pk": self.product.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ProductVariation.objects.exists())
+        # One DELETE per table, the variations are never selected
+        self.assertEqual(
+            statement_tables(queries, "DELETE"),
+            ["store_priceschedule", "store_productvariation", "store_product"],
+        )
+
+    def test_delete_product_with_ordered_variation(self):
+        ordered = ProductVariation.objects.create(
+            product=self.product, name="Ordered", price=10.0
+        )
+        unused = ProductVariation.objects.create(
+            product=self.product, name="Unused", price=10.0
+        )
+        customer = Customer.objects.create(user=self.user)
+        order = Order.objects.create(customer=customer, location="in_house")
+        OrderItem.objects.create(
+            order=order, item_id=ordered.id, name="Ordered", price=10.0, quantity=1
+        )
+        url = reverse("admin-product-update-delete", kwargs={"pk": self.product.id})
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.product.refresh_from_db()
+        self.assertFalse(self.product.active)
+        ordered.refresh_from_db()
+        self.assertFalse(ordered.active)
+        self.assertFalse(ProductVariation.objects.filter(pk=unused.id).exists())
+
+    def test_delete_unknown_product(self):
+        url = reverse("admin-product-update-delete", kwargs={"pk": 999})
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deactivate_product(self):
+        ProductVariation.objects.create(
+            product=self.product, name="Variation 1", price=10.0
+        )
+        self.assertEqual(len(self.client.get(reverse("menu-search")).data), 1)
+        url = reverse("admin-product-deactivate", kwargs={"pk": self.product.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            statement_tables(queries, "UPDATE"),
+            ["store_product", "store_cacheversion"],
+        )
+        self.product.refresh_from_db()
+        self.assertFalse(self.product.active)
+        self.assertEqual(self.client.get(reverse("menu-search")).data, [])
+        self.assertEqual(self.client.get(reverse("menu")).data, [])
+
+    def test_deactivate_unknown_product(self):
+        url = reverse("admin-product-deactivate", kwargs={"pk": 999})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_delete_product_with_no_admin_permission(self):
         user = User.objects.create_user(
@@ -184,6 +262,30 @@ class ProductVariationDeleteViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(ProductVariation.objects.filter(pk=self.variation.id).exists())
 
+    def test_delete_referenced_product_variation(self):
+        customer = Customer.objects.create(user=self.user)
+        order = Order.objects.create(customer=customer, location="in_house")
+        OrderItem.objects.create(
+            order=order,
+            item_id=self.variation.id,
+            name="Variation 1",
+            price=10.0,
+            quantity=1,
+        )
+        other = ProductVariation.objects.create(
+            product=self.product, name="Variation 2", price=12.0
+        )
+        Favorite.objects.create(customer=customer, item_id=other.id)
+        for variation in (self.variation, other):
+            url = reverse(
+                "admin-product-variation-delete", args=[self.product.id, variation.id]
+            )
+            response = self.client.delete(url)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            # Deactivated, not deleted
+            variation.refresh_from_db()
+            self.assertFalse(variation.active)
+
     def test_delete_product_variation_for_invalid_product_id(self):
         url = reverse("admin-product-variation-delete", args=[999, self.variation.id])
         response = self.client.delete(url)
@@ -196,6 +298,26 @@ class ProductVariationDeleteViewTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.json(), {"detail": "Not found."})
 
+    def test_deactivate_product_variation(self):
+        url = reverse(
+            "admin-product-variation-deactivate",
+            args=[self.product.id, self.variation.id],
+        )
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.variation.refresh_from_db()
+        self.assertFalse(self.variation.active)
+        self.assertEqual(self.client.get(reverse("menu-search")).data, [])
+
+    def test_deactivate_product_variation_for_invalid_product_id(self):
+        url = reverse(
+            "admin-product-variation-deactivate", args=[999, self.variation.id]
+        )
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.variation.refresh_from_db()
+        self.assertTrue(self.variation.active)
+
 
 class OrderStatusUpdateViewTestCase(APITestCase):
     def setUp(self):
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse, NoReverseMatch
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from application import settings_api
+
+
+@override_settings(
+    ROOT_URLCONF=settings_api.ROOT_URLCONF,
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+    REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+)
+class ApiProfileTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+
+    def test_store_api_is_served(self):
+        response = self.client.get(reverse("menu"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_token_and_schema_are_served(self):
+        self.client.credentials()
+        response = self.client.post(
+            reverse("create-token"),
+            {"username": "testuser", "password": "testpassword"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get("/swagger.json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_admin_and_docs_ui_are_not_served(self):
+        for name in ("admin:index", "schema-swagger-ui", "schema-redoc"):
+            with self.subTest(name=name):
+                with self.assertRaises(NoReverseMatch):
+                    reverse(name)
+
+    def test_worker_does_not_load_unused_apps(self):
+        code = (
+            "import json, sys\n"
+            "import application.wsgi\n"
+            "from django.urls import get_resolver\n"
+            "get_resolver().url_patterns\n"
+            "print(json.dumps(sorted(sys.modules)))\n"
+        )
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="application.settings_api",
+            PYTHONPATH=str(settings.BASE_DIR),
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        modules = set(json.loads(output))
+        self.assertNotIn("drf_yasg", modules)
+        self.assertNotIn("django.contrib.sessions.middleware", modules)
+        self.assertNotIn("django.contrib.messages.middleware", modules)
@@ -0,0 +1,98 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..archive import archive_orders
+from ..models import Order, OrderItem, Customer, ArchivedOrder, ArchivedOrderItem
+from ..serializers.customer_serializers import ReadUpdateModelSerializer
+
+
+class ArchiveOrdersTestCase(APITestCase):
+    def setUp(self):
+        self.user: User = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.customer: Customer = Customer.objects.create(user=self.user)
+
+    def create_order(self, days_ago=60, **kwargs):
+        order: Order = Order.objects.create(
+            customer=self.customer, location="in_house", **kwargs
+        )
+        OrderItem.objects.create(
+            order=order, name="Latte", item_id=1, quantity=2, price=10.0
+        )
+        Order.objects.filter(pk=order.pk).update(
+            date_updated=timezone.now() - timedelta(days=days_ago)
+        )
+        order.refresh_from_db()
+        return order
+
+    def test_archive_moves_old_delivered_and_canceled_orders(self):
+        delivered = self.create_order(
+            status=Order.DELIVERED, promo_code="SPRING", client_id=uuid.uuid4()
+        )
+        canceled = self.create_order(canceled=True)
+        waiting = self.create_order()
+        recent = self.create_order(days_ago=1, status=Order.DELIVERED)
+
+        archived = sum(archive_orders(older_than=timedelta(days=30), batch_size=1))
+
+        self.assertEqual(archived, 2)
+        self.assertEqual(
+            set(ArchivedOrder.objects.values_list("id", flat=True)),
+            {delivered.id, canceled.id},
+        )
+        self.assertEqual(
+            set(Order.objects.values_list("id", flat=True)), {waiting.id, recent.id}
+        )
+        archived_delivered = ArchivedOrder.objects.get(pk=delivered.id)
+        self.assertEqual(
+            (archived_delivered.promo_code, archived_delivered.client_id),
+            (delivered.promo_code, delivered.client_id),
+        )
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+        self.assertFalse(
+            OrderItem.objects.filter(order_id__in=[delivered.id, canceled.id]).exists()
+        )
+
+    def test_archive_stops_after_max_batches(self):
+        for _ in range(3):
+            self.create_order(status=Order.DELIVERED)
+
+        archived = list(
+            archive_orders(older_than=timedelta(days=30), batch_size=1, max_batches=2)
+        )
+
+        self.assertEqual(archived, [1, 1])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_get_archived_order_details(self):
+        order = self.create_order(status=Order.DELIVERED)
+        expected_data = ReadUpdateModelSerializer(instance=order).data
+        call_command("archive_orders", "--older-than-days=30", stdout=StringIO())
+
+        url = reverse("order-read-update", args=[order.id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected_data)
+
+    def test_update_archived_order(self):
+        order = self.create_order(canceled=True)
+        call_command("archive_orders", "--older-than-days=30", stdout=StringIO())
+
+        url = reverse("order-read-update", args=[order.id])
+        response = self.client.patch(url, {"location": "take_away"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.json(), {"detail": "Archived orders cannot be modified."}
+        )
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+from uuid import uuid4
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import BlacklistedToken
+
+
+class TokenRefreshTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def test_refresh_rotates_the_refresh_token(self):
+        url = reverse("refresh-token")
+        response = self.client.post(url, {"refresh": str(self.refresh)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data)
+        self.assertNotEqual(response.data["refresh"], str(self.refresh))
+        self.assertTrue(
+            BlacklistedToken.objects.filter(jti=self.refresh["jti"]).exists()
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get(reverse("menu"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_login_and_refresh_update_last_login(self):
+        response = self.client.post(
+            reverse("create-token"),
+            {"username": "testuser", "password": "testpassword"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+        long_ago = timezone.now() - timedelta(days=30)
+        User.objects.filter(pk=self.user.pk).update(last_login=long_ago)
+        self.client.post(reverse("refresh-token"), {"refresh": str(self.refresh)})
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.last_login, long_ago)
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        url = reverse("refresh-token")
+        response = self.client.post(url, {"refresh": str(self.refresh)})
+        new_refresh = response.data["refresh"]
+
+        response = self.client.post(url, {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["detail"], "Token is blacklisted")
+
+        response = self.client.post(url, {"refresh": new_refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_verify_token(self):
+        url = reverse("verify-token")
+        response = self.client.post(url, {"token": str(self.refresh.access_token)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.post(reverse("refresh-token"), {"refresh": str(self.refresh)})
+        response = self.client.post(url, {"token": str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {"token": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_expired_blacklisted_tokens(self):
+        now = timezone.now()
+        for days in (-2, -1, 1):
+            BlacklistedToken.objects.create(
+                jti=uuid4(), expires_at=now + timedelta(days=days)
+            )
+
+        call_command("purge_token_blacklist", "--batch-size=1", stdout=StringIO())
+
+        self.assertEqual(
+            list(BlacklistedToken.objects.values_list("expires_at", flat=True)),
+            [now + timedelta(days=1)],
+        )
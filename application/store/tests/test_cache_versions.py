@@ -0,0 +1,82 @@
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from .. import schedules
+from ..cache_versions import bump_cache_version, invalidate_cache
+from ..menu_index import MENU_CACHE, get_menu_index, invalidate_menu_index
+from ..models import CacheVersion, Product, ProductVariation
+from ..schedules import (
+    PRICE_TIMELINE_CACHE,
+    PriceTimeline,
+    get_price_timeline,
+    invalidate_price_timeline,
+)
+
+
+class CacheVersionTestCase(TestCase):
+    def setUp(self):
+        # Forget the previous checks of this process
+        for name, value in (("_checked_at", None), ("_versions", {})):
+            patcher = patch(f"application.store.cache_versions.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        invalidate_menu_index()
+        self.addCleanup(invalidate_menu_index)
+        self.product = Product.objects.create(name="Latte", active=True)
+        ProductVariation.objects.create(product=self.product, name="Small", price=10.0)
+
+    def menu_names(self):
+        return [product["name"] for product in get_menu_index().search()]
+
+    def rename_in_another_worker(self, name):
+        # A write made through another process: its signals only reach the
+        # version table, not this process' cache
+        Product.objects.filter(pk=self.product.pk).update(name=name)
+        bump_cache_version(MENU_CACHE)
+
+    def test_saves_bump_the_version(self):
+        version = CacheVersion.objects.get(namespace=MENU_CACHE).version
+        self.product.name = "Mocha"
+        self.product.save()
+
+        self.assertEqual(
+            CacheVersion.objects.get(namespace=MENU_CACHE).version, version + 1
+        )
+
+    @override_settings(CACHE_VERSION_CHECK_INTERVAL=60)
+    def test_versions_are_checked_once_per_interval(self):
+        self.assertEqual(self.menu_names(), ["Latte"])
+        self.rename_in_another_worker("Mocha")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.menu_names(), ["Latte"])
+
+        with override_settings(CACHE_VERSION_CHECK_INTERVAL=0):
+            self.assertEqual(self.menu_names(), ["Mocha"])
+            # The version is checked, the index is not rebuilt again
+            with self.assertNumQueries(1):
+                self.assertEqual(self.menu_names(), ["Mocha"])
+
+    @override_settings(CACHE_VERSION_CHECK_INTERVAL=None)
+    def test_check_can_be_disabled(self):
+        self.assertEqual(self.menu_names(), ["Latte"])
+        self.rename_in_another_worker("Mocha")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.menu_names(), ["Latte"])
+
+    def test_builds_raced_by_an_invalidation_are_not_stored(self):
+        invalidate_price_timeline()
+        self.addCleanup(invalidate_price_timeline)
+
+        def build_then_get_invalidated(entries):
+            # The data changed and was invalidated while this build ran
+            price_timeline = PriceTimeline(entries)
+            invalidate_cache(PRICE_TIMELINE_CACHE)
+            return price_timeline
+
+        with patch.object(schedules, "PriceTimeline", build_then_get_invalidated):
+            stale = get_price_timeline()
+
+        self.assertIsNone(schedules._price_timeline)
+        self.assertIsNot(get_price_timeline(), stale)
+        self.assertIs(get_price_timeline(), schedules._price_timeline)
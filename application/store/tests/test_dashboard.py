@@ -0,0 +1,110 @@
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import DashboardCounter, Order, OrderItem, Product, ProductVariation
+
+
+@patch("application.store.views.admin_views.send_mail")
+class DashboardTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.variation = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+
+    def place_order(self, quantity=1):
+        order_data = {
+            "location": "in_house",
+            "order_items": [
+                {"product_variation_id": self.variation.id, "quantity": quantity}
+            ],
+        }
+        response = self.client.post(reverse("order"), order_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Order.objects.get(pk=response.data["id"])
+
+    def dashboard(self, **params):
+        response = self.client.get(reverse("admin-dashboard"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_counters_follow_order_lifecycle(self, mock_send_mail):
+        first = self.place_order(quantity=2)
+        second = self.place_order()
+        self.place_order()
+        url = reverse("admin-order-status-update", args=[first.id])
+        self.client.patch(url, {"status": Order.PREPARATION})
+        line = second.order_items.get()
+        url = reverse("order-item-update-delete", args=[second.id, line.id])
+        self.client.patch(url, {"quantity": 3}, format="json")
+        self.client.patch(
+            reverse("order-read-update", args=[second.id]), {"canceled": True}
+        )
+
+        with self.assertNumQueries(2):
+            dashboard = self.dashboard()
+
+        self.assertEqual(
+            dashboard,
+            {
+                "day": str(timezone.localdate()),
+                "orders": 3,
+                "orders_by_status": {
+                    "waiting": 1,
+                    "preparation": 1,
+                    "ready": 0,
+                    "delivered": 0,
+                },
+                "canceled": 1,
+                "revenue": 30.0,
+            },
+        )
+
+    def test_empty_day(self, mock_send_mail):
+        self.place_order()
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        dashboard = self.dashboard(day=yesterday)
+
+        self.assertEqual(dashboard["orders"], 0)
+        self.assertEqual(dashboard["revenue"], 0)
+
+    def test_reconcile_fixes_drift(self, mock_send_mail):
+        order = self.place_order()
+        self.place_order()
+        # Changes made behind the signals' back
+        OrderItem.objects.create(
+            order=order, name="Latte", price=1.0, quantity=1, item_id=999
+        )
+        Order.objects.filter(pk=order.pk).update(status=Order.READY)
+        expected = self.dashboard()
+        expected.update(
+            revenue=21.0,
+            orders_by_status={**expected["orders_by_status"], "waiting": 1, "ready": 1},
+        )
+
+        stdout = StringIO()
+        call_command("reconcile_dashboard", "--days=1", stdout=stdout)
+
+        self.assertEqual(self.dashboard(), expected)
+        self.assertIn("fixed waiting -1, ready +1, revenue +1.00", stdout.getvalue())
+        self.assertEqual(DashboardCounter.objects.count(), 1)
+
+        stdout = StringIO()
+        call_command("reconcile_dashboard", "--days=1", stdout=stdout)
+        self.assertIn("up to date", stdout.getvalue())
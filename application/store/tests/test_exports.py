@@ -0,0 +1,104 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Customer, Order, OrderItem
+
+
+class OrderExportTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.customer = Customer.objects.create(user=self.user)
+        self.today = timezone.localdate()
+
+    def create_order(self, days_ago=0, **kwargs):
+        order = Order.objects.create(customer=self.customer, **kwargs)
+        Order.objects.filter(pk=order.pk).update(
+            date_created=timezone.now() - timedelta(days=days_ago)
+        )
+        OrderItem.objects.create(
+            order=order, name="Latte", price=4.5, quantity=2, item_id=1
+        )
+        OrderItem.objects.create(
+            order=order, name="Muffin", price=3, quantity=1, item_id=2
+        )
+        return order
+
+    def export(self, **params):
+        response = self.client.get(reverse("admin-order-export"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        order = self.create_order(location="in_house")
+        self.create_order(location="take_away")
+        self.create_order(days_ago=40, location="in_house")
+
+        content = self.export(start=self.today, end=self.today, location="in_house")
+
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(
+            [(row["order_id"], row["name"], row["total"]) for row in rows],
+            [(str(order.id), "Latte", "9.00"), (str(order.id), "Muffin", "3.00")],
+        )
+        self.assertEqual(rows[0]["archived"], "False")
+
+    def test_ndjson_export_with_status_filter(self):
+        self.create_order(location="in_house")
+        delivered = self.create_order(location="in_house", status=Order.DELIVERED)
+
+        content = self.export(status="delivered", export_format="ndjson")
+
+        lines = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([line["order_id"] for line in lines], [delivered.id] * 2)
+        self.assertEqual(lines[0]["price"], "4.50")
+        self.assertEqual(lines[0]["quantity"], 2)
+
+    def test_archived_orders_are_exported(self):
+        order = self.create_order(location="in_house", status=Order.DELIVERED)
+        Order.objects.filter(pk=order.pk).update(
+            date_updated=timezone.now() - timedelta(days=31)
+        )
+        call_command("archive_orders", "--older-than-days=30", stdout=StringIO())
+
+        rows = list(csv.DictReader(StringIO(self.export())))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["archived"] for row in rows}, {"True"})
+
+    def test_invalid_range(self):
+        response = self.client.get(
+            reverse("admin-order-export"),
+            {"start": self.today, "end": self.today - timedelta(days=1)},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        self.create_order(location="in_house")
+        stdout = StringIO()
+
+        call_command(
+            "export_orders",
+            f"--start={self.today}",
+            "--format=ndjson",
+            "--chunk-size=1",
+            stdout=stdout,
+        )
+
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Product, ProductVariation, Order, KitchenQueue
+
+
+@override_settings(KITCHEN_QUEUE_LIMITS={"in_house": 2}, KITCHEN_SECONDS_PER_ORDER=60)
+class KitchenAdmissionTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            email="admin@example.com",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.variation = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+
+    def place_order(self, location="in_house"):
+        order_data = {
+            "location": location,
+            "order_items": [{"product_variation_id": self.variation.id, "quantity": 1}],
+        }
+        return self.client.post(reverse("order"), order_data, format="json")
+
+    def queue_depths(self):
+        return dict(KitchenQueue.objects.values_list("location", "depth"))
+
+    @patch("application.store.views.admin_views.send_mail")
+    def test_queue_depth_follows_order_lifecycle(self, mock_send_mail):
+        first = self.place_order().data["id"]
+        second = self.place_order().data["id"]
+        self.assertEqual(self.queue_depths(), {"in_house": 2})
+
+        self.client.patch(
+            reverse("order-read-update", kwargs={"pk": first}),
+            {"location": "take_away"},
+        )
+        self.assertEqual(self.queue_depths(), {"in_house": 1, "take_away": 1})
+
+        self.client.patch(
+            reverse("order-read-update", kwargs={"pk": second}), {"canceled": True}
+        )
+        self.assertEqual(self.queue_depths(), {"in_house": 0, "take_away": 1})
+
+        status_url = reverse("admin-order-status-update", kwargs={"pk": first})
+        self.client.patch(status_url, {"status": "preparation"})
+        self.assertEqual(self.queue_depths(), {"in_house": 0, "take_away": 1})
+        self.client.patch(status_url, {"status": "ready"})
+        self.assertEqual(self.queue_depths(), {"in_house": 0, "take_away": 0})
+
+    def test_orders_are_rejected_when_the_queue_is_full(self):
+        for _ in range(2):
+            response = self.place_order()
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.place_order()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertEqual(Order.objects.count(), 2)
+
+        # Locations without a limit keep accepting orders
+        response = self.place_order(location="take_away")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_order_responses_include_estimated_wait(self):
+        response = self.place_order()
+        self.assertEqual(response.data["estimated_wait"], 60)
+        first_url = reverse("order-read-update", kwargs={"pk": response.data["id"]})
+
+        response = self.place_order()
+        self.assertEqual(response.data["estimated_wait"], 120)
+        # Orders placed later do not push back the ones ahead of them
+        self.assertEqual(self.client.get(first_url).data["estimated_wait"], 60)
+
+        url = reverse("order-read-update", kwargs={"pk": response.data["id"]})
+        self.assertEqual(self.client.get(url).data["estimated_wait"], 120)
+
+        response = self.client.patch(url, {"canceled": True})
+        self.assertEqual(response.data["estimated_wait"], 0)
+
+    def test_rebuild_recounts_queues(self):
+        self.place_order()
+        self.place_order(location="take_away")
+        KitchenQueue.objects.update(depth=10)
+
+        call_command("rebuild_kitchen_queues", stdout=StringIO())
+
+        self.assertEqual(self.queue_depths(), {"in_house": 1, "take_away": 1})
@@ -3,6 +3,8 @@ from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from rest_framework import status
 from ..models import Product, ProductVariation
+from ..serializers.customer_serializers import MenuModelSerializer
+from ..views.customer_views import MenuView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
@@ -53,3 +55,95 @@ class MenuViewTest(APITestCase):
         self.assertEqual(variation_data3["id"], 3)
         self.assertEqual(variation_data3["name"], variation3.name)
         self.assertEqual(variation_data3["price"], variation3.price)
+
+    def test_menu_view_matches_model_serializer(self):
+        for index in range(3):
+            product = Product.objects.create(name=f"Product {index}", active=True)
+            for price in (10.5, 12.0):
+                ProductVariation.objects.create(
+                    product=product, name=f"Size {price}", price=price, active=True
+                )
+        inactive = Product.objects.create(name="Inactive", active=False)
+        ProductVariation.objects.create(
+            product=inactive, name="Variation", price=5.0, active=True
+        )
+
+        url = reverse("menu")
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected_data = MenuModelSerializer(MenuView().get_queryset(), many=True).data
+        self.assertEqual(response.data, expected_data)
+
+
+class MenuSearchViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.latte = Product.objects.create(name="Latte", active=True)
+        self.oat_latte = ProductVariation.objects.create(
+            product=self.latte, name="Oat milk", price=4.5, active=True
+        )
+        self.whole_latte = ProductVariation.objects.create(
+            product=self.latte, name="Whole milk", price=4.0, active=True
+        )
+        self.cookie = Product.objects.create(name="Oatmeal cookie", active=True)
+        self.cookie_variation = ProductVariation.objects.create(
+            product=self.cookie, name="-", price=2.0, active=True
+        )
+        ProductVariation.objects.create(
+            product=self.cookie, name="Oat XL", price=3.0, active=False
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse("menu-search"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (product["id"], [variation["id"] for variation in product["variations"]])
+            for product in response.data
+        ]
+
+    def test_search_by_word_prefixes(self):
+        self.assertEqual(
+            self.search(q="oat latte"), [(self.latte.id, [self.oat_latte.id])]
+        )
+        self.assertEqual(
+            self.search(q="OAT"),
+            [
+                (self.latte.id, [self.oat_latte.id]),
+                (self.cookie.id, [self.cookie_variation.id]),
+            ],
+        )
+        self.assertEqual(self.search(q="mocha"), [])
+
+    def test_search_by_price_range(self):
+        self.assertEqual(
+            self.search(min_price="2.50", max_price="4.00"),
+            [(self.latte.id, [self.whole_latte.id])],
+        )
+        self.assertEqual(
+            self.search(q="oat", max_price="4"),
+            [(self.cookie.id, [self.cookie_variation.id])],
+        )
+
+    def test_search_without_filters_returns_the_menu(self):
+        response = self.client.get(reverse("menu-search"))
+        self.assertEqual(response.data, self.client.get(reverse("menu")).data)
+
+    def test_search_index_is_rebuilt_when_the_catalog_changes(self):
+        self.assertEqual(self.search(q="mocha"), [])
+        mocha = Product.objects.create(name="Mocha", active=True)
+        variation = ProductVariation.objects.create(
+            product=mocha, name="Regular", price=5.0, active=True
+        )
+        self.assertEqual(self.search(q="mocha"), [(mocha.id, [variation.id])])
+        variation.active = False
+        variation.save()
+        self.assertEqual(self.search(q="mocha"), [])
+
+    def test_search_invalid_price(self):
+        response = self.client.get(reverse("menu-search"), {"min_price": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
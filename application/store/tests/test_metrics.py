@@ -0,0 +1,204 @@
+import multiprocessing
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from application.metrics import Registry
+from ..models import Product, ProductVariation
+
+
+def sample_value(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def increment_in_child(registry, count):
+    counter = registry.metrics["jobs_total"]
+    for _ in range(count):
+        counter.inc(queue="default")
+    registry.metrics["job_seconds"].observe(0.3)
+    if "busy_workers" in registry.metrics:
+        registry.metrics["busy_workers"].inc()
+
+
+class RegistryTestCase(TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.counter = self.registry.counter("jobs_total", "Jobs run.", ["queue"])
+        self.histogram = self.registry.histogram(
+            "job_seconds", "Job duration.", buckets=(0.1, 1)
+        )
+
+    def test_text_format(self):
+        self.counter.inc(queue="default")
+        self.counter.inc(2, queue="default")
+        self.histogram.observe(0.05)
+        self.histogram.observe(0.5)
+        self.histogram.observe(5)
+
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP jobs_total Jobs run.\n"
+            "# TYPE jobs_total counter\n"
+            'jobs_total{queue="default"} 3.0\n'
+            "# HELP job_seconds Job duration.\n"
+            "# TYPE job_seconds histogram\n"
+            'job_seconds_bucket{le="0.1"} 1.0\n'
+            'job_seconds_bucket{le="1.0"} 2.0\n'
+            'job_seconds_bucket{le="+Inf"} 3.0\n'
+            "job_seconds_sum 5.55\n"
+            "job_seconds_count 3.0\n",
+        )
+
+    def test_labels_are_checked(self):
+        with self.assertRaises(ValueError):
+            self.counter.inc(location="in_house")
+        with self.assertRaises(ValueError):
+            self.counter.inc(-1, queue="default")
+
+    def test_processes_are_aggregated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_MULTIPROCESS_DIR=directory):
+                self.counter.inc(queue="default")
+                context = multiprocessing.get_context("fork")
+                processes = [
+                    context.Process(
+                        target=increment_in_child, args=(self.registry, 500)
+                    )
+                    for _ in range(3)
+                ]
+                for process in processes:
+                    process.start()
+                for process in processes:
+                    process.join()
+
+                text = self.registry.render()
+                self.registry.store.reset()
+
+        self.assertEqual(sample_value(text, 'jobs_total{queue="default"}'), 1501)
+        self.assertEqual(sample_value(text, "job_seconds_count"), 3)
+        self.assertEqual(sample_value(text, 'job_seconds_bucket{le="1.0"}'), 3)
+
+    def test_dead_processes_are_archived(self):
+        gauge = self.registry.gauge("busy_workers", "Busy workers.")
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_MULTIPROCESS_DIR=directory):
+                gauge.inc()
+                context = multiprocessing.get_context("fork")
+                process = context.Process(
+                    target=increment_in_child, args=(self.registry, 2)
+                )
+                process.start()
+                process.join()
+
+                text = self.registry.render()
+                files = sorted(path.name for path in Path(directory).iterdir())
+                # Archived once only
+                self.assertEqual(self.registry.render(), text)
+                self.registry.store.reset()
+
+        self.assertEqual(sample_value(text, 'jobs_total{queue="default"}'), 2)
+        self.assertEqual(sample_value(text, "busy_workers"), 1)
+        self.assertEqual(
+            files, sorted(["metrics_archive.db", f"metrics_{os.getpid()}.db"])
+        )
+
+
+@patch("application.store.views.admin_views.send_mail")
+class OrderMetricsTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            email="admin@example.com",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.variation = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+
+    def metrics(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content.decode()
+
+    def test_order_flow_is_counted(self, mock_send_mail):
+        before = self.metrics()
+        order_data = {
+            "location": "in_house",
+            "order_items": [{"product_variation_id": self.variation.id, "quantity": 1}],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("order"), order_data, format="json")
+        url = reverse("admin-order-status-update", kwargs={"pk": response.data["id"]})
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as context:
+                self.client.patch(url, {"status": "preparation"})
+        # The status and its timestamps are written by a single UPDATE
+        order_updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "store_order" ')
+        ]
+        self.assertEqual(len(order_updates), 1)
+        self.assertIn('"date_preparation"', order_updates[0])
+        self.client.get(reverse("order-read-update", kwargs={"pk": 0}))
+        after = self.metrics()
+
+        for line_prefix in (
+            'coffeeshop_orders_placed_total{location="in_house"}',
+            'coffeeshop_order_status_changes_total{status="preparation"}',
+            'coffeeshop_order_status_seconds_count{status="waiting"}',
+            'coffeeshop_email_send_seconds_count{outcome="sent"}',
+            'coffeeshop_http_responses_total{status="2xx",view="order"}',
+            'coffeeshop_http_responses_total{status="4xx",view="order-read-update"}',
+        ):
+            with self.subTest(line_prefix=line_prefix):
+                self.assertEqual(
+                    sample_value(after, line_prefix)
+                    - sample_value(before, line_prefix),
+                    1,
+                )
+        self.assertEqual(
+            sample_value(after, 'coffeeshop_kitchen_queue_depth{location="in_house"}'),
+            1,
+        )
+
+    def test_metrics_require_staff(self, mock_send_mail):
+        self.client.credentials()
+        self.assertEqual(
+            self.client.get(reverse("metrics")).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        user = User.objects.create_user(username="customer", password="testpassword")
+        token: RefreshToken = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.assertEqual(
+            self.client.get(reverse("metrics")).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self, mock_send_mail):
+        self.client.credentials()
+        self.assertEqual(
+            self.client.get(reverse("metrics")).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+        self.assertTrue(self.metrics().startswith("# HELP"))
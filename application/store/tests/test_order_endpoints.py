@@ -443,6 +443,28 @@ class OrderDetailViewTestCase(APITestCase):
         expected_data = ReadUpdateModelSerializer(instance=self.order).data
         self.assertEqual(response.data, expected_data)
 
+    def test_get_order_details_with_multiple_items(self):
+        product: Product = Product.objects.create(name="Product 2", active=True)
+        variation: ProductVariation = ProductVariation.objects.create(
+            product=product, name="Large", active=True, price=12.5
+        )
+        OrderItem.objects.create(
+            order=self.order, item_id=variation.pk, quantity=3, price=12.5
+        )
+        url = reverse("order-read-update", args=[self.order.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected_data = ReadUpdateModelSerializer(instance=self.order).data
+        self.assertEqual(response.data, expected_data)
+
+    def test_get_order_details_without_items(self):
+        order: Order = Order.objects.create(customer=self.customer, location="in_house")
+        url = reverse("order-read-update", args=[order.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected_data = ReadUpdateModelSerializer(instance=order).data
+        self.assertEqual(response.data, expected_data)
+
     def test_get_order_details_invalid_order_id(self):
         url = reverse("order-read-update", args=[9999])
         response = self.client.get(url)
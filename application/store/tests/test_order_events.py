@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Product, ProductVariation, Customer, OrderItem, OrderEvent
+
+
+@override_settings(ORDER_EVENTS_FEED_DELAY=timedelta(0))
+class OrderEventFeedTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            email="admin@example.com",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        Customer.objects.create(user=self.admin)
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=12.5
+        )
+
+    def place_order(self):
+        order_data = {
+            "location": "in_house",
+            "order_items": [{"product_variation_id": self.small.id, "quantity": 2}],
+        }
+        response = self.client.post(reverse("order"), order_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    @patch("application.store.views.admin_views.send_mail")
+    def test_order_mutations_are_recorded(self, mock_send_mail):
+        order_id = self.place_order()
+        url = reverse("order-item-create", kwargs={"order_id": order_id})
+        self.client.post(url, {"item_id": self.large.id, "quantity": 1})
+        order_item = OrderItem.objects.get(order_id=order_id, item_id=self.large.id)
+        item_url = reverse(
+            "order-item-update-delete",
+            kwargs={"order_id": order_id, "id": order_item.id},
+        )
+        self.client.patch(item_url, {"quantity": 3})
+        self.client.delete(item_url)
+        for _ in range(2):
+            # The second PATCH changes nothing and records no event
+            self.client.patch(
+                reverse("order-read-update", kwargs={"pk": order_id}),
+                {"location": "take_away"},
+            )
+        self.client.patch(
+            reverse("admin-order-status-update", kwargs={"pk": order_id}),
+            {"status": "preparation"},
+        )
+
+        response = self.client.get(reverse("admin-order-events"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = response.data["results"]
+        self.assertEqual(
+            [event["type"] for event in events],
+            [
+                OrderEvent.ORDER_PLACED,
+                OrderEvent.ORDER_ITEM_ADDED,
+                OrderEvent.ORDER_ITEM_UPDATED,
+                OrderEvent.ORDER_ITEM_REMOVED,
+                OrderEvent.ORDER_UPDATED,
+                OrderEvent.ORDER_STATUS_CHANGED,
+            ],
+        )
+        self.assertTrue(all(event["order_id"] == order_id for event in events))
+        self.assertEqual(events[0]["payload"]["order_items"][0]["quantity"], 2)
+        self.assertEqual(events[2]["payload"]["old_quantity"], 1)
+        self.assertEqual(events[2]["payload"]["order_item"]["quantity"], 3)
+        self.assertEqual(events[3]["payload"]["order_item"]["id"], order_item.id)
+        self.assertEqual(events[4]["payload"]["old_location"], "in_house")
+        self.assertEqual(
+            events[5]["payload"], {"status": "preparation", "old_status": "waiting"}
+        )
+        self.assertEqual(response.data["next"], events[-1]["seq"])
+        self.assertFalse(response.data["has_more"])
+
+    def test_feed_is_paginated_by_sequence(self):
+        for _ in range(3):
+            self.place_order()
+        url = reverse("admin-order-events")
+
+        response = self.client.get(url, {"limit": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(response.data["has_more"])
+
+        response = self.client.get(url, {"after": response.data["next"], "limit": 2})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertFalse(response.data["has_more"])
+
+        after = response.data["next"]
+        response = self.client.get(url, {"after": after})
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["next"], after)
+
+    def test_feed_holds_back_recent_events(self):
+        self.place_order()
+        with override_settings(ORDER_EVENTS_FEED_DELAY=timedelta(minutes=1)):
+            response = self.client.get(reverse("admin-order-events"))
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["next"], 0)
+
+    def test_feed_requires_admin(self):
+        user = User.objects.create_user(username="testuser", password="testpassword")
+        token: RefreshToken = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        response = self.client.get(reverse("admin-order-events"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
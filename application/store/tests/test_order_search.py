@@ -0,0 +1,116 @@
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..archive import archive_orders
+from ..models import ArchivedOrder, Customer, Order, OrderItem
+from ..search import search_orders
+
+
+class OrderSearchTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.alice = self.create_customer("alice", "Alice@Example.com")
+        self.bob = self.create_customer("bob", "bob@example.com")
+
+    def create_customer(self, username, email):
+        user = User.objects.create_user(username=username, email=email)
+        return Customer.objects.create(user=user)
+
+    def create_order(self, customer, days_ago=0, **kwargs):
+        order = Order.objects.create(customer=customer, location="in_house", **kwargs)
+        Order.objects.filter(pk=order.pk).update(
+            date_created=timezone.now() - timedelta(days=days_ago)
+        )
+        OrderItem.objects.create(
+            order=order, name="Latte", price=4.5, quantity=2, item_id=1
+        )
+        return order
+
+    def search(self, **params):
+        response = self.client.get(reverse("admin-order-search"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_search_by_email_with_keyset_pages(self):
+        orders = [self.create_order(self.alice, days_ago=days) for days in range(5)]
+        self.create_order(self.bob)
+
+        # The JWT user, the live orders with their customer and user, their
+        # items, and the archived orders (none, so no archived items query)
+        with self.assertNumQueries(4):
+            page = self.search(email="alice@EXAMPLE.com", limit=2)
+        ids = [order["id"] for order in page["results"]]
+        while page["has_more"]:
+            page = self.search(email="alice@example.com", limit=2, cursor=page["next"])
+            ids += [order["id"] for order in page["results"]]
+
+        self.assertEqual(ids, [order.id for order in orders])
+        self.assertIsNone(page["next"])
+        first = self.search(email="alice@example.com", limit=1)["results"][0]
+        self.assertEqual(
+            first["customer"],
+            {"id": self.alice.id, "username": "alice", "email": "Alice@example.com"},
+        )
+        self.assertEqual(first["total_price"], 9.0)
+        self.assertEqual(first["order_items"][0]["name"], "Latte")
+
+    def test_archived_orders_are_searched(self):
+        orders = [
+            self.create_order(self.alice, days_ago=days, status=Order.DELIVERED)
+            for days in range(4)
+        ]
+        Order.objects.filter(pk__in=[orders[1].pk, orders[3].pk]).update(
+            date_updated=timezone.now() - timedelta(days=60)
+        )
+        self.assertEqual(sum(archive_orders(older_than=timedelta(days=30))), 2)
+
+        ids = []
+        page = {"has_more": True, "next": None}
+        while page["has_more"]:
+            params = {"username": "alice", "limit": 1}
+            if page["next"]:
+                params["cursor"] = page["next"]
+            page = self.search(**params)
+            ids += [order["id"] for order in page["results"]]
+
+        self.assertEqual(ids, [order.id for order in orders])
+        archived = self.search(username="alice", limit=2)["results"][1]
+        self.assertEqual(archived["order_items"][0]["name"], "Latte")
+        self.assertEqual(archived["total_price"], 9.0)
+
+    def test_filters(self):
+        self.create_order(self.alice, days_ago=10)
+        ready = self.create_order(self.alice, status=Order.READY)
+        bob_order = self.create_order(self.bob)
+        today = timezone.localdate()
+
+        def found(**params):
+            return [order["id"] for order in self.search(**params)["results"]]
+
+        self.assertEqual(found(username="alice", status=Order.READY), [ready.id])
+        self.assertEqual(
+            found(start=today - timedelta(days=1)), [bob_order.id, ready.id]
+        )
+        self.assertEqual(found(username="carol"), [])
+
+    def test_email_search_uses_index(self):
+        plan = search_orders(email="alice@example.com").explain()
+        self.assertIn("store_auth_user_email_lower_idx", plan)
+        self.assertIn("store_order_custome_4e8b22_idx", plan)
+        plan = search_orders(email="alice@example.com", model=ArchivedOrder).explain()
+        self.assertIn("store_archi_custome_30e9b7_idx", plan)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("admin-order-search"), {"cursor": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,207 @@
+import uuid
+from datetime import datetime, time, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..archive import archive_orders
+from ..models import (
+    DashboardCounter,
+    KitchenQueue,
+    Order,
+    OrderItem,
+    OrderRollup,
+    PriceSchedule,
+    Product,
+    ProductVariation,
+    SalesRollup,
+)
+from ..schedules import invalidate_price_timeline
+
+
+def rollup_state():
+    sales = SalesRollup.objects.filter(quantity__gt=0).values_list(
+        "item_id", "location", "quantity", "revenue"
+    )
+    orders = OrderRollup.objects.values_list(
+        "location", "orders", "canceled", "delivered"
+    )
+    return sorted(sales), sorted(orders)
+
+
+class BulkOrderUploadTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser", password="testpassword", is_staff=True
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=4.0, stock=3
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=5.0
+        )
+
+    def order(self, *lines, location="in_house", taken_at=None):
+        return {
+            "client_id": str(uuid.uuid4()),
+            "taken_at": (taken_at or timezone.now()).isoformat(),
+            "location": location,
+            "order_items": [
+                {"product_variation_id": variation_id, "quantity": quantity}
+                for variation_id, quantity in lines
+            ],
+        }
+
+    def upload(self, orders):
+        return self.client.post(
+            reverse("admin-order-bulk"), {"orders": orders}, format="json"
+        )
+
+    def test_orders_are_created(self):
+        orders = [
+            self.order((self.small.id, 2), (self.large.id, 1)),
+            self.order((self.small.id, 2), location="take_away"),
+            self.order((999, 1)),
+        ]
+
+        response = self.upload(orders)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["duplicate"]), (2, 0))
+        self.assertEqual(response.data["invalid"], 1)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created", "created", "invalid"],
+        )
+        self.assertEqual(
+            results[2]["error"], "ProductVariation with id 999 does not exist"
+        )
+        order = Order.objects.get(pk=results[0]["id"])
+        self.assertEqual(str(order.client_id), orders[0]["client_id"])
+        self.assertEqual(
+            list(order.order_items.values_list("name", "quantity")),
+            [("Latte (Small)", 2), ("Latte (Large)", 1)],
+        )
+        # The sales already happened: stock stops at zero instead of failing
+        self.small.refresh_from_db()
+        self.assertEqual(self.small.stock, 0)
+        self.assertFalse(self.small.active)
+        self.assertEqual(order.status, Order.DELIVERED)
+        self.assertFalse(KitchenQueue.objects.filter(depth__gt=0).exists())
+
+    def test_orders_are_dated_and_priced_when_taken(self):
+        invalidate_price_timeline()
+        self.addCleanup(invalidate_price_timeline)
+        PriceSchedule.objects.create(
+            variation=self.large, start_time=time(8), price=3.0
+        )
+        PriceSchedule.objects.create(variation=self.large, start_time=time(10))
+        yesterday = timezone.localdate() - timedelta(days=1)
+        taken_at = timezone.make_aware(datetime.combine(yesterday, time(9)))
+
+        response = self.upload([self.order((self.large.id, 1), taken_at=taken_at)])
+
+        order = Order.objects.get(pk=response.data["results"][0]["id"])
+        self.assertEqual(order.date_created, taken_at)
+        self.assertEqual(order.order_items.get().price, 3)
+        counter = DashboardCounter.objects.get(day=yesterday)
+        self.assertEqual((counter.orders, counter.delivered), (1, 1))
+
+    def test_rollups_match_a_rebuild(self):
+        self.upload(
+            [
+                self.order((self.small.id, 2), (self.large.id, 1)),
+                self.order((self.large.id, 1), location="take_away"),
+            ]
+        )
+        incremental = rollup_state()
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        self.assertEqual(rollup_state(), incremental)
+        self.assertEqual(
+            [row[1:] for row in incremental[1]],
+            [(1, 0, 1), (1, 0, 1)],
+        )
+
+    def test_uploads_can_be_retried(self):
+        orders = [self.order((self.large.id, 1)) for _ in range(3)]
+        first = self.upload(orders[:2]).data["results"]
+
+        response = self.upload(orders)
+
+        self.assertEqual(
+            [(result["status"], result["id"]) for result in response.data["results"]],
+            [
+                ("duplicate", first[0]["id"]),
+                ("duplicate", first[1]["id"]),
+                ("created", Order.objects.latest("id").id),
+            ],
+        )
+        self.assertEqual(Order.objects.count(), 3)
+
+    def test_archived_uploads_can_be_retried(self):
+        orders = [self.order((self.large.id, 1))]
+        first = self.upload(orders).data["results"]
+        list(archive_orders(older_than=timedelta(0)))
+        self.assertFalse(Order.objects.exists())
+
+        response = self.upload(orders)
+
+        self.assertEqual(
+            [(result["status"], result["id"]) for result in response.data["results"]],
+            [("duplicate", first[0]["id"])],
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_repeated_client_ids_are_rejected(self):
+        order = self.order((self.large.id, 1))
+
+        response = self.upload([order, order])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(POS_BULK_CHUNK_SIZE=10)
+    def test_orders_are_inserted_in_bulk(self):
+        orders = [self.order((self.large.id, 1), (self.small.id, 1)) for _ in range(25)]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.upload(orders)
+
+        self.assertEqual(response.data["created"], 25)
+        self.assertEqual(OrderItem.objects.count(), 50)
+        inserts = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(
+                ('INSERT INTO "store_order"', 'INSERT INTO "store_orderitem"')
+            )
+        ]
+        self.assertEqual(len(inserts), 6)
+        variation_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "store_productvariation"' in query["sql"]
+        ]
+        self.assertEqual(len(variation_queries), 1)
+
+    def test_only_staff_can_upload(self):
+        user = User.objects.create_user(username="customer", password="testpassword")
+        token: RefreshToken = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+
+        response = self.upload([self.order((self.large.id, 1))])
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,142 @@
+import random
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import patch
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Product, ProductVariation, Order, PreparationStats
+from ..prep_stats import invalidate_preparation_estimates
+from ..sketches import P2Quantile, running_stats_add
+
+
+class SketchesTestCase(TestCase):
+    def test_running_stats(self):
+        values = [3.0, 5.0, 7.0, 9.0]
+        state = {"count": 0, "mean": 0.0, "m2": 0.0}
+        for value in values:
+            running_stats_add(state, value)
+        self.assertEqual(state["mean"], 6.0)
+        self.assertEqual(state["m2"], 20.0)
+
+    def test_p2_quantiles(self):
+        generator = random.Random(7)
+        values = [generator.expovariate(1 / 300) for _ in range(5000)]
+        ordered = sorted(values)
+        for p in (0.5, 0.9):
+            with self.subTest(p=p):
+                sketch = P2Quantile(p)
+                for value in values:
+                    # Round trip through the stored state on every value
+                    sketch = P2Quantile.from_state(sketch.state())
+                    sketch.add(value)
+                exact = ordered[int(p * len(ordered))]
+                self.assertAlmostEqual(sketch.value(), exact, delta=exact * 0.05)
+
+    def test_p2_with_few_values(self):
+        sketch = P2Quantile(0.5)
+        self.assertIsNone(sketch.value())
+        for value in (30, 10, 20):
+            sketch.add(value)
+        self.assertEqual(sketch.value(), 20)
+
+
+@override_settings(KITCHEN_SECONDS_PER_ORDER=60)
+@patch("application.store.views.admin_views.send_mail")
+class PreparationEtaTestCase(APITestCase):
+    def setUp(self):
+        invalidate_preparation_estimates()
+        self.addCleanup(invalidate_preparation_estimates)
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            email="admin@example.com",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=12.5
+        )
+
+    def place_order(self, *variations):
+        order_data = {
+            "location": "in_house",
+            "order_items": [
+                {"product_variation_id": variation.id, "quantity": 1}
+                for variation in variations
+            ],
+        }
+        response = self.client.post(reverse("order"), order_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def set_status(self, order_id, status):
+        url = reverse("admin-order-status-update", kwargs={"pk": order_id})
+        response = self.client.patch(url, {"status": status})
+        self.assertEqual(response.status_code, 200)
+
+    def prepare(self, order_id, seconds):
+        self.set_status(order_id, Order.PREPARATION)
+        Order.objects.filter(pk=order_id).update(
+            date_preparation=timezone.now() - timedelta(seconds=seconds)
+        )
+        self.set_status(order_id, Order.READY)
+
+    def test_ready_orders_update_preparation_stats(self, mock_send_mail):
+        for seconds in (100, 200, 300):
+            self.prepare(self.place_order(self.small, self.large), seconds)
+        self.prepare(self.place_order(self.small), 400)
+
+        stats = {row.item_id: row for row in PreparationStats.objects.all()}
+        self.assertEqual(stats[self.small.id].count, 4)
+        self.assertAlmostEqual(stats[self.small.id].mean, 250, delta=1)
+        self.assertEqual(stats[self.large.id].count, 3)
+        self.assertAlmostEqual(stats[self.large.id].mean, 200, delta=1)
+        median = P2Quantile.from_state(stats[self.large.id].p50).value()
+        self.assertAlmostEqual(median, 200, delta=1)
+
+    def test_estimated_wait_uses_stats_and_queue_position(self, mock_send_mail):
+        for seconds in (100, 200, 300):
+            self.prepare(self.place_order(self.small), seconds)
+        self.prepare(self.place_order(self.large), 500)
+
+        first = self.place_order(self.small)
+        second = self.place_order(self.small, self.large)
+
+        url = reverse("order-read-update", kwargs={"pk": first})
+        self.assertEqual(self.client.get(url).data["estimated_wait"], 200)
+        url = reverse("order-read-update", kwargs={"pk": second})
+        self.assertEqual(self.client.get(url).data["estimated_wait"], 60 + 500)
+
+        self.set_status(first, Order.PREPARATION)
+        Order.objects.filter(pk=first).update(
+            date_preparation=timezone.now() - timedelta(seconds=50)
+        )
+        url = reverse("order-read-update", kwargs={"pk": first})
+        self.assertAlmostEqual(
+            self.client.get(url).data["estimated_wait"], 150, delta=2
+        )
+
+    def test_estimated_wait_reads_no_stats(self, mock_send_mail):
+        self.prepare(self.place_order(self.small), 100)
+        order_id = self.place_order(self.small)
+        url = reverse("order-read-update", kwargs={"pk": order_id})
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.data["estimated_wait"], 100)
+        statements = [query["sql"] for query in queries.captured_queries]
+        self.assertFalse([sql for sql in statements if "store_preparationstats" in sql])
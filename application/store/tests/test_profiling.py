@@ -0,0 +1,93 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from application.profiling import _profiler_lock
+from ..models import Product, ProductVariation
+
+
+class ProfilingMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(PROFILING_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        product = Product.objects.create(name="Latte", active=True)
+        self.variation = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+
+    def authenticate(self, is_staff):
+        user = User.objects.create_user(
+            username=f"user{User.objects.count()}", is_staff=is_staff
+        )
+        token: RefreshToken = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+
+    def place_order(self, **extra):
+        order_data = {
+            "location": "in_house",
+            "order_items": [{"product_variation_id": self.variation.id, "quantity": 1}],
+        }
+        return self.client.post(reverse("order"), order_data, format="json", **extra)
+
+    def test_staff_request_is_profiled(self):
+        self.authenticate(is_staff=True)
+
+        response = self.place_order(HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(int(response["X-Profile-Queries"]), 0)
+        report = (self.directory / response["X-Profile-Report"]).read_text()
+        self.assertIn("POST /cofeeshop/api/orders/ -> 201", report)
+        self.assertIn('INSERT INTO "store_order"', report)
+        self.assertIn("customer_views.py", report)
+        self.assertIn("function calls", report)
+
+    def test_report_can_be_returned(self):
+        self.authenticate(is_staff=True)
+
+        response = self.client.get(reverse("menu"), {"_profile": "report"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn("read_serializers.py", response.content.decode())
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_concurrent_profile_gets_sql_only_report(self):
+        self.authenticate(is_staff=True)
+
+        with _profiler_lock:
+            response = self.client.get(reverse("menu"), {"_profile": "report"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.content.decode()
+        self.assertIn("read_serializers.py", report)
+        self.assertIn("No Python profile", report)
+        self.assertNotIn("function calls", report)
+
+    def test_other_users_are_not_profiled(self):
+        self.authenticate(is_staff=False)
+
+        with patch("cProfile.Profile") as profile:
+            response = self.place_order(HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("X-Profile-Queries", response)
+        profile.assert_not_called()
+
+    def test_requests_without_trigger_are_not_profiled(self):
+        self.authenticate(is_staff=True)
+
+        with patch("application.profiling.is_staff") as is_staff:
+            response = self.place_order()
+
+        self.assertNotIn("X-Profile-Queries", response)
+        is_staff.assert_not_called()
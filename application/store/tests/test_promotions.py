@@ -0,0 +1,238 @@
+from datetime import time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import PriceSchedule, Product, ProductVariation, Promotion, SalesRollup
+from ..pricing import PricingRules, get_pricing_rules, invalidate_pricing_rules
+from ..schedules import invalidate_price_timeline
+
+
+def promotion(**kwargs):
+    kwargs.setdefault("kind", Promotion.PERCENT_OFF)
+    kwargs.setdefault("value", Decimal("50"))
+    return Promotion(name="Promotion", **kwargs)
+
+
+def at(hour, minute=0):
+    return timezone.make_aware(
+        timezone.datetime(2023, 6, 1, hour, minute), timezone.get_current_timezone()
+    )
+
+
+class PricingRulesTestCase(TestCase):
+    def test_happy_hour_window(self):
+        rules = PricingRules([promotion(start_time=time(16), end_time=time(18, 30))])
+
+        discounts = [
+            rules.line_discount(1, Decimal("4.00"), 1, at(hour, minute))
+            for hour, minute in ((15, 59), (16, 0), (18, 29), (18, 30))
+        ]
+
+        self.assertEqual(discounts, [0, Decimal("2.00"), Decimal("2.00"), 0])
+
+    def test_window_wrapping_midnight(self):
+        rules = PricingRules([promotion(start_time=time(22), end_time=time(2))])
+
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 1, at(23)), 2)
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 1, at(1, 59)), 2)
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 1, at(2)), 0)
+
+    def test_every_nth_unit(self):
+        rules = PricingRules([promotion(every_nth=2)])
+
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 1, at(9)), 0)
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 3, at(9)), 2)
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 4, at(9)), 4)
+
+    def test_best_rule_applies(self):
+        rules = PricingRules(
+            [
+                promotion(kind=Promotion.AMOUNT_OFF, value=Decimal("0.50")),
+                promotion(kind=Promotion.FIXED_PRICE, value=Decimal("3"), item_ids=[1]),
+                promotion(value=Decimal("75"), code="WELCOME"),
+            ]
+        )
+
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 2, at(9)), 2)
+        self.assertEqual(rules.line_discount(2, Decimal("4.00"), 2, at(9)), 1)
+        self.assertEqual(
+            rules.line_discount(2, Decimal("4.00"), 2, at(9), "WELCOME"), 6
+        )
+
+    def test_validity_period(self):
+        rules = PricingRules([promotion(code="JUNE", starts_at=at(9), ends_at=at(17))])
+
+        self.assertFalse(rules.has_code("JUNE", at(8)))
+        self.assertTrue(rules.has_code("JUNE", at(12)))
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 1, at(12), "JUNE"), 2)
+        self.assertEqual(rules.line_discount(1, Decimal("4.00"), 1, at(17), "JUNE"), 0)
+
+
+class PromotionPricingTestCase(APITestCase):
+    def setUp(self):
+        invalidate_pricing_rules()
+        self.addCleanup(invalidate_pricing_rules)
+        self.admin = User.objects.create_user(
+            username="adminuser", password="testpassword", is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=4.0
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=5.0
+        )
+
+    def authenticate(self, user):
+        token: RefreshToken = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+
+    def create_promotion(self, **data):
+        self.authenticate(self.admin)
+        data.setdefault("name", "Promotion")
+        data.setdefault("kind", Promotion.PERCENT_OFF)
+        response = self.client.post(
+            reverse("admin-promotion-list-create"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.authenticate(self.user)
+        return response.data
+
+    def place_order(self, quantities, **data):
+        order_data = {
+            "location": "in_house",
+            "order_items": [
+                {"product_variation_id": variation.id, "quantity": quantity}
+                for variation, quantity in quantities
+            ],
+            **data,
+        }
+        return self.client.post(reverse("order"), order_data, format="json")
+
+    def test_happy_hour_and_second_drink_half_off(self):
+        now = timezone.localtime()
+        self.create_promotion(
+            value="20",
+            item_ids=[self.small.id],
+            start_time=(now - timedelta(hours=1)).time(),
+            end_time=(now + timedelta(hours=1)).time(),
+        )
+        self.create_promotion(value="50", every_nth=2)
+
+        response = self.place_order([(self.small, 1), (self.large, 3)])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [line["discount"] for line in response.json()["order_items"]],
+            [0.8, 2.5],
+        )
+        order = self.client.get(
+            reverse("order-read-update", kwargs={"pk": response.data["id"]})
+        ).json()
+        self.assertEqual(order["total_price"], 3.2 + 12.5)
+
+    def test_added_lines_are_priced_at_the_order_time(self):
+        invalidate_price_timeline()
+        self.addCleanup(invalidate_price_timeline)
+        PriceSchedule.objects.create(
+            variation=self.large, start_time=time(16), price=Decimal("3.00")
+        )
+        PriceSchedule.objects.create(variation=self.large, start_time=time(18, 30))
+        self.create_promotion(
+            value="20",
+            item_ids=[self.large.id],
+            start_time=time(16),
+            end_time=time(18, 30),
+        )
+        with patch("django.utils.timezone.now", return_value=at(17)):
+            order_id = self.place_order([(self.small, 1)]).data["id"]
+
+        with patch("django.utils.timezone.now", return_value=at(19)):
+            line = self.client.post(
+                reverse("order-item-create", kwargs={"order_id": order_id}),
+                {"item_id": self.large.id, "quantity": 2},
+                format="json",
+            )
+
+        self.assertEqual(line.status_code, status.HTTP_201_CREATED)
+        line = self.client.get(
+            reverse("order-read-update", kwargs={"pk": order_id})
+        ).json()["order_items"][1]
+        self.assertEqual((line["price"], line["discount"]), (3.0, 1.2))
+
+    def test_promo_code(self):
+        self.create_promotion(value="10", code="WELCOME")
+
+        response = self.place_order([(self.small, 1)], promo_code="UNKNOWN")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["promo_code"], ["Promo code UNKNOWN is not valid."]
+        )
+        without_code = self.place_order([(self.small, 1)])
+        with_code = self.place_order([(self.small, 1)], promo_code="WELCOME")
+
+        self.assertEqual(without_code.json()["order_items"][0]["discount"], 0)
+        self.assertEqual(with_code.json()["order_items"][0]["discount"], 0.4)
+
+    def test_lines_are_repriced_and_rollups_stay_consistent(self):
+        self.create_promotion(value="50", every_nth=2)
+        order_id = self.place_order([(self.small, 1)]).data["id"]
+        line = self.client.post(
+            reverse("order-item-create", kwargs={"order_id": order_id}),
+            {"item_id": self.large.id, "quantity": 2},
+            format="json",
+        )
+        self.assertEqual(line.status_code, status.HTTP_201_CREATED)
+        url = reverse(
+            "order-item-update-delete",
+            kwargs={"order_id": order_id, "id": line.data["id"]},
+        )
+        self.client.patch(url, {"quantity": 5}, format="json")
+
+        order = self.client.get(
+            reverse("order-read-update", kwargs={"pk": order_id})
+        ).json()
+        self.assertEqual(order["order_items"][1]["discount"], 5.0)
+        self.assertEqual(order["total_price"], 4 + 25 - 5)
+        revenue = sum(SalesRollup.objects.values_list("revenue", flat=True))
+        self.assertEqual(revenue, Decimal("24.00"))
+
+    def test_rules_are_compiled_once_and_invalidated_on_change(self):
+        promotion = self.create_promotion(value="10")
+        rules = get_pricing_rules()
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_pricing_rules(), rules)
+            rules.line_discount(self.small.id, Decimal("4.00"), 1, timezone.now())
+
+        self.authenticate(self.admin)
+        url = reverse("admin-promotion-detail", kwargs={"pk": promotion["id"]})
+        self.client.patch(url, {"active": False}, format="json")
+        self.assertIsNot(get_pricing_rules(), rules)
+        self.assertEqual(
+            get_pricing_rules().line_discount(
+                self.small.id, Decimal("4.00"), 1, timezone.now()
+            ),
+            0,
+        )
+
+    def test_invalid_promotions(self):
+        self.authenticate(self.admin)
+        url = reverse("admin-promotion-list-create")
+        for data in (
+            {"kind": Promotion.PERCENT_OFF, "value": "120"},
+            {"kind": Promotion.AMOUNT_OFF, "value": "1", "start_time": "16:00"},
+            {"kind": Promotion.AMOUNT_OFF, "value": "1", "every_nth": 1},
+        ):
+            with self.subTest(data=data):
+                response = self.client.post(url, {"name": "Promotion", **data})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,263 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Customer, Favorite, Order, OrderItem, Product, ProductVariation
+from ..serializers.customer_serializers import FavoriteSerializer
+
+
+class ReorderTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.customer = Customer.objects.create(user=self.user)
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=4.0
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=5.0
+        )
+        self.muffin = ProductVariation.objects.create(
+            product=Product.objects.create(name="Muffin", active=True),
+            name="-",
+            price=3.0,
+        )
+
+    def place_order(self):
+        order_data = {
+            "location": "take_away",
+            "order_items": [
+                {"product_variation_id": self.small.id, "quantity": 2},
+                {"product_variation_id": self.large.id, "quantity": 1},
+                {"product_variation_id": self.muffin.id, "quantity": 1},
+            ],
+        }
+        response = self.client.post(reverse("order"), order_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def reorder(self, order_id, data=None):
+        url = reverse("order-reorder", kwargs={"pk": order_id})
+        return self.client.post(url, data or {}, format="json")
+
+    def test_reorder_copies_lines_at_current_prices(self):
+        order_id = self.place_order()
+        ProductVariation.objects.filter(pk=self.small.pk).update(price=4.5)
+        ProductVariation.objects.filter(pk=self.large.pk).update(active=False)
+
+        response = self.reorder(order_id)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["location"], "take_away")
+        self.assertEqual(
+            [
+                (line["item_id"], line["name"], line["price"], line["quantity"])
+                for line in response.json()["order_items"]
+            ],
+            [
+                (self.small.id, "Latte (Small)", 4.5, 2),
+                (self.muffin.id, "Muffin", 3.0, 1),
+            ],
+        )
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_reorder_merges_repeated_variations(self):
+        order_data = {
+            "location": "in_house",
+            "order_items": [
+                {"product_variation_id": self.small.id, "quantity": 2},
+                {"product_variation_id": self.small.id, "quantity": 3},
+            ],
+        }
+        order_id = self.client.post(reverse("order"), order_data, format="json").data[
+            "id"
+        ]
+
+        response = self.reorder(order_id)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [
+                (line["item_id"], line["quantity"])
+                for line in response.json()["order_items"]
+            ],
+            [(self.small.id, 5)],
+        )
+
+    def test_reorder_with_another_location(self):
+        order_id = self.place_order()
+
+        response = self.reorder(order_id, {"location": "in_house"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["location"], "in_house")
+
+    def test_reorder_archived_order(self):
+        order_id = self.place_order()
+        Order.objects.filter(pk=order_id).update(
+            status=Order.DELIVERED, date_updated=timezone.now() - timedelta(days=60)
+        )
+        call_command("archive_orders", stdout=StringIO())
+
+        response = self.reorder(order_id)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["order_items"]), 3)
+
+    def test_reorder_reserves_stock(self):
+        order_id = self.place_order()
+        ProductVariation.objects.filter(pk=self.small.pk).update(stock=1)
+
+        response = self.reorder(order_id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {"error": f"ProductVariation with id {self.small.id} is out of stock."},
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_reorder_when_nothing_is_available(self):
+        order_id = self.place_order()
+        ProductVariation.objects.update(active=False)
+
+        response = self.reorder(order_id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data, {"error": "None of the items is available anymore."}
+        )
+
+    def test_reorder_order_of_another_customer(self):
+        order_id = self.place_order()
+        other = User.objects.create_user(username="other", password="testpassword")
+        token: RefreshToken = RefreshToken.for_user(other)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+
+        response = self.reorder(order_id)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reorder_queries_do_not_depend_on_the_lines(self):
+        order_id = self.place_order()
+        item_ids = [self.small.id, self.large.id, self.muffin.id]
+
+        def lines_query_count():
+            with CaptureQueriesContext(connection) as context:
+                self.reorder(order_id)
+            return sum(
+                'FROM "store_productvariation"' in query["sql"]
+                or 'INSERT INTO "store_orderitem"' in query["sql"]
+                for query in context.captured_queries
+            )
+
+        three_lines = lines_query_count()
+        OrderItem.objects.filter(order_id=order_id, item_id__in=item_ids[1:]).delete()
+        self.assertEqual(lines_query_count(), three_lines)
+
+
+class FavoritesTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=4.0
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=5.0
+        )
+
+    def add_favorite(self, item_id, quantity=1):
+        return self.client.post(
+            reverse("favorite-list-create"),
+            {"item_id": item_id, "quantity": quantity},
+            format="json",
+        )
+
+    def test_add_list_and_delete_favorites(self):
+        self.assertEqual(
+            self.add_favorite(self.small.id, 2).status_code, status.HTTP_201_CREATED
+        )
+        favorite_id = self.add_favorite(self.large.id).data["id"]
+
+        response = self.client.get(reverse("favorite-list-create"))
+        self.assertEqual(
+            [(line["item_id"], line["quantity"]) for line in response.data],
+            [(self.small.id, 2), (self.large.id, 1)],
+        )
+
+        url = reverse("favorite-delete", kwargs={"pk": favorite_id})
+        self.assertEqual(
+            self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT
+        )
+        self.assertEqual(Favorite.objects.count(), 1)
+
+    def test_invalid_favorites(self):
+        self.add_favorite(self.small.id)
+
+        response = self.add_favorite(self.small.id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"][0],
+            f"Favorite with item_id {self.small.id} already exists.",
+        )
+        response = self.add_favorite(999)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_concurrent_duplicate_favorite(self):
+        self.add_favorite(self.small.id)
+        # A concurrent request passed validation before the first one committed
+        with patch.object(FavoriteSerializer, "validate", lambda self, attrs: attrs):
+            response = self.add_favorite(self.small.id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"][0],
+            f"Favorite with item_id {self.small.id} already exists.",
+        )
+        self.assertEqual(Favorite.objects.count(), 1)
+
+    def test_favorites_of_other_customers_cannot_be_deleted(self):
+        favorite_id = self.add_favorite(self.small.id).data["id"]
+        other = User.objects.create_user(username="other", password="testpassword")
+        token: RefreshToken = RefreshToken.for_user(other)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+
+        url = reverse("favorite-delete", kwargs={"pk": favorite_id})
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse("favorite-list-create")).data, [])
+
+    def test_order_favorites(self):
+        self.add_favorite(self.small.id, 2)
+        self.add_favorite(self.large.id)
+        ProductVariation.objects.filter(pk=self.large.pk).update(active=False)
+
+        response = self.client.post(
+            reverse("favorite-order"), {"location": "in_house"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [
+                (line["item_id"], line["quantity"])
+                for line in response.data["order_items"]
+            ],
+            [(self.small.id, 2)],
+        )
+        response = self.client.post(reverse("favorite-order"), {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,130 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..archive import archive_orders
+from ..models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    BlacklistedToken,
+    Customer,
+    Favorite,
+    Order,
+    OrderEvent,
+    OrderItem,
+)
+from ..retention import purge_retention
+
+OLD = 800
+RECENT = 10
+
+
+class RetentionTestCase(TestCase):
+    def create_customer(self, username, days_ago=OLD):
+        user = User.objects.create_user(username=username)
+        User.objects.filter(pk=user.pk).update(
+            date_joined=timezone.now() - timedelta(days=days_ago)
+        )
+        return Customer.objects.create(user=user)
+
+    def create_order(self, customer, days_ago=OLD, **kwargs):
+        order = Order.objects.create(customer=customer, location="in_house", **kwargs)
+        OrderItem.objects.create(
+            order=order, name="Latte", item_id=1, quantity=1, price=4.5
+        )
+        Order.objects.filter(pk=order.pk).update(
+            date_updated=timezone.now() - timedelta(days=days_ago)
+        )
+        return order
+
+    def test_expired_data_is_purged(self):
+        customer = self.create_customer("customer")
+        archived = self.create_order(customer, status=Order.DELIVERED)
+        sum(archive_orders(older_than=timedelta(days=30)))
+        canceled = self.create_order(customer, canceled=True)
+        self.create_order(customer, status=Order.DELIVERED, days_ago=RECENT)
+        waiting = self.create_order(customer)
+        for days_ago in (OLD, RECENT):
+            event = OrderEvent.objects.create(
+                order_id=waiting.id, type=OrderEvent.ORDER_PLACED, payload={}
+            )
+            OrderEvent.objects.filter(pk=event.pk).update(
+                date_created=timezone.now() - timedelta(days=days_ago)
+            )
+        inactive = self.create_customer("inactive")
+        Favorite.objects.create(customer=inactive, item_id=1)
+        self.create_customer("newcomer", days_ago=RECENT)
+        BlacklistedToken.objects.create(
+            jti=uuid.uuid4(), expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        purged = {}
+        for name, count in purge_retention(batch_size=1):
+            purged[name] = purged.get(name, 0) + count
+
+        self.assertEqual(
+            purged,
+            {
+                "archived orders": 1,
+                "orders": 1,
+                "order events": 1,
+                "customers": 1,
+                "blacklisted tokens": 1,
+            },
+        )
+        self.assertFalse(ArchivedOrder.objects.filter(pk=archived.pk).exists())
+        self.assertFalse(ArchivedOrderItem.objects.exists())
+        self.assertFalse(Order.objects.filter(pk=canceled.pk).exists())
+        self.assertFalse(OrderItem.objects.filter(order_id=canceled.pk).exists())
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(OrderItem.objects.count(), 2)
+        self.assertEqual(OrderEvent.objects.count(), 1)
+        self.assertFalse(User.objects.filter(pk=inactive.user_id).exists())
+        self.assertFalse(Favorite.objects.exists())
+        self.assertEqual(
+            set(Customer.objects.values_list("user__username", flat=True)),
+            {"customer", "newcomer"},
+        )
+
+    def test_customers_using_the_app_are_kept(self):
+        customer = self.create_customer("regular")
+        User.objects.filter(pk=customer.user_id).update(
+            last_login=timezone.now() - timedelta(days=OLD)
+        )
+        refresh = RefreshToken.for_user(customer.user)
+        response = self.client.post(reverse("refresh-token"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, 200)
+
+        list(purge_retention())
+
+        self.assertTrue(Customer.objects.filter(pk=customer.pk).exists())
+
+    def test_dry_run_deletes_nothing(self):
+        customer = self.create_customer("customer")
+        self.create_order(customer, canceled=True)
+        stdout = StringIO()
+
+        call_command("purge_retention", "--dry-run", stdout=stdout)
+
+        self.assertIn("Would purge 1 orders", stdout.getvalue())
+        self.assertIn("Would purge 0 customers", stdout.getvalue())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_command_reports_progress(self):
+        customer = self.create_customer("customer")
+        for _ in range(3):
+            self.create_order(customer, canceled=True)
+        stdout = StringIO()
+
+        call_command("purge_retention", "--batch-size=2", stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn("Purged 2 orders (2 total)", output)
+        self.assertIn("Purged 1 orders (3 total)", output)
+        self.assertIn("Purged 1 customers (1 total)", output)
+        self.assertFalse(Customer.objects.exists())
@@ -0,0 +1,153 @@
+from io import StringIO
+from decimal import Decimal
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import (
+    Product,
+    ProductVariation,
+    Order,
+    OrderItem,
+    SalesRollup,
+    OrderRollup,
+)
+
+
+class SalesRollupTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.small = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+        self.large = ProductVariation.objects.create(
+            product=product, name="Large", price=12.5
+        )
+
+    def place_order(self, location="in_house"):
+        order_data = {
+            "location": location,
+            "order_items": [
+                {"product_variation_id": self.small.id, "quantity": 2},
+                {"product_variation_id": self.large.id, "quantity": 1},
+            ],
+        }
+        response = self.client.post(reverse("order"), order_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Order.objects.get(pk=response.data["id"])
+
+    def rollup_state(self):
+        sales = SalesRollup.objects.filter(quantity__gt=0).values_list(
+            "item_id", "location", "quantity", "revenue"
+        )
+        orders = OrderRollup.objects.values_list(
+            "location", "orders", "canceled", "delivered"
+        )
+        return sorted(sales), sorted(orders)
+
+    def test_rollups_follow_order_lifecycle(self):
+        order = self.place_order()
+        self.assertEqual(
+            self.rollup_state(),
+            (
+                [
+                    (self.small.id, "in_house", 2, Decimal("20.00")),
+                    (self.large.id, "in_house", 1, Decimal("12.50")),
+                ],
+                [("in_house", 1, 0, 0)],
+            ),
+        )
+
+        small_line = order.order_items.get(item_id=self.small.id)
+        url = reverse("order-item-update-delete", args=[order.id, small_line.id])
+        self.client.patch(url, {"quantity": 3}, format="json")
+        large_line = order.order_items.get(item_id=self.large.id)
+        url = reverse("order-item-update-delete", args=[order.id, large_line.id])
+        self.client.delete(url)
+        url = reverse("order-read-update", args=[order.id])
+        self.client.patch(url, {"location": "take_away"})
+        self.assertEqual(
+            self.rollup_state(),
+            (
+                [(self.small.id, "take_away", 3, Decimal("30.00"))],
+                [("in_house", 0, 0, 0), ("take_away", 1, 0, 0)],
+            ),
+        )
+
+        self.client.patch(url, {"canceled": True})
+        self.assertEqual(
+            self.rollup_state(), ([], [("in_house", 0, 0, 0), ("take_away", 1, 1, 0)])
+        )
+
+    def test_delivered_orders_are_counted(self):
+        order = self.place_order(location="take_away")
+        url = reverse("admin-order-status-update", args=[order.id])
+        self.client.patch(url, {"status": Order.DELIVERED})
+        self.assertEqual(self.rollup_state()[1], [("take_away", 1, 0, 1)])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.place_order()
+        canceled = self.place_order(location="take_away")
+        url = reverse("order-read-update", args=[canceled.id])
+        self.client.patch(url, {"canceled": True})
+        OrderItem.objects.create(
+            order=self.place_order(), name="Latte", price=1.0, quantity=1, item_id=999
+        )
+        expected_state = self.rollup_state()
+        # The line inserted behind the views' back only shows up after a rebuild
+        expected_state[0].append((999, "in_house", 1, Decimal("1.00")))
+        expected_state[0].sort()
+
+        call_command("rebuild_rollups", "--batch-size=2", stdout=StringIO())
+
+        self.assertEqual(self.rollup_state(), expected_state)
+
+    def test_sales_report(self):
+        self.place_order()
+        self.place_order(location="take_away")
+        today = timezone.localdate()
+
+        url = reverse("admin-sales-report")
+        response = self.client.get(url, {"top": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["revenue"], Decimal("65.00"))
+        self.assertEqual(
+            response.data["days"],
+            [
+                {
+                    "day": today,
+                    "revenue": Decimal("65.00"),
+                    "orders": {"in_house": 1, "take_away": 1},
+                    "canceled": 0,
+                    "delivered": 0,
+                }
+            ],
+        )
+        self.assertEqual(
+            response.data["top_variations"],
+            [
+                {
+                    "item_id": self.small.id,
+                    "name": "Latte (Small)",
+                    "quantity": 4,
+                    "revenue": Decimal("40.00"),
+                }
+            ],
+        )
+
+    def test_sales_report_invalid_range(self):
+        url = reverse("admin-sales-report")
+        response = self.client.get(url, {"start": "2023-06-10", "end": "2023-06-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,151 @@
+from datetime import time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..menu_index import invalidate_menu_index
+from ..models import PriceSchedule, Product, ProductVariation
+from ..schedules import PriceTimeline, invalidate_price_timeline
+
+
+def at(hour, minute=0, day=1):
+    return timezone.make_aware(
+        timezone.datetime(2023, 6, day, hour, minute), timezone.get_current_timezone()
+    )
+
+
+def entry(variation_id, start_time, price=None, active=True):
+    return PriceSchedule(
+        variation_id=variation_id, start_time=start_time, price=price, active=active
+    )
+
+
+class PriceTimelineTestCase(TestCase):
+    def setUp(self):
+        self.timeline = PriceTimeline(
+            [
+                entry(1, time(7), Decimal("3.00")),
+                entry(1, time(11), Decimal("4.00")),
+                entry(2, time(6), active=True),
+                entry(2, time(12), active=False),
+            ]
+        )
+
+    def test_state_at(self):
+        price = self.timeline.price
+        self.assertEqual(price(1, Decimal("5.00"), at(6, 59)), Decimal("4.00"))
+        self.assertEqual(price(1, Decimal("5.00"), at(7)), Decimal("3.00"))
+        self.assertEqual(price(1, Decimal("5.00"), at(10, 59)), Decimal("3.00"))
+        self.assertEqual(price(1, Decimal("5.00"), at(23)), Decimal("4.00"))
+        self.assertEqual(price(2, Decimal("5.00"), at(8)), Decimal("5.00"))
+        self.assertEqual(price(3, Decimal("5.00"), at(8)), Decimal("5.00"))
+        self.assertTrue(self.timeline.is_active(2, at(11, 59)))
+        self.assertFalse(self.timeline.is_active(2, at(12)))
+        self.assertTrue(self.timeline.is_active(3, at(12)))
+
+    def test_next_boundary(self):
+        self.assertEqual(self.timeline.next_boundary(at(6, 30)), at(7))
+        self.assertEqual(self.timeline.next_boundary(at(7)), at(11))
+        self.assertEqual(self.timeline.next_boundary(at(13)), at(6, day=2))
+        self.assertIsNone(PriceTimeline([]).next_boundary(at(13)))
+
+
+class ScheduledMenuTestCase(APITestCase):
+    def setUp(self):
+        for invalidate in (invalidate_price_timeline, invalidate_menu_index):
+            invalidate()
+            self.addCleanup(invalidate)
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.latte = ProductVariation.objects.create(
+            product=product, name="Small", price=5.0
+        )
+        self.croissant = ProductVariation.objects.create(
+            product=Product.objects.create(name="Croissant", active=True),
+            name="-",
+            price=2.0,
+        )
+        PriceSchedule.objects.create(
+            variation=self.latte, start_time=time(7), price=Decimal("3.50")
+        )
+        PriceSchedule.objects.create(variation=self.latte, start_time=time(11))
+        PriceSchedule.objects.create(variation=self.croissant, start_time=time(6))
+        PriceSchedule.objects.create(
+            variation=self.croissant, start_time=time(12), active=False
+        )
+
+    def menu(self, url_name="menu-search"):
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            variation["id"]: variation["price"]
+            for product in response.json()
+            for variation in product["variations"]
+        }
+
+    def test_menu_switches_at_the_boundaries(self):
+        date_updated = self.latte.date_updated
+
+        with patch("django.utils.timezone.now", return_value=at(8)):
+            morning = self.menu()
+            self.assertEqual(self.menu("menu"), morning)
+        with patch("django.utils.timezone.now", return_value=at(11, 30)):
+            noon = self.menu()
+        with patch("django.utils.timezone.now", return_value=at(12)):
+            afternoon = self.menu()
+
+        self.assertEqual(morning, {self.latte.id: 3.5, self.croissant.id: 2.0})
+        self.assertEqual(noon, {self.latte.id: 5.0, self.croissant.id: 2.0})
+        self.assertEqual(afternoon, {self.latte.id: 5.0})
+        self.latte.refresh_from_db()
+        self.assertEqual(self.latte.date_updated, date_updated)
+
+    def test_orders_are_priced_with_the_schedule(self):
+        order_data = {
+            "location": "in_house",
+            "order_items": [{"product_variation_id": self.latte.id, "quantity": 2}],
+        }
+        with patch("django.utils.timezone.now", return_value=at(8)):
+            response = self.client.post(reverse("order"), order_data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["order_items"][0]["price"], 3.5)
+
+    def test_scheduled_off_variations_cannot_be_ordered(self):
+        order_data = {
+            "location": "in_house",
+            "order_items": [{"product_variation_id": self.croissant.id, "quantity": 1}],
+        }
+        with patch("django.utils.timezone.now", return_value=at(13)):
+            response = self.client.post(reverse("order"), order_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["error"],
+            f"ProductVariation with id {self.croissant.id} is not available",
+        )
+
+        order_data["order_items"][0]["product_variation_id"] = self.latte.id
+        with patch("django.utils.timezone.now", return_value=at(13)):
+            order_id = self.client.post(
+                reverse("order"), order_data, format="json"
+            ).data["id"]
+            url = reverse("order-item-create", kwargs={"order_id": order_id})
+            response = self.client.post(
+                url, {"item_id": self.croissant.id, "quantity": 1}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_schedule_changes_invalidate_the_menu(self):
+        with patch("django.utils.timezone.now", return_value=at(8)):
+            self.assertEqual(self.menu()[self.latte.id], 3.5)
+            PriceSchedule.objects.filter(start_time=time(7)).get().delete()
+            self.assertEqual(self.menu()[self.latte.id], 5.0)
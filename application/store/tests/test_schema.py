@@ -0,0 +1,58 @@
+import os
+import tempfile
+import yaml
+from django.test import SimpleTestCase, override_settings
+from application.schema import (
+    SCHEMA_CONTENT_TYPES,
+    frozen_schema_path,
+    load_frozen_schema,
+    write_frozen_schema,
+)
+
+# Taken from the request by the live schema view, left out of the frozen one
+# so that clients resolve the API against the host that served it
+REQUEST_FIELDS = ("host", "schemes")
+
+
+class FrozenSchemaTestCase(SimpleTestCase):
+    def test_frozen_schema_matches_live_schema(self):
+        for format in SCHEMA_CONTENT_TYPES:
+            with self.subTest(format=format):
+                # Without frozen files the endpoint serves drf_yasg's schema
+                with tempfile.TemporaryDirectory() as schema_dir:
+                    with override_settings(OPENAPI_SCHEMA_DIR=schema_dir):
+                        response = self.client.get(f"/swagger{format}")
+                self.assertEqual(response.status_code, 200)
+                live = yaml.safe_load(response.content)
+                for field in REQUEST_FIELDS:
+                    live.pop(field, None)
+                frozen = yaml.safe_load(frozen_schema_path(format).read_bytes())
+                self.assertEqual(
+                    frozen,
+                    live,
+                    "The frozen schema is outdated, "
+                    "run `python manage.py generate_schema`",
+                )
+
+    def test_schema_endpoint_serves_frozen_schema(self):
+        response = self.client.get("/swagger.json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], SCHEMA_CONTENT_TYPES[".json"])
+        self.assertEqual(response.content, frozen_schema_path(".json").read_bytes())
+
+    def test_frozen_schema_is_reloaded_when_the_file_changes(self):
+        with tempfile.TemporaryDirectory() as schema_dir:
+            with override_settings(OPENAPI_SCHEMA_DIR=schema_dir):
+                path = write_frozen_schema(".yaml")
+                self.assertEqual(load_frozen_schema(".yaml"), path.read_bytes())
+
+                path.write_bytes(b"swagger: '2.0'\n")
+                os.utime(path, ns=(0, 0))
+                self.assertEqual(load_frozen_schema(".yaml"), b"swagger: '2.0'\n")
+
+    def test_schema_endpoint_falls_back_to_live_schema(self):
+        with tempfile.TemporaryDirectory() as schema_dir:
+            with override_settings(OPENAPI_SCHEMA_DIR=schema_dir):
+                response = self.client.get("/swagger.json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["info"]["title"], "Trio Coffee Shop Challenge")
@@ -0,0 +1,177 @@
+import threading
+from datetime import timedelta
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Product, ProductVariation, Order, OrderItem, PickupSlot
+
+
+class PickupSlotTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        product = Product.objects.create(name="Latte", active=True)
+        self.variation = ProductVariation.objects.create(
+            product=product, name="Small", price=10.0
+        )
+        self.other = ProductVariation.objects.create(
+            product=product, name="Large", price=12.0
+        )
+        self.slot = PickupSlot.objects.create(
+            starts_at=timezone.now() + timedelta(hours=1), capacity=5
+        )
+
+    def place_order(self, quantity, slot_id=None):
+        order_data = {
+            "location": "take_away",
+            "pickup_slot_id": slot_id or self.slot.id,
+            "order_items": [
+                {"product_variation_id": self.variation.id, "quantity": quantity}
+            ],
+        }
+        return self.client.post(reverse("order"), order_data, format="json")
+
+    def reserved(self):
+        self.slot.refresh_from_db()
+        return self.slot.reserved
+
+    def test_order_reserves_slot_capacity(self):
+        response = self.place_order(3)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["pickup_slot_id"], self.slot.id)
+        self.assertEqual(self.reserved(), 3)
+
+        response = self.place_order(3)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {"error": f"PickupSlot with id {self.slot.id} is not available."},
+        )
+        self.assertEqual(self.reserved(), 3)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_past_slots_cannot_be_booked(self):
+        PickupSlot.objects.update(starts_at=timezone.now() - timedelta(minutes=1))
+        response = self.place_order(1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_empty_orders_check_their_slot(self):
+        def place_empty_order(slot_id):
+            order_data = {
+                "location": "take_away",
+                "pickup_slot_id": slot_id,
+                "order_items": [],
+            }
+            return self.client.post(reverse("order"), order_data, format="json")
+
+        response = place_empty_order(self.slot.id)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reserved(), 0)
+
+        response = place_empty_order(999)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        PickupSlot.objects.update(starts_at=timezone.now() - timedelta(minutes=1))
+        response = place_empty_order(self.slot.id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_item_changes_and_cancel_update_capacity(self):
+        order_id = self.place_order(2).data["id"]
+
+        url = reverse("order-item-create", args=[order_id])
+        response = self.client.post(url, {"item_id": self.other.id, "quantity": 4})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.reserved(), 2)
+        response = self.client.post(url, {"item_id": self.other.id, "quantity": 1})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reserved(), 3)
+
+        order_item = OrderItem.objects.get(order_id=order_id, item_id=self.other.id)
+        url = reverse("order-item-update-delete", args=[order_id, order_item.id])
+        self.client.patch(url, {"quantity": 3})
+        self.assertEqual(self.reserved(), 5)
+        self.client.delete(url)
+        self.assertEqual(self.reserved(), 2)
+
+        url = reverse("order-read-update", args=[order_id])
+        response = self.client.patch(url, {"canceled": True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.reserved(), 0)
+
+    def test_availability_is_served_from_counters(self):
+        later = PickupSlot.objects.create(
+            starts_at=self.slot.starts_at + timedelta(minutes=15), capacity=8
+        )
+        PickupSlot.objects.create(
+            starts_at=self.slot.starts_at + timedelta(days=1), capacity=8
+        )
+        self.place_order(2)
+
+        day = timezone.localdate(self.slot.starts_at)
+        # The authenticated user and the slots
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("pickup-slots"), {"date": day})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(slot["id"], slot["available"]) for slot in response.data],
+            [(self.slot.id, 3), (later.id, 8)],
+        )
+
+
+class PickupSlotConcurrencyTestCase(TransactionTestCase):
+    def test_parallel_bookings_do_not_overbook(self):
+        product = Product.objects.create(name="Flat white", active=True)
+        variation = ProductVariation.objects.create(
+            product=product, name="Small", price=4.0
+        )
+        slot = PickupSlot.objects.create(
+            starts_at=timezone.now() + timedelta(hours=1), capacity=10
+        )
+        clients = []
+        for index in range(30):
+            user = User.objects.create_user(username=f"user{index}")
+            client = APIClient()
+            token = RefreshToken.for_user(user)
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+            clients.append(client)
+
+        barrier = threading.Barrier(len(clients))
+        status_codes = []
+
+        def place_order(client):
+            order_data = {
+                "location": "take_away",
+                "pickup_slot_id": slot.id,
+                "order_items": [{"product_variation_id": variation.id, "quantity": 1}],
+            }
+            barrier.wait()
+            try:
+                response = client.post(reverse("order"), order_data, format="json")
+                status_codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=place_order, args=(client,)) for client in clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        slot.refresh_from_db()
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 10)
+        self.assertEqual(status_codes.count(status.HTTP_400_BAD_REQUEST), 20)
+        self.assertEqual(slot.reserved, 10)
+        self.assertEqual(Order.objects.filter(pickup_slot=slot).count(), 10)
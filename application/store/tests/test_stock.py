@@ -0,0 +1,196 @@
+import threading
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..menu_index import get_menu_index
+from ..models import Product, ProductVariation, Order, OrderItem, Customer
+
+
+class StockTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.customer = Customer.objects.create(user=self.user)
+        product = Product.objects.create(name="Pumpkin latte", active=True)
+        self.seasonal = ProductVariation.objects.create(
+            product=product, name="Large", price=5.0, stock=3
+        )
+        self.untracked = ProductVariation.objects.create(
+            product=product, name="Small", price=4.0
+        )
+
+    def place_order(self, *lines):
+        order_data = {
+            "location": "in_house",
+            "order_items": [
+                {"product_variation_id": variation.id, "quantity": quantity}
+                for variation, quantity in lines
+            ],
+        }
+        return self.client.post(reverse("order"), order_data, format="json")
+
+    def test_create_order_reserves_stock(self):
+        response = self.place_order((self.seasonal, 2), (self.untracked, 10))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.seasonal.refresh_from_db()
+        self.untracked.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 1)
+        self.assertIsNone(self.untracked.stock)
+
+    def test_create_order_out_of_stock(self):
+        response = self.place_order((self.untracked, 1), (self.seasonal, 4))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            {"error": f"ProductVariation with id {self.seasonal.id} is out of stock."},
+        )
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 3)
+        self.assertFalse(Order.objects.exists())
+
+    def test_sold_out_variation_is_deactivated(self):
+        self.assertEqual(len(get_menu_index().search("pumpkin")[0]["variations"]), 2)
+
+        response = self.place_order((self.seasonal, 3))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 0)
+        self.assertFalse(self.seasonal.active)
+        variations = get_menu_index().search("pumpkin")[0]["variations"]
+        self.assertEqual(
+            [variation["id"] for variation in variations], [self.untracked.id]
+        )
+
+    def test_sold_out_variation_is_reactivated_when_stock_comes_back(self):
+        response = self.place_order((self.seasonal, 3))
+        url = reverse("order-read-update", args=[response.data["id"]])
+
+        self.client.patch(url, {"canceled": True})
+
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 3)
+        self.assertTrue(self.seasonal.active)
+        self.assertFalse(self.seasonal.sold_out)
+        variations = get_menu_index().search("pumpkin")[0]["variations"]
+        self.assertEqual(len(variations), 2)
+
+    def test_admin_restock(self):
+        admin = User.objects.create_user(username="adminuser", is_staff=True)
+        token: RefreshToken = RefreshToken.for_user(admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        retired = ProductVariation.objects.create(
+            product=self.seasonal.product, name="Medium", price=4.5, stock=0
+        )
+        self.client.post(
+            reverse(
+                "admin-product-variation-deactivate",
+                args=[retired.product_id, retired.id],
+            )
+        )
+        self.place_order((self.seasonal, 3))
+
+        url = reverse("admin-product-update-delete", args=[self.seasonal.product_id])
+        response = self.client.patch(
+            url,
+            {
+                "variations": [
+                    {"id": self.seasonal.id, "stock": 5},
+                    {"id": retired.id, "stock": 5},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.seasonal.refresh_from_db()
+        retired.refresh_from_db()
+        self.assertTrue(self.seasonal.active)
+        # Deactivated by an admin, not by its stock
+        self.assertFalse(retired.active)
+
+    def test_order_item_changes_reserve_and_release_stock(self):
+        order = Order.objects.create(customer=self.customer, location="in_house")
+        url = reverse("order-item-create", args=[order.id])
+        response = self.client.post(
+            url, {"quantity": 2, "item_id": self.seasonal.id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 1)
+
+        url = reverse("order-item-update-delete", args=[order.id, response.data["id"]])
+        response = self.client.patch(url, {"quantity": 4}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            [f"ProductVariation with id {self.seasonal.id} is out of stock."],
+        )
+        self.assertEqual(OrderItem.objects.get().quantity, 2)
+
+        self.client.patch(url, {"quantity": 1}, format="json")
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 2)
+
+        self.client.delete(url)
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 3)
+
+    def test_cancel_order_releases_stock(self):
+        response = self.place_order((self.seasonal, 2))
+        url = reverse("order-read-update", args=[response.data["id"]])
+        response = self.client.patch(url, {"canceled": True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.seasonal.refresh_from_db()
+        self.assertEqual(self.seasonal.stock, 3)
+
+
+class StockConcurrencyTestCase(TransactionTestCase):
+    def test_parallel_orders_do_not_oversell(self):
+        product = Product.objects.create(name="Pumpkin latte", active=True)
+        variation = ProductVariation.objects.create(
+            product=product, name="Large", price=5.0, stock=10
+        )
+        clients = []
+        for index in range(30):
+            user = User.objects.create_user(username=f"user{index}")
+            client = APIClient()
+            token = RefreshToken.for_user(user)
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+            clients.append(client)
+
+        barrier = threading.Barrier(len(clients))
+        status_codes = []
+
+        def place_order(client):
+            order_data = {
+                "location": "in_house",
+                "order_items": [{"product_variation_id": variation.id, "quantity": 1}],
+            }
+            barrier.wait()
+            try:
+                response = client.post(reverse("order"), order_data, format="json")
+                status_codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=place_order, args=(client,)) for client in clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        variation.refresh_from_db()
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 10)
+        self.assertEqual(status_codes.count(status.HTTP_400_BAD_REQUEST), 20)
+        self.assertEqual(variation.stock, 0)
+        self.assertEqual(sum(OrderItem.objects.values_list("quantity", flat=True)), 10)
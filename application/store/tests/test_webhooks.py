@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Customer, Order, OrderEvent, WebhookEndpoint
+from ..webhook_receiver import WebhookReceiver
+from ..webhooks import WebhookClient, dispatch_webhooks
+
+
+@override_settings(
+    ORDER_EVENTS_FEED_DELAY=timedelta(0),
+    WEBHOOK_RETRY_BASE=timedelta(seconds=10),
+    WEBHOOK_RETRY_MAX=timedelta(seconds=30),
+    WEBHOOK_FAILURE_THRESHOLD=4,
+    WEBHOOK_CIRCUIT_OPEN_FOR=timedelta(minutes=15),
+)
+class WebhookDispatchTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="adminuser",
+            password="testpassword",
+            email="admin@example.com",
+            is_superuser=True,
+            is_staff=True,
+        )
+        token: RefreshToken = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        self.customer = Customer.objects.create(user=self.user)
+        self.receiver = WebhookReceiver().start()
+        self.addCleanup(self.receiver.stop)
+        self.webhook_client = WebhookClient(timeout=2)
+        self.addCleanup(self.webhook_client.close)
+
+    def register(self, **data):
+        data.setdefault("url", self.receiver.url)
+        response = self.client.post(
+            reverse("admin-webhook-list-create"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return WebhookEndpoint.objects.get(pk=response.data["id"])
+
+    def record_events(self, count, type=OrderEvent.ORDER_STATUS_CHANGED):
+        for order_id in range(count):
+            OrderEvent.objects.create(order_id=order_id, type=type, payload={})
+
+    def dispatch(self):
+        return dispatch_webhooks(self.webhook_client, batch_size=2)
+
+    @patch("application.store.views.admin_views.send_mail")
+    def test_status_change_is_delivered(self, mock_send_mail):
+        self.register(event_types=[OrderEvent.ORDER_STATUS_CHANGED])
+        order = Order.objects.create(customer=self.customer, location="in_house")
+
+        response = self.client.patch(
+            reverse("admin-order-status-update", kwargs={"pk": order.id}),
+            {"status": "preparation"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.receiver.batches, [])
+
+        self.assertEqual(self.dispatch(), 1)
+        [event] = self.receiver.events
+        self.assertEqual(event["order_id"], order.id)
+        self.assertEqual(event["payload"]["status"], "preparation")
+
+    def test_new_endpoint_skips_past_events(self):
+        self.record_events(3)
+        endpoint = self.register()
+        self.assertEqual(self.dispatch(), 0)
+        self.assertEqual(self.receiver.batches, [])
+
+        self.record_events(1)
+        self.assertEqual(self.dispatch(), 1)
+        endpoint.refresh_from_db()
+        self.assertEqual(endpoint.last_seq, OrderEvent.objects.latest("seq").seq)
+
+    def test_events_are_batched_over_one_connection(self):
+        self.register()
+        self.record_events(5)
+
+        while self.dispatch():
+            pass
+
+        self.assertEqual(
+            [len(batch["events"]) for batch in self.receiver.batches], [2, 2, 1]
+        )
+        seqs = [event["seq"] for event in self.receiver.events]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(len(self.receiver.clients), 1)
+
+    def test_filtered_events_advance_the_cursor(self):
+        endpoint = self.register(event_types=[OrderEvent.ORDER_PLACED])
+        self.record_events(3)
+
+        self.assertEqual(self.dispatch(), 0)
+
+        endpoint.refresh_from_db()
+        self.assertEqual(endpoint.last_seq, OrderEvent.objects.latest("seq").seq)
+        self.assertEqual(self.receiver.batches, [])
+
+    def test_failing_endpoint_backs_off_and_recovers(self):
+        endpoint = self.register()
+        self.record_events(1)
+        self.receiver.respond_with(500, 503)
+
+        delays = []
+        for _ in range(2):
+            started = timezone.now()
+            self.assertEqual(self.dispatch(), 0)
+            endpoint.refresh_from_db()
+            delays.append(endpoint.next_attempt_at - started)
+            # Not due until the backoff has elapsed
+            self.assertEqual(self.dispatch(), 0)
+            WebhookEndpoint.objects.update(next_attempt_at=timezone.now())
+
+        self.assertEqual(endpoint.failure_count, 2)
+        self.assertEqual(endpoint.last_error, "HTTP 503")
+        self.assertAlmostEqual(delays[0].total_seconds(), 10, delta=1)
+        self.assertAlmostEqual(delays[1].total_seconds(), 20, delta=1)
+
+        self.assertEqual(self.dispatch(), 1)
+        endpoint.refresh_from_db()
+        self.assertEqual(endpoint.failure_count, 0)
+        self.assertIsNone(endpoint.next_attempt_at)
+        self.assertEqual(len(self.receiver.events), 1)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        endpoint = self.register()
+        self.record_events(1)
+        self.receiver.respond_with(500)
+        WebhookEndpoint.objects.update(failure_count=3)
+
+        started = timezone.now()
+        self.assertEqual(self.dispatch(), 0)
+
+        endpoint.refresh_from_db()
+        self.assertEqual(endpoint.failure_count, 4)
+        self.assertEqual(endpoint.last_error, "HTTP 500")
+        self.assertGreaterEqual(
+            endpoint.next_attempt_at, started + timedelta(minutes=15)
+        )
+
+        response = self.client.patch(
+            reverse("admin-webhook-detail", kwargs={"pk": endpoint.id}),
+            {"active": False},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(
+            reverse("admin-webhook-detail", kwargs={"pk": endpoint.id}),
+            {"active": True},
+        )
+        self.assertEqual(response.data["failure_count"], 0)
+        self.assertIsNone(response.data["next_attempt_at"])
+
+    def test_dispatch_command_drains_backlog(self):
+        self.register()
+        self.record_events(3)
+
+        call_command("dispatch_webhooks", "--once", "--batch-size=2", stdout=StringIO())
+
+        self.assertEqual(len(self.receiver.events), 3)
+
+    def test_webhooks_require_admin(self):
+        user = User.objects.create_user(username="testuser", password="testpassword")
+        token: RefreshToken = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token.access_token)}")
+        response = self.client.get(reverse("admin-webhook-list-create"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.utils import timezone
+from .models import BlacklistedToken
+
+
+def purge_expired_tokens(batch_size=1000):
+    """
+    Delete blacklisted tokens that have expired, `batch_size` rows per
+    transaction. Yields the number of rows deleted by each batch.
+    """
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            jtis = list(
+                BlacklistedToken.objects.filter(expires_at__lt=now)
+                .order_by("expires_at")
+                .values_list("jti", flat=True)[:batch_size]
+            )
+            if not jtis:
+                return
+            BlacklistedToken.objects.filter(jti__in=jtis).delete()
+        yield len(jtis)
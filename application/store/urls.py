@@ -2,7 +2,13 @@ from django.urls import path
 from .views.customer_views import (
     CreateUserView,
     MenuView,
+    MenuSearchView,
+    PickupSlotAvailabilityView,
     CreateOrderView,
+    ReorderView,
+    FavoriteListCreateView,
+    DeleteFavoriteView,
+    OrderFavoritesView,
     CreateOrderItemView,
     UpdateDeleteOrderItemView,
     ReadUpdateOrderView,
@@ -10,16 +16,34 @@ from .views.customer_views import (
 from .views.admin_views import (
     AdminCreateProductView,
     AdminUpdateProductView,
+    AdminDeactivateProductView,
     AdminDeleteProductVariationView,
+    AdminDeactivateProductVariationView,
     AdminUpdateOrderStatusView,
+    AdminBulkOrderUploadView,
+    AdminSalesReportView,
+    AdminDashboardView,
+    AdminOrderSearchView,
+    AdminOrderEventFeedView,
+    AdminOrderExportView,
+    AdminWebhookEndpointListCreateView,
+    AdminWebhookEndpointView,
+    AdminPickupSlotListCreateView,
+    AdminPromotionListCreateView,
+    AdminPromotionView,
+    AdminPriceScheduleListCreateView,
+    AdminPriceScheduleView,
 )
 
 
 urlpatterns = [
     path("user/", CreateUserView.as_view(), name="user-create"),
     path("menu/", MenuView.as_view(), name="menu"),
+    path("menu/search/", MenuSearchView.as_view(), name="menu-search"),
+    path("pickup-slots/", PickupSlotAvailabilityView.as_view(), name="pickup-slots"),
     path("orders/", CreateOrderView.as_view(), name="order"),
     path("orders/<int:pk>/", ReadUpdateOrderView.as_view(), name="order-read-update"),
+    path("orders/<int:pk>/reorder/", ReorderView.as_view(), name="order-reorder"),
     path(
         "orders/<int:order_id>/order-item/",
         CreateOrderItemView.as_view(),
@@ -30,6 +54,9 @@ urlpatterns = [
         UpdateDeleteOrderItemView.as_view(),
         name="order-item-update-delete",
     ),
+    path("favorites/", FavoriteListCreateView.as_view(), name="favorite-list-create"),
+    path("favorites/order/", OrderFavoritesView.as_view(), name="favorite-order"),
+    path("favorites/<int:pk>/", DeleteFavoriteView.as_view(), name="favorite-delete"),
     path(
         "admin/products", AdminCreateProductView.as_view(), name="admin-product-create"
     ),
@@ -38,14 +65,89 @@ urlpatterns = [
         AdminUpdateProductView.as_view(),
         name="admin-product-update-delete",
     ),
+    path(
+        "admin/products/<int:pk>/deactivate/",
+        AdminDeactivateProductView.as_view(),
+        name="admin-product-deactivate",
+    ),
     path(
         "admin/products/<int:product_id>/variations/<int:id>/",
         AdminDeleteProductVariationView.as_view(),
         name="admin-product-variation-delete",
     ),
+    path(
+        "admin/products/<int:product_id>/variations/<int:id>/deactivate/",
+        AdminDeactivateProductVariationView.as_view(),
+        name="admin-product-variation-deactivate",
+    ),
     path(
         "admin/orders/<int:pk>/status/",
         AdminUpdateOrderStatusView.as_view(),
         name="admin-order-status-update",
     ),
+    path(
+        "admin/reports/sales/",
+        AdminSalesReportView.as_view(),
+        name="admin-sales-report",
+    ),
+    path(
+        "admin/dashboard/",
+        AdminDashboardView.as_view(),
+        name="admin-dashboard",
+    ),
+    path(
+        "admin/orders/search/",
+        AdminOrderSearchView.as_view(),
+        name="admin-order-search",
+    ),
+    path(
+        "admin/orders/bulk/",
+        AdminBulkOrderUploadView.as_view(),
+        name="admin-order-bulk",
+    ),
+    path(
+        "admin/orders/events/",
+        AdminOrderEventFeedView.as_view(),
+        name="admin-order-events",
+    ),
+    path(
+        "admin/orders/export/",
+        AdminOrderExportView.as_view(),
+        name="admin-order-export",
+    ),
+    path(
+        "admin/webhooks/",
+        AdminWebhookEndpointListCreateView.as_view(),
+        name="admin-webhook-list-create",
+    ),
+    path(
+        "admin/webhooks/<int:pk>/",
+        AdminWebhookEndpointView.as_view(),
+        name="admin-webhook-detail",
+    ),
+    path(
+        "admin/pickup-slots/",
+        AdminPickupSlotListCreateView.as_view(),
+        name="admin-pickup-slot-list-create",
+    ),
+    path(
+        "admin/promotions/",
+        AdminPromotionListCreateView.as_view(),
+        name="admin-promotion-list-create",
+    ),
+    path(
+        "admin/promotions/<int:pk>/",
+        AdminPromotionView.as_view(),
+        name="admin-promotion-detail",
+    ),
+    path(
+        "admin/price-schedules/",
+        AdminPriceScheduleListCreateView.as_view(),
+        name="admin-price-schedule-list-create",
+    ),
+    path(
+        "admin/price-schedules/<int:pk>/",
+        AdminPriceScheduleView.as_view(),
+        name="admin-price-schedule-detail",
+    ),
 ]
@@ -1,16 +1,49 @@
+from collections import Counter
 from rest_framework import generics
-from ..models import Product, ProductVariation, Order
+from ..models import (
+    Customer,
+    Product,
+    ProductVariation,
+    Order,
+    WebhookEndpoint,
+    PickupSlot,
+    Promotion,
+    PriceSchedule,
+)
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser
 from ..mixins import MultipleFieldLookupMixin
 from ..serializers.admin_serializers import (
     ProductSerializer,
     UpdateProductSerializer,
     UpdateOrderStatusSerializer,
+    SalesReportQuerySerializer,
+    DashboardQuerySerializer,
+    OrderSearchQuerySerializer,
+    OrderEventFeedQuerySerializer,
+    OrderExportQuerySerializer,
+    WebhookEndpointSerializer,
+    PickupSlotSerializer,
+    PromotionSerializer,
+    PriceScheduleSerializer,
+    BulkOrderUploadSerializer,
 )
+from ..catalog import deactivate, delete_products, delete_variations
+from ..pos import CREATED, DUPLICATE, INVALID, ingest_orders
+from ..rollups import sales_report
+from ..dashboard import dashboard
+from ..search import order_search_page
+from ..events import order_events_page
+from ..exports import EXPORT_CONTENT_TYPES, export_lines, export_rows
+from ..metrics import email_timer
+from ..signals import order_status_changed
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
 
 
 class AdminCreateProductView(generics.CreateAPIView):
@@ -25,8 +58,17 @@ class AdminUpdateProductView(generics.UpdateAPIView, generics.DestroyAPIView):
     serializer_class = UpdateProductSerializer
 
     def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        self.perform_destroy(instance)
+        if not delete_products(Product.objects.filter(pk=kwargs["pk"])):
+            raise NotFound()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdminDeactivateProductView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        if not deactivate(Product.objects.filter(pk=kwargs["pk"])):
+            raise NotFound()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -38,8 +80,23 @@ class AdminDeleteProductVariationView(
     lookup_fields = ("product_id", "id")
 
     def delete(self, request, *args, **kwargs):
-        instance = self.get_object()
-        self.perform_destroy(instance)
+        variations = ProductVariation.objects.filter(
+            product_id=kwargs["product_id"], id=kwargs["id"]
+        )
+        if not delete_variations(variations):
+            raise NotFound()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdminDeactivateProductVariationView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        variations = ProductVariation.objects.filter(
+            product_id=kwargs["product_id"], id=kwargs["id"]
+        )
+        if not deactivate(variations):
+            raise NotFound()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -49,7 +106,16 @@ class AdminUpdateOrderStatusView(generics.UpdateAPIView):
     serializer_class = UpdateOrderStatusSerializer
 
     def perform_update(self, serializer):
-        instance: Order = serializer.save()
+        old_status = serializer.instance.status
+        old_date_status_changed = serializer.instance.date_status_changed
+        with transaction.atomic():
+            instance: Order = serializer.save()
+            order_status_changed.send(
+                sender=Order,
+                order=instance,
+                old_status=old_status,
+                old_date_status_changed=old_date_status_changed,
+            )
         # Send email to the customer user
         message = f"""
         Dear customer, your order with ID #{instance.id}
@@ -57,10 +123,127 @@ class AdminUpdateOrderStatusView(generics.UpdateAPIView):
         """
         email_subject = f"Order Status Updated: Order #{instance.id}"
         email_message = message
-        data = send_mail(
-            email_subject,
-            email_message,
-            settings.EMAIL_SENDER,
-            [instance.customer.user.email],
-        )
+        with email_timer():
+            data = send_mail(
+                email_subject,
+                email_message,
+                settings.EMAIL_SENDER,
+                [instance.customer.user.email],
+            )
         print(data)
+
+
+class AdminBulkOrderUploadView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = BulkOrderUploadSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        customer, _ = Customer.objects.get_or_create(user=request.user)
+        results = ingest_orders(customer, serializer.validated_data["orders"])
+        counts = Counter(result["status"] for result in results)
+        summary = {
+            outcome: counts[outcome] for outcome in (CREATED, DUPLICATE, INVALID)
+        }
+        return Response({**summary, "results": results})
+
+
+class AdminSalesReportView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = SalesReportQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(sales_report(**serializer.validated_data))
+
+
+class AdminDashboardView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = DashboardQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(dashboard(**serializer.validated_data))
+
+
+class AdminOrderSearchView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = OrderSearchQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(order_search_page(**serializer.validated_data))
+
+
+class AdminOrderEventFeedView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = OrderEventFeedQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(order_events_page(**serializer.validated_data))
+
+
+class AdminOrderExportView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    serializer_class = OrderExportQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = dict(serializer.validated_data)
+        export_format = query.pop("export_format")
+        response = StreamingHttpResponse(
+            export_lines(export_rows(**query), export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        filename = f"orders-{query['start']}-{query['end']}.{export_format}"
+        response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+        return response
+
+
+class AdminWebhookEndpointListCreateView(generics.ListCreateAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = WebhookEndpoint.objects.order_by("id")
+    serializer_class = WebhookEndpointSerializer
+
+
+class AdminWebhookEndpointView(generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = WebhookEndpoint.objects.all()
+    serializer_class = WebhookEndpointSerializer
+
+
+class AdminPickupSlotListCreateView(generics.ListCreateAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = PickupSlot.objects.order_by("starts_at")
+    serializer_class = PickupSlotSerializer
+
+
+class AdminPromotionListCreateView(generics.ListCreateAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = Promotion.objects.order_by("id")
+    serializer_class = PromotionSerializer
+
+
+class AdminPromotionView(generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = Promotion.objects.all()
+    serializer_class = PromotionSerializer
+
+
+class AdminPriceScheduleListCreateView(generics.ListCreateAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = PriceSchedule.objects.order_by("variation_id", "start_time")
+    serializer_class = PriceScheduleSerializer
+
+
+class AdminPriceScheduleView(generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAdminUser]
+    queryset = PriceSchedule.objects.all()
+    serializer_class = PriceScheduleSerializer
@@ -1,23 +1,78 @@
+from datetime import datetime, time
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.db import IntegrityError, transaction
 from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from ..permissions import (
     IsOrderItemCustomer,
     IsOrderItemOrderInWaitingStatus,
     IsOrderInWaitingStatus,
 )
 from ..mixins import MultipleFieldLookupMixin
-from ..models import Customer, Product, ProductVariation, Order, OrderItem
+from ..models import (
+    Customer,
+    Product,
+    ProductVariation,
+    Order,
+    OrderItem,
+    ArchivedOrder,
+    ArchivedOrderItem,
+    Favorite,
+)
 from ..serializers.customer_serializers import (
     UserSerializer,
     MenuModelSerializer,
+    MenuSearchQuerySerializer,
+    PickupSlotQuerySerializer,
     CreateOrderSerializer,
+    ReorderSerializer,
+    OrderFavoritesSerializer,
+    FavoriteSerializer,
     CreateOrderItemModelSerializer,
     UpdateOrderItemModelSerializer,
     ReadUpdateModelSerializer,
 )
+from ..menu_index import get_menu_index
+from ..kitchen import check_admission
+from ..orders import (
+    available_variations,
+    is_available,
+    order_item_name,
+    place_order,
+)
+from ..schedules import current_price
+from ..slots import (
+    SlotUnavailable,
+    adjust_slot,
+    release_slot,
+    reserve_slot,
+    slot_availability,
+)
+from ..stock import (
+    OutOfStock,
+    adjust_stock,
+    line_quantities,
+    release_stock,
+    reserve_stock,
+)
+from ..signals import (
+    order_item_added,
+    order_item_updated,
+    order_item_removed,
+    order_updated,
+)
+from ..serializers.read_serializers import (
+    menu_representation,
+    order_items_rows,
+    order_representation,
+)
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -41,6 +96,36 @@ class MenuView(generics.ListAPIView):
             )
         )
 
+    def list(self, request, *args, **kwargs):
+        return Response(menu_representation())
+
+
+class MenuSearchView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = MenuSearchQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        results = get_menu_index().search(
+            query.get("q", ""), query.get("min_price"), query.get("max_price")
+        )
+        return Response(results)
+
+
+class PickupSlotAvailabilityView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = PickupSlotQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        day = serializer.validated_data.get("date", timezone.localdate())
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        end = timezone.make_aware(datetime.combine(day, time.max))
+        return Response(slot_availability(start, end))
+
 
 class CreateOrderView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
@@ -51,17 +136,24 @@ class CreateOrderView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         location = request.data.get("location")
         order_items = request.data.get("order_items", [])
+        check_admission(location)
 
         customer, _ = Customer.objects.get_or_create(user=request.user)
-        order = Order.objects.create(customer=customer, location=location)
         product_variation_ids = [line["product_variation_id"] for line in order_items]
         product_variations = ProductVariation.objects.filter(
             id__in=product_variation_ids
-        )
+        ).select_related("product")
         product_variations_mapping = {
             variation.id: variation for variation in product_variations
         }
 
+        pickup_slot_id = serializer.validated_data.get("pickup_slot_id")
+        order = Order(
+            customer=customer,
+            location=location,
+            pickup_slot_id=pickup_slot_id,
+            promo_code=serializer.validated_data.get("promo_code", ""),
+        )
         order_item_models = []
         for line in order_items:
             variation_id = line["product_variation_id"]
@@ -73,26 +165,153 @@ class CreateOrderView(generics.CreateAPIView):
                     {"error": message},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            name = (
-                f"{variation.product.name} ({variation.name})"
-                if variation.name != "-"
-                else variation.product.name
-            )
+            if not is_available(variation, order.date_created):
+                message = f"ProductVariation with id {variation_id} is not available"
+                return Response(
+                    {"error": message},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             order_item_models.append(
                 OrderItem(
                     order=order,
-                    name=name,
-                    price=variation.price,
+                    name=order_item_name(variation),
+                    price=current_price(variation, order.date_created),
                     quantity=quantity,
                     item_id=variation.id,
                 )
             )
 
-        OrderItem.objects.bulk_create(order_item_models)
+        try:
+            place_order(order, order_item_models)
+        except (OutOfStock, SlotUnavailable) as error:
+            return Response(
+                {"error": error.detail[0]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         serializer = self.get_serializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+def previous_order_lines(customer, pk):
+    # The lines and location of the customer's order `pk`, live or archived
+    for order_model, item_model in (
+        (Order, OrderItem),
+        (ArchivedOrder, ArchivedOrderItem),
+    ):
+        location = (
+            order_model.objects.filter(pk=pk, customer=customer)
+            .values_list("location", flat=True)
+            .first()
+        )
+        if location:
+            return item_model.objects.filter(order_id=pk), location
+    raise Http404
+
+
+def favorite_lines(customer):
+    # The customer's favorites, without a default location
+    return Favorite.objects.filter(customer=customer), None
+
+
+class OrderFromLinesView(generics.GenericAPIView):
+    """
+    Place a new order with the lines returned by `lines_source`, at current
+    prices and without the variations that are no longer on the menu.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ReorderSerializer
+    # Called with the customer and the URL kwargs, returns a queryset of rows
+    # with item_id and quantity and the default location of the order
+    lines_source = None
+
+    def post(self, request, *args, **kwargs):
+        assert (
+            self.lines_source is not None
+        ), "'{}' should include a `lines_source` attribute.".format(
+            self.__class__.__name__
+        )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        customer, _ = Customer.objects.get_or_create(user=request.user)
+        lines, location = self.lines_source(customer, **kwargs)
+        location = serializer.validated_data.get("location", location)
+        check_admission(location)
+
+        order = Order(
+            customer=customer,
+            location=location,
+            pickup_slot_id=serializer.validated_data.get("pickup_slot_id"),
+            promo_code=serializer.validated_data.get("promo_code", ""),
+        )
+        order_items = [
+            OrderItem(
+                order=order,
+                name=order_item_name(variation),
+                price=variation.price,
+                quantity=variation.quantity,
+                item_id=variation.id,
+            )
+            for variation in available_variations(lines)
+        ]
+        if not order_items:
+            return Response(
+                {"error": "None of the items is available anymore."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            place_order(order, order_items)
+        except (OutOfStock, SlotUnavailable) as error:
+            return Response(
+                {"error": error.detail[0]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = CreateOrderSerializer(order)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ReorderView(OrderFromLinesView):
+    queryset = Order.objects.all()
+    lines_source = staticmethod(previous_order_lines)
+
+
+class OrderFavoritesView(OrderFromLinesView):
+    serializer_class = OrderFavoritesSerializer
+    lines_source = staticmethod(favorite_lines)
+
+
+class FavoriteListCreateView(generics.ListCreateAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = FavoriteSerializer
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Favorite.objects.none()
+        return Favorite.objects.filter(customer__user=self.request.user).order_by("id")
+
+    def perform_create(self, serializer):
+        customer, _ = Customer.objects.get_or_create(user=self.request.user)
+        # The unique constraint is the check: a concurrent request can add the
+        # same favorite after FavoriteSerializer.validate
+        try:
+            with transaction.atomic():
+                serializer.save(customer=customer)
+        except IntegrityError:
+            message = "Favorite with item_id {} already exists.".format(
+                serializer.validated_data["item_id"]
+            )
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
+
+class DeleteFavoriteView(generics.DestroyAPIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Favorite.objects.none()
+        return Favorite.objects.filter(customer__user=self.request.user)
+
+
 class ReadUpdateOrderView(generics.RetrieveAPIView, generics.UpdateAPIView):
     permission_classes = [IsAuthenticated, IsOrderInWaitingStatus]
     queryset = Order.objects.all()
@@ -105,6 +324,43 @@ class ReadUpdateOrderView(generics.RetrieveAPIView, generics.UpdateAPIView):
             if request.method != "GET":
                 raise e
 
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            instance = self.get_object()
+        except Http404:
+            # Read-through to the archive for delivered and canceled orders
+            instance = get_object_or_404(ArchivedOrder, pk=self.kwargs["pk"])
+            self.check_object_permissions(request, instance)
+            order_items = order_items_rows(instance.pk, model=ArchivedOrderItem)
+            return Response(order_representation(instance, order_items))
+        return Response(order_representation(instance))
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except Http404:
+            if ArchivedOrder.objects.filter(pk=self.kwargs["pk"]).exists():
+                raise PermissionDenied("Archived orders cannot be modified.")
+            raise
+
+    def perform_update(self, serializer):
+        old_location = serializer.instance.location
+        old_canceled = serializer.instance.canceled
+        with transaction.atomic():
+            order = serializer.save()
+            if order.canceled and not old_canceled:
+                quantities = line_quantities(
+                    order.order_items.values_list("item_id", "quantity")
+                )
+                release_stock(quantities)
+                release_slot(order.pickup_slot_id, sum(quantities.values()))
+            order_updated.send(
+                sender=Order,
+                order=order,
+                old_location=old_location,
+                old_canceled=old_canceled,
+            )
+
 
 class CreateOrderItemView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated, IsOrderInWaitingStatus]
@@ -119,7 +375,12 @@ class CreateOrderItemView(generics.CreateAPIView):
         order_id = self.kwargs.get("order_id")
         order = Order.objects.get(id=order_id)
         self.check_object_permissions(self.request, order)
-        serializer.save(order=order)
+        with transaction.atomic():
+            order_item = serializer.save(order=order)
+            if not order.canceled:
+                reserve_stock({order_item.item_id: order_item.quantity})
+                reserve_slot(order.pickup_slot_id, order_item.quantity)
+            order_item_added.send(sender=Order, order=order, order_item=order_item)
 
 
 class UpdateDeleteOrderItemView(
@@ -142,7 +403,36 @@ class UpdateDeleteOrderItemView(
         self.perform_update(serializer)
         return Response(serializer.data)
 
+    def perform_update(self, serializer):
+        old_quantity = serializer.instance.quantity
+        old_discount = serializer.instance.discount
+        with transaction.atomic():
+            order_item = serializer.save()
+            if not order_item.order.canceled:
+                quantity = order_item.quantity - old_quantity
+                adjust_stock(order_item.item_id, quantity)
+                adjust_slot(order_item.order.pickup_slot_id, quantity)
+            order_item_updated.send(
+                sender=Order,
+                order=order_item.order,
+                order_item=order_item,
+                old_quantity=old_quantity,
+                old_discount=old_discount,
+            )
+
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            order = instance.order
+            order_item_id = instance.pk
+            instance.delete()
+            # delete() clears the pk, the receivers still identify the line
+            instance.pk = order_item_id
+            if not order.canceled:
+                release_stock({instance.item_id: instance.quantity})
+                release_slot(order.pickup_slot_id, instance.quantity)
+            order_item_removed.send(sender=Order, order=order, order_item=instance)
@@ -0,0 +1,94 @@
+"""
+Local stand-in for a webhook consumer (in-store display, POS). It records
+every batch it receives and answers with queued status codes, 200 once the
+queue is empty. Used by the tests, and runnable to watch deliveries locally:
+
+    python -m application.store.webhook_receiver 8001
+"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        status = receiver.record(body, self.client_address)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebhookReceiver:
+    def __init__(self, host="127.0.0.1", port=0, verbose=False):
+        self.server = ThreadingHTTPServer((host, port), WebhookRequestHandler)
+        self.server.receiver = self
+        self.lock = threading.Lock()
+        self.batches = []
+        self.clients = set()
+        self.responses = []
+        self.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return "http://{}:{}/hooks/orders".format(host, port)
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch["events"]]
+
+    def respond_with(self, *statuses):
+        with self.lock:
+            self.responses.extend(statuses)
+
+    def record(self, body, client_address):
+        with self.lock:
+            self.clients.add(client_address)
+            status = self.responses.pop(0) if self.responses else 200
+            if 200 <= status < 300:
+                self.batches.append(body)
+            if self.verbose:
+                print(status, json.dumps(body), flush=True)
+            return status
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001
+    receiver = WebhookReceiver(port=port, verbose=True)
+    print(f"Listening on {receiver.url}", flush=True)
+    try:
+        receiver.server.serve_forever()
+    except KeyboardInterrupt:
+        receiver.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import http.client
+import json
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Q
+from django.utils import timezone
+from .events import EVENT_FIELDS, visible_order_events
+from .models import WebhookEndpoint
+
+
+class WebhookClient:
+    """
+    Minimal HTTP/1.1 client keeping one keep-alive connection per host, so a
+    dispatcher posting batch after batch to the same endpoint does not pay a
+    new TCP (and TLS) handshake for each of them.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or settings.WEBHOOK_TIMEOUT
+        self.connections = {}
+
+    def connection(self, parts):
+        key = (parts.scheme, parts.netloc)
+        if key not in self.connections:
+            if parts.scheme == "https":
+                connection_class = http.client.HTTPSConnection
+            else:
+                connection_class = http.client.HTTPConnection
+            self.connections[key] = connection_class(
+                parts.hostname, parts.port, timeout=self.timeout
+            )
+        return key, self.connections[key]
+
+    def discard(self, key):
+        connection = self.connections.pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def post(self, url, body):
+        """
+        POST a JSON body and return the response status. A request on a
+        reused connection is retried once on a fresh one, since the server
+        may have closed it while idle.
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):
+            reused = (parts.scheme, parts.netloc) in self.connections
+            key, connection = self.connection(parts)
+            try:
+                connection.request("POST", path, body, headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.discard(key)
+                if reused and attempt == 0:
+                    continue
+                raise
+            if response.will_close:
+                self.discard(key)
+            return response.status
+
+    def close(self):
+        for key in list(self.connections):
+            self.discard(key)
+
+
+def due_endpoints(now):
+    return (
+        WebhookEndpoint.objects.filter(active=True)
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+        .order_by("id")
+    )
+
+
+def latest_seq():
+    return visible_order_events().aggregate(seq=Max("seq"))["seq"] or 0
+
+
+def retry_delay(failure_count):
+    # Exponential backoff until the failure threshold, then the endpoint is
+    # left alone for WEBHOOK_CIRCUIT_OPEN_FOR before a single probe batch
+    if failure_count >= settings.WEBHOOK_FAILURE_THRESHOLD:
+        return settings.WEBHOOK_CIRCUIT_OPEN_FOR
+    delay = settings.WEBHOOK_RETRY_BASE * 2 ** (failure_count - 1)
+    return min(delay, settings.WEBHOOK_RETRY_MAX)
+
+
+def record_failure(endpoint, error, now):
+    failure_count = endpoint.failure_count + 1
+    WebhookEndpoint.objects.filter(pk=endpoint.pk).update(
+        failure_count=failure_count,
+        next_attempt_at=now + retry_delay(failure_count),
+        last_error=error[:255],
+    )
+
+
+def deliver(endpoint, client, batch_size, now):
+    """
+    POST the next batch of order events to `endpoint` and advance its cursor
+    on a 2xx response. Returns the number of events delivered.
+    """
+    # Everything up to the horizon is scanned, so the cursor can skip past
+    # events filtered out by event_types instead of rescanning them
+    horizon = visible_order_events(endpoint.last_seq).aggregate(seq=Max("seq"))["seq"]
+    if horizon is None:
+        return 0
+    events = visible_order_events(endpoint.last_seq).filter(seq__lte=horizon)
+    if endpoint.event_types:
+        events = events.filter(type__in=endpoint.event_types)
+    events = list(events.values(*EVENT_FIELDS)[:batch_size])
+    cursor = events[-1]["seq"] if len(events) == batch_size else horizon
+
+    if events:
+        body = json.dumps({"events": events}, cls=DjangoJSONEncoder)
+        try:
+            status = client.post(endpoint.url, body)
+        except (OSError, http.client.HTTPException) as error:
+            record_failure(endpoint, str(error) or error.__class__.__name__, now)
+            return 0
+        if not 200 <= status < 300:
+            record_failure(endpoint, f"HTTP {status}", now)
+            return 0
+
+    # Conditional on the cursor, so a concurrent dispatcher cannot move it back
+    WebhookEndpoint.objects.filter(pk=endpoint.pk, last_seq=endpoint.last_seq).update(
+        last_seq=cursor, failure_count=0, next_attempt_at=None, last_error=""
+    )
+    return len(events)
+
+
+def dispatch_webhooks(client, batch_size=None):
+    """
+    Deliver one batch to every endpoint that is due. Returns the number of
+    events delivered, callers loop until it is zero to drain the backlog.
+    """
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    now = timezone.now()
+    return sum(
+        deliver(endpoint, client, batch_size, now) for endpoint in due_endpoints(now)
+    )
@@ -1,32 +1,15 @@
 from django.contrib import admin
-from django.urls import path, re_path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework_simplejwt.views import TokenObtainPairView
+from django.urls import path, re_path
+from .schema import get_schema_view
+from .urls_api import urlpatterns as api_urlpatterns
 
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Trio Coffee Shop Challenge",
-        default_version="v1",
-        description="-",
-        contact=openapi.Contact(email="evertoncastro.sp@gmail.com"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+schema_view = get_schema_view()
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/token/", TokenObtainPairView.as_view(), name="create-token"),
-    path("cofeeshop/api/", include("application.store.urls"), name="cofeeshop"),
-    re_path(
-        r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
-        name="schema-json",
-    ),
+    *api_urlpatterns,
     re_path(
         r"^swagger/$",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -0,0 +1,24 @@
+from django.urls import path, re_path, include
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+    TokenVerifyView,
+)
+from .metrics import MetricsView
+from .schema import FrozenSchemaView
+
+# URLconf of the API-only worker profile (application.settings_api), without
+# the admin site and the swagger UIs. application.urls extends it.
+
+urlpatterns = [
+    path("api/token/", TokenObtainPairView.as_view(), name="create-token"),
+    path("api/token/refresh/", TokenRefreshView.as_view(), name="refresh-token"),
+    path("api/token/verify/", TokenVerifyView.as_view(), name="verify-token"),
+    path("cofeeshop/api/", include("application.store.urls"), name="cofeeshop"),
+    re_path(
+        r"^swagger(?P<format>\.json|\.yaml)$",
+        FrozenSchemaView.as_view(),
+        name="schema-json",
+    ),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+]
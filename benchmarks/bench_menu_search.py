@@ -0,0 +1,66 @@
+"""
+Measure menu search latency on the in-memory menu index for growing catalogs.
+
+Usage:
+    python benchmarks/bench_menu_search.py
+"""
+import os
+import sys
+import timeit
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "application.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from application.store.menu_index import MenuIndex  # noqa: E402
+
+SIZES = (100, 1000, 10000)
+WORDS = ("latte", "mocha", "espresso", "cookie", "muffin", "tea", "chai", "flat")
+MILKS = ("oat", "whole", "soy", "almond", "skim")
+QUERIES = {
+    "prefix": {"query": "oat lat"},
+    "price range": {"min_price": Decimal("2.00"), "max_price": Decimal("2.50")},
+    "prefix + price": {"query": "mo", "max_price": Decimal("3.00")},
+}
+
+
+def build_menu(size):
+    menu = []
+    for index in range(size // len(MILKS)):
+        name = f"{WORDS[index % len(WORDS)]} {index}"
+        variations = [
+            {
+                "id": index * len(MILKS) + offset,
+                "name": f"{milk} milk",
+                "price": Decimal(100 + (index * 7 + offset) % 400) / 100,
+            }
+            for offset, milk in enumerate(MILKS)
+        ]
+        menu.append({"id": index, "name": name, "variations": variations})
+    return menu
+
+
+def main():
+    print(f"{'query':<16}{'variations':>12}{'build (ms)':>12}{'search (us)':>13}")
+    for size in SIZES:
+        menu = build_menu(size)
+        build = min(timeit.repeat(lambda: MenuIndex(menu), number=1, repeat=3))
+        index = MenuIndex(menu)
+        for name, params in QUERIES.items():
+            number = 1000
+            search = min(
+                timeit.repeat(lambda: index.search(**params), number=number, repeat=3)
+            )
+            print(
+                f"{name:<16}{size:>12}{build * 1000:>12.2f}"
+                f"{search / number * 1e6:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare the DRF serializers with the `.values()` read path used by the menu
+and order detail endpoints.
+
+Usage:
+    python benchmarks/bench_read_path.py
+"""
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "application.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from application.store.models import (  # noqa: E402
+    Customer,
+    Product,
+    ProductVariation,
+    Order,
+    OrderItem,
+)
+from application.store.serializers.customer_serializers import (  # noqa: E402
+    MenuModelSerializer,
+    ReadUpdateModelSerializer,
+)
+from application.store.serializers.read_serializers import (  # noqa: E402
+    menu_representation,
+    order_representation,
+)
+from application.store.views.customer_views import MenuView  # noqa: E402
+
+SIZES = (10, 100, 1000)
+VARIATIONS_PER_PRODUCT = 5
+REPEAT = 5
+
+
+def populate(size):
+    Product.objects.all().delete()
+    Order.objects.all().delete()
+    products = Product.objects.bulk_create(
+        Product(name=f"Product {index}")
+        for index in range(size // VARIATIONS_PER_PRODUCT)
+    )
+    ProductVariation.objects.bulk_create(
+        ProductVariation(product=product, name=f"Size {index}", price=index + 1)
+        for product in products
+        for index in range(VARIATIONS_PER_PRODUCT)
+    )
+    customer = Customer.objects.first()
+    order = Order.objects.create(customer=customer, location="in_house")
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, name=f"Item {index}", price=2, quantity=1, item_id=index)
+        for index in range(size)
+    )
+    return order
+
+
+def best_of(statement):
+    number = 10
+    return min(timeit.repeat(statement, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    connection.creation.create_test_db(verbosity=0)
+    Customer.objects.create(user=User.objects.create(username="bench"))
+
+    print(f"{'endpoint':<8}{'items':>8}{'serializer (ms)':>18}{'values (ms)':>14}")
+    for size in SIZES:
+        order = populate(size)
+        results = {
+            "menu": (
+                lambda: MenuModelSerializer(MenuView().get_queryset(), many=True).data,
+                menu_representation,
+            ),
+            "order": (
+                lambda: ReadUpdateModelSerializer(Order.objects.get(pk=order.pk)).data,
+                lambda: order_representation(Order.objects.get(pk=order.pk)),
+            ),
+        }
+        for name, (serializer, fast) in results.items():
+            print(
+                f"{name:<8}{size:>8}"
+                f"{best_of(serializer) * 1000:>18.3f}{best_of(fast) * 1000:>14.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
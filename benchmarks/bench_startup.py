@@ -0,0 +1,76 @@
+"""
+Compare worker startup of the full and API-only settings profiles: time to
+import application.wsgi and load the URLconf, resident memory afterwards, and
+the request/response overhead of each middleware stack (an unauthenticated
+request rejected before any database access). Every sample runs in a fresh
+interpreter.
+
+Usage:
+    python benchmarks/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILES = ("application.settings", "application.settings_api")
+SAMPLES = 5
+
+WORKER = """
+import json, resource, time
+REQUESTS = 200
+started = time.perf_counter()
+import application.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+rss = None
+try:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) * 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+from django.test import Client
+client = Client(HTTP_HOST="localhost")
+client.get("/cofeeshop/api/menu/")
+started = time.perf_counter()
+for _ in range(REQUESTS):
+    client.get("/cofeeshop/api/menu/")
+request = (time.perf_counter() - started) / REQUESTS
+print(json.dumps({"seconds": elapsed, "rss": rss, "request": request}))
+"""
+
+
+def sample(profile):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile, PYTHONPATH=str(ROOT))
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    print(f"{'profile':<28}{'startup (ms)':>14}{'RSS (MiB)':>12}{'request (us)':>14}")
+    for profile in PROFILES:
+        samples = [sample(profile) for _ in range(SAMPLES)]
+        seconds = statistics.median(result["seconds"] for result in samples)
+        rss = statistics.median(result["rss"] for result in samples)
+        request = statistics.median(result["request"] for result in samples)
+        print(
+            f"{profile:<28}{seconds * 1000:>14.1f}{rss / 2**20:>12.1f}"
+            f"{request * 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()